@@ -1,4 +1,5 @@
 from pyramid.config import Configurator
+from pyramid.settings import asbool
 from sqlalchemy import engine_from_config
 from backend_edutrack.utils.auth_policy import get_role_from_email
 from .models.meta import DBSession  
@@ -41,9 +42,22 @@ def main(global_config, **settings):
 
     config = Configurator(settings=settings)
 
-    config.include('pyramid_jinja2')
+    # Semua view API merender JSON; template engine hanya dimuat jika dipakai
+    if asbool(settings.get('templates.enabled', False)):
+        config.include('pyramid_jinja2')
     config.include('.routes')
+    config.include('.views.notfound')
     config.include('.models')
+    config.include('.utils.cache')
+    config.include('.utils.singleflight')
+    config.include('.utils.search')
+    config.include('.utils.suggest')
+    config.include('.utils.hot')
+    config.include('.utils.events')
+    config.include('.utils.idempotency')
+    config.include('.utils.ratelimit')
+    config.include('.utils.admission')
+    config.include('.utils.breaker')
     config.include('pyramid_tm')
     config.include('pyramid_retry')
 
@@ -51,6 +65,9 @@ def main(global_config, **settings):
     config.add_renderer('json', JSON(indent=4))
     config.add_tween('backend_edutrack.utils.auth_policy.auth_tween_factory')
     config.add_tween('.cors_tween_factory')
+    config.add_tween('.utils.compression.compression_tween_factory')
 
-    config.scan()
+    # Hanya paket views yang berisi @view_config; scan tanpa argumen ikut
+    # mengimpor scripts, tests, dan entry point lain saat startup
+    config.scan('.views')
     return config.make_wsgi_app()
\ No newline at end of file
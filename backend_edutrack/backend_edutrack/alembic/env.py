@@ -9,6 +9,9 @@ config = context.config
 setup_logging(config.config_file_name)
 
 settings = get_appsettings(config.config_file_name)
+# Migrasi yang bergantung pada setting aplikasi (mis. search.pg_config)
+# membacanya dari sini
+config.attributes['app_settings'] = settings
 target_metadata = Base.metadata
 
 
@@ -0,0 +1,24 @@
+"""Add version column to posts for ETag support
+
+Revision ID: 28b8db904806
+Revises: ed78ee73a871
+Create Date: 2026-10-19 09:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '28b8db904806'
+down_revision = 'ed78ee73a871'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('posts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    op.drop_column('posts', 'version')
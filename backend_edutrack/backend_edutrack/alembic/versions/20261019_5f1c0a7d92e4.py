@@ -0,0 +1,29 @@
+"""Add denormalized comment_count to posts
+
+Revision ID: 5f1c0a7d92e4
+Revises: 28b8db904806
+Create Date: 2026-10-19 10:03:47.551920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f1c0a7d92e4'
+down_revision = '28b8db904806'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('posts', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    # Backfill dari tabel comments yang sudah ada
+    op.execute(
+        "UPDATE posts SET comment_count = "
+        "(SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.id)"
+    )
+
+
+def downgrade():
+    op.drop_column('posts', 'comment_count')
@@ -0,0 +1,33 @@
+"""Add denormalized author_prodi to posts with feed indexes
+
+Revision ID: 9b3f6c1d2e57
+Revises: e4d28a9f5b13
+Create Date: 2026-10-19 15:02:17.904315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3f6c1d2e57'
+down_revision = 'e4d28a9f5b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('posts', sa.Column('author_prodi', sa.String(length=255), nullable=True))
+    # Backfill dari prodi penulis saat ini
+    op.execute(
+        "UPDATE posts SET author_prodi = "
+        "(SELECT users.prodi FROM users WHERE users.id = posts.author_id)"
+    )
+    op.create_index('ix_posts_author_prodi_created_at', 'posts', ['author_prodi', 'created_at'], unique=False)
+    op.create_index('ix_posts_author_id_created_at', 'posts', ['author_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_posts_author_id_created_at', table_name='posts')
+    op.drop_index('ix_posts_author_prodi_created_at', table_name='posts')
+    op.drop_column('posts', 'author_prodi')
@@ -0,0 +1,51 @@
+"""Add full-text search index for posts
+
+Revision ID: a3e9d41c6b20
+Revises: 5f1c0a7d92e4
+Create Date: 2026-10-19 11:20:05.118734
+
+"""
+from alembic import context, op
+
+from backend_edutrack.utils.search import (
+    PG_INDEX_NAME,
+    SQLITE_FTS_TABLE,
+    search_backend_for,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3e9d41c6b20'
+down_revision = '5f1c0a7d92e4'
+branch_labels = None
+depends_on = None
+
+
+def search_settings():
+    """
+    Setting aplikasi dari file ini yang dipakai Alembic, agar index GIN dibuat
+    dengan ``search.pg_config`` yang sama dengan query. Bisa ditimpa dengan
+    ``alembic -x search.pg_config=<config> upgrade head``.
+    """
+    settings = dict(context.config.attributes.get('app_settings') or {})
+    settings.update(context.get_x_argument(as_dictionary=True))
+    return settings
+
+
+def upgrade():
+    bind = op.get_bind()
+    backend = search_backend_for(bind.dialect.name, search_settings())
+    if backend is None:
+        return
+    # PostgreSQL: GIN index ekspresi; SQLite: tabel FTS5 lalu isi dari posts
+    backend.ensure_schema(bind)
+    if bind.dialect.name == 'sqlite':
+        backend.reindex(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS %s' % PG_INDEX_NAME)
+    elif bind.dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS %s' % SQLITE_FTS_TABLE)
@@ -0,0 +1,29 @@
+"""Add hot_score to posts with keyset index
+
+Revision ID: c71b5e2f0d84
+Revises: a3e9d41c6b20
+Create Date: 2026-10-19 13:22:05.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71b5e2f0d84'
+down_revision = 'a3e9d41c6b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nilai awal diisi oleh HotRanker pada refresh penuh pertama setelah start
+    op.add_column('posts', sa.Column('hot_score', sa.Float(), server_default='0', nullable=False))
+    op.create_index('ix_posts_hot_score_id', 'posts', ['hot_score', 'id'], unique=False)
+    op.create_index('ix_post_interactions_post_id_created_at', 'post_interactions', ['post_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_post_interactions_post_id_created_at', table_name='post_interactions')
+    op.drop_index('ix_posts_hot_score_id', table_name='posts')
+    op.drop_column('posts', 'hot_score')
@@ -0,0 +1,38 @@
+"""Add created_at and indexes to post_recommendations
+
+Revision ID: e4d28a9f5b13
+Revises: c71b5e2f0d84
+Create Date: 2026-10-19 14:08:41.530972
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4d28a9f5b13'
+down_revision = 'c71b5e2f0d84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('post_recommendations', sa.Column('created_at', sa.DateTime(), nullable=True))
+    # Waktu rekomendasi lama tidak tercatat; pakai waktu pembuatan post sebagai perkiraan
+    op.execute(
+        "UPDATE post_recommendations SET created_at = "
+        "(SELECT posts.created_at FROM posts WHERE posts.id = post_recommendations.post_id)"
+    )
+    op.execute("UPDATE post_recommendations SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    with op.batch_alter_table('post_recommendations') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+    op.create_index('ix_post_recommendations_created_at_post_id', 'post_recommendations', ['created_at', 'post_id'], unique=False)
+    op.create_index('ix_post_recommendations_user_id_created_at', 'post_recommendations', ['user_id', 'created_at', 'post_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_post_recommendations_user_id_created_at', table_name='post_recommendations')
+    op.drop_index('ix_post_recommendations_created_at_post_id', table_name='post_recommendations')
+    with op.batch_alter_table('post_recommendations') as batch_op:
+        batch_op.drop_column('created_at')
@@ -0,0 +1,291 @@
+"""
+Entry point ASGI (alternatif dari ``pserve``/waitress).
+
+Aplikasi Pyramid yang sama dipakai ulang lewat adapter, tanpa menulis ulang
+view:
+
+- Request ``GET``/``HEAD`` dijalankan di event loop. Session
+  ``request.dbsession`` berasal dari ``AsyncSession`` (aiosqlite/asyncpg) dan
+  seluruh pipeline Pyramid berjalan di dalam ``AsyncSession.run_sync``,
+  sehingga saat menunggu database request lain tetap dilayani tanpa satu
+  thread per request.
+- Request lain (tulis, login/register dengan bcrypt) dan path di
+  ``asgi.thread_paths`` berjalan di thread pool (``asgi.threads``) dengan
+  engine sinkron biasa, sama seperti di waitress.
+- ``/api/stream`` (SSE) diiterasi secara async, jadi koneksi yang terbuka
+  lama tidak memakai thread sama sekali.
+- Body streaming lain (app_iter generator, misalnya ``/api/admin/export``)
+  diiterasi di satu thread pool dan dikirim per potongan, tanpa ditampung
+  utuh di memori. Generator seperti ini membuka koneksi database sinkron
+  sendiri, jadi path-nya harus ada di ``asgi.thread_paths``.
+
+Batasan jalur async: hanya tunggu I/O database yang melepas event loop.
+Bagian lain pipeline Pyramid (tween, view, renderer JSON) berjalan di thread
+event loop, sehingga selama itu tidak ada request lain yang dilayani. Jalur
+ini cocok untuk view baca yang waktunya didominasi query. Path ``GET`` yang
+berat di CPU atau memblokir thread dengan cara lain harus dimasukkan ke
+``asgi.thread_paths``. Karena itu single-flight dimatikan (follower akan
+menahan loop), index autocomplete dibangun saat startup, dan
+``/api/suggest`` serta ``/api/admin/export`` dijalankan di thread pool.
+
+Menjalankan (membutuhkan ``pip install -e ".[asgi]"``)::
+
+    EDUTRACK_INI=production.ini uvicorn --factory backend_edutrack.asgi:app_from_environ
+
+Setting yang dikenali:
+
+- ``sqlalchemy_async.url`` (default: ``sqlalchemy.url`` dengan driver async)
+  dan opsi ``sqlalchemy_async.*`` lain untuk engine async
+- ``asgi.threads`` (default 8)
+- ``asgi.thread_paths`` (default ``/api/suggest /api/admin/export``): prefix
+  path GET yang tetap dijalankan di thread pool
+"""
+import asyncio
+import io
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from pyramid.settings import aslist
+
+log = logging.getLogger(__name__)
+
+ASYNC_METHODS = frozenset(['GET', 'HEAD'])
+
+DEFAULT_THREAD_PATHS = '/api/suggest /api/admin/export'
+
+
+def build_environ(scope, body):
+    """Bangun environ WSGI (PEP 3333) dari scope HTTP ASGI."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/%s' % scope.get('http_version', '1.1'),
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            key = 'CONTENT_TYPE'
+        elif name == 'CONTENT_LENGTH':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name
+        if key in environ:
+            value = environ[key] + ',' + value
+        environ[key] = value
+    return environ
+
+
+def call_wsgi(app, environ):
+    """
+    Panggil aplikasi WSGI dan kembalikan ``(status, headers, body)``. Body
+    biasa (list/tuple) digabung menjadi bytes; app_iter lain, yaitu stream
+    SSE (``iter_async``) dan generator, dikembalikan apa adanya untuk
+    dikirim bertahap.
+    """
+    started = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = status
+        started['headers'] = headers
+        return chunks.append
+
+    app_iter = app(environ, start_response)
+    if not chunks and not isinstance(app_iter, (list, tuple)):
+        return started['status'], started['headers'], app_iter
+    try:
+        chunks.extend(app_iter)
+    finally:
+        close = getattr(app_iter, 'close', None)
+        if close is not None:
+            close()
+    return started['status'], started['headers'], b''.join(chunks)
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+class AsgiAdapter:
+
+    def __init__(self, wsgi_app, async_engine, threads=8, thread_paths=()):
+        self.wsgi_app = wsgi_app
+        self.registry = wsgi_app.registry
+        self.async_engine = async_engine
+        self.thread_paths = tuple(thread_paths)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi')
+
+    def runs_async(self, method, path):
+        if method not in ASYNC_METHODS:
+            return False
+        return not any(path.startswith(prefix) for prefix in self.thread_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.handle_http(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def startup(self):
+        ranker = self.registry.get('hot_ranker')
+        if ranker is not None:
+            ranker.start(self.registry['dbsession_factory'])
+        suggest = self.registry.get('suggest')
+        if suggest is None:
+            return
+
+        def build_index():
+            dbsession = self.registry['dbsession_factory']()
+            try:
+                suggest.ensure_index(dbsession)
+            finally:
+                dbsession.close()
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(self.executor, build_index)
+        except Exception:
+            log.exception("Gagal membangun index autocomplete saat startup")
+
+    async def shutdown(self):
+        ranker = self.registry.get('hot_ranker')
+        if ranker is not None:
+            ranker.stop(timeout=5)
+        self.executor.shutdown(wait=False)
+        await self.async_engine.dispose()
+
+    async def handle_http(self, scope, receive, send):
+        body = await read_body(receive)
+        if body is None:
+            return
+        environ = build_environ(scope, body)
+
+        if self.runs_async(scope['method'], scope['path']):
+            status, headers, result = await self.call_async(environ)
+        else:
+            status, headers, result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, call_wsgi, self.wsgi_app, environ)
+
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        if isinstance(result, bytes):
+            await send({'type': 'http.response.body', 'body': result})
+        elif hasattr(result, 'iter_async'):
+            await self.send_stream(result, receive, send)
+        else:
+            await self.send_iter(result, send)
+
+    async def call_async(self, environ):
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        async with AsyncSession(self.async_engine) as session:
+            environ['backend_edutrack.dbsession'] = session.sync_session
+            return await session.run_sync(lambda sync_session: call_wsgi(self.wsgi_app, environ))
+
+    async def send_stream(self, app_iter, receive, send):
+        disconnected = asyncio.ensure_future(receive())
+        try:
+            async for chunk in app_iter.iter_async():
+                # Putusnya klien terdeteksi paling lambat pada heartbeat berikutnya
+                if disconnected.done():
+                    return
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+            app_iter.close()
+
+    async def send_iter(self, app_iter, send):
+        """
+        Iterasi app_iter sinkron di satu thread pool (koneksi database milik
+        generator tidak berpindah thread); setiap potongan dikirim lewat event
+        loop dan ditunggu, sehingga generator tidak berjalan lebih cepat dari
+        klien.
+        """
+        loop = asyncio.get_running_loop()
+
+        def pump():
+            try:
+                for chunk in app_iter:
+                    if chunk:
+                        asyncio.run_coroutine_threadsafe(
+                            send({'type': 'http.response.body', 'body': chunk, 'more_body': True}), loop,
+                        ).result()
+            finally:
+                close = getattr(app_iter, 'close', None)
+                if close is not None:
+                    close()
+
+        await loop.run_in_executor(self.executor, pump)
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+def main(global_config, **settings):
+    """ This function returns an ASGI application. """
+    from . import main as wsgi_main
+    from .models import get_async_engine
+
+    # Follower single-flight menunggu dengan memblokir thread; di event loop
+    # itu akan menahan semua request lain
+    settings['singleflight.routes'] = ''
+
+    wsgi_app = wsgi_main(global_config, **settings)
+    async_engine = get_async_engine(settings)
+    # Error database di jalur async juga dihitung circuit breaker
+    breaker = wsgi_app.registry.get('db_breaker')
+    if breaker is not None:
+        breaker.attach(async_engine.sync_engine)
+
+    return AsgiAdapter(
+        wsgi_app,
+        async_engine,
+        threads=int(settings.get('asgi.threads', 8)),
+        thread_paths=aslist(settings.get('asgi.thread_paths', DEFAULT_THREAD_PATHS)),
+    )
+
+
+def app_from_environ():
+    """Factory untuk ``uvicorn --factory``; file ini dibaca dari ``EDUTRACK_INI``."""
+    from pyramid.paster import get_appsettings, setup_logging
+
+    config_uri = os.environ.get('EDUTRACK_INI', 'development.ini')
+    setup_logging(config_uri)
+    settings = get_appsettings(config_uri)
+    return main({'__file__': os.path.abspath(config_uri)}, **settings)
@@ -1,4 +1,8 @@
-from sqlalchemy import engine_from_config
+import re
+import time
+
+from pyramid.settings import aslist
+from sqlalchemy import engine_from_config, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import configure_mappers
 from sqlalchemy.orm import declarative_base
@@ -12,14 +16,161 @@ from .meta import Base
 from .user import User
 from .post import Post
 from .comment import Comment
+from .change_log import ChangeLog
+from .idempotency import IdempotencyKey
+
+
+# PRAGMA yang dijalankan di setiap koneksi SQLite baru, beserta nilai
+# default-nya. Bisa diganti lewat setting ``sqlite.<nama>``; nilai kosong
+# berarti PRAGMA tersebut tidak dijalankan.
+SQLITE_PRAGMAS = (
+    # WAL: pembaca tidak memblokir penulis dan sebaliknya
+    ('journal_mode', 'wal'),
+    # Aman dari korupsi di mode WAL; hanya transaksi terakhir yang bisa
+    # hilang jika listrik mati
+    ('synchronous', 'normal'),
+    # Milidetik menunggu lock penulis lain sebelum "database is locked"
+    ('busy_timeout', '5000'),
+    # Negatif = KiB; 64 MiB page cache per koneksi
+    ('cache_size', '-65536'),
+    ('mmap_size', '268435456'),
+    ('temp_store', 'memory'),
+)
+# PRAGMA yang tidak berlaku untuk database in-memory
+SQLITE_FILE_PRAGMAS = ('journal_mode', 'mmap_size')
+
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+
+def sqlite_pragmas(settings, in_memory=False):
+    """Daftar ``(nama, nilai)`` PRAGMA SQLite dari setting ``sqlite.*``."""
+    pragmas = []
+    for name, default in SQLITE_PRAGMAS:
+        value = str(settings.get('sqlite.' + name, default)).strip()
+        if not value or (in_memory and name in SQLITE_FILE_PRAGMAS):
+            continue
+        if not PRAGMA_VALUE.match(value):
+            raise ValueError("Nilai sqlite.%s tidak valid: %r" % (name, value))
+        pragmas.append((name, value))
+    return pragmas
+
+
+def statement_timeouts(settings):
+    """
+    Batas waktu statement dalam milidetik: ``(default, {route_name: ms})``
+    dari setting ``db.statement_timeout`` dan ``db.route_statement_timeouts``
+    (satu ``<route> <ms>`` per baris). 0 berarti tanpa batas.
+    """
+    default = int(settings.get('db.statement_timeout', 0))
+    routes = {}
+    for line in aslist(settings.get('db.route_statement_timeouts', ''), flatten=False):
+        name, value = line.split()
+        routes[name] = int(value)
+    return default, routes
+
+
+# Instruksi VM SQLite di antara pemanggilan progress handler
+SQLITE_PROGRESS_STEPS = 10000
+
+
+def configure_sqlite_timeouts(engine):
+    """
+    SQLite tidak punya ``statement_timeout``: progress handler di setiap
+    koneksi membatalkan statement (``OperationalError: interrupted``) yang
+    berjalan melewati ``connection.info['statement_timeout']`` detik.
+    Nilai itu diisi ``get_tm_session`` dan dibuang saat koneksi kembali ke pool.
+
+    Untuk aiosqlite (``sync_engine`` dari engine async) handler dipasang pada
+    koneksi aiosqlite di bawah adapter SQLAlchemy, yang menjalankan
+    ``sqlite3`` di thread miliknya sendiri.
+    """
+    def install_handler(dbapi_connection, connection_record):
+        info = connection_record.info
+
+        def check():
+            deadline = info.get('statement_deadline')
+            return 1 if deadline is not None and time.monotonic() > deadline else 0
+
+        if hasattr(dbapi_connection, 'set_progress_handler'):
+            dbapi_connection.set_progress_handler(check, SQLITE_PROGRESS_STEPS)
+        else:
+            from sqlalchemy.util import await_only
+
+            await_only(connection_record.driver_connection.set_progress_handler(check, SQLITE_PROGRESS_STEPS))
+
+    def start_clock(connection, cursor, statement, parameters, context, executemany):
+        timeout = connection.info.get('statement_timeout')
+        connection.info['statement_deadline'] = time.monotonic() + timeout if timeout else None
+
+    def reset(dbapi_connection, connection_record):
+        connection_record.info.pop('statement_timeout', None)
+        connection_record.info.pop('statement_deadline', None)
+
+    event.listen(engine, 'connect', install_handler)
+    event.listen(engine, 'before_cursor_execute', start_clock)
+    event.listen(engine.pool, 'checkin', reset)
+
 
-# run configure_mappers after defining all of the models to ensure
-# all relationships can be setup
-configure_mappers()
+def configure_sqlite(engine, settings):
+    """
+    Pasang event ``connect`` yang menjalankan PRAGMA dari ``sqlite_pragmas``
+    pada setiap koneksi baru, serta progress handler untuk statement timeout
+    jika ada yang dikonfigurasi. Engine selain SQLite tidak diubah.
+    """
+    if engine.dialect.name != 'sqlite':
+        return engine
+    default_timeout, route_timeouts = statement_timeouts(settings)
+    if default_timeout or any(route_timeouts.values()):
+        configure_sqlite_timeouts(engine)
+
+    database = engine.url.database or ''
+    in_memory = database in ('', ':memory:') or 'mode=memory' in database
+    pragmas = sqlite_pragmas(settings, in_memory)
+    if not pragmas:
+        return engine
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute('PRAGMA %s = %s' % (name, value))
+        finally:
+            cursor.close()
+
+    event.listen(engine, 'connect', set_pragmas)
+    return engine
 
 
 def get_engine(settings, prefix='sqlalchemy.'):
-    return engine_from_config(settings, prefix)
+    return configure_sqlite(engine_from_config(settings, prefix), settings)
+
+
+# Driver async per backend untuk entry point ASGI
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+}
+
+
+def get_async_engine(settings, prefix='sqlalchemy_async.'):
+    """
+    Buat ``AsyncEngine`` untuk entry point ASGI. Tanpa ``sqlalchemy_async.url``,
+    URL diturunkan dari ``sqlalchemy.url`` dengan driver async yang sesuai.
+    """
+    from sqlalchemy import make_url
+    from sqlalchemy.ext.asyncio import async_engine_from_config
+
+    options = {key: value for key, value in settings.items() if key.startswith(prefix)}
+    if prefix + 'url' not in options:
+        url = make_url(settings['sqlalchemy.url'])
+        driver = ASYNC_DRIVERS.get(url.get_backend_name())
+        if driver is None:
+            raise ValueError(
+                "Tidak ada driver async untuk %r; isi %surl" % (url.get_backend_name(), prefix))
+        options[prefix + 'url'] = url.set(drivername='%s+%s' % (url.get_backend_name(), driver))
+    engine = async_engine_from_config(options, prefix)
+    configure_sqlite(engine.sync_engine, settings)
+    return engine
 
 
 def get_session_factory(engine):
@@ -28,12 +179,44 @@ def get_session_factory(engine):
     return factory
 
 
-def get_tm_session(session_factory, transaction_manager):
+def rebind_engine(registry):
+    """
+    Ganti engine ``dbsession_factory`` dengan engine baru milik proses ini.
+    Dipakai worker prefork setelah fork, agar pool koneksi tidak pernah
+    dipakai bersama proses master atau worker lain.
+    """
+    engine = get_engine(registry.settings)
+    registry['dbsession_factory'].configure(bind=engine)
+    breaker = registry.get('db_breaker')
+    if breaker is not None:
+        breaker.attach(engine)
+    return engine
+
+
+def set_statement_timeout(dbsession, timeout_ms):
+    """
+    Batasi lama setiap statement di transaksi ``dbsession``: ``SET LOCAL
+    statement_timeout`` di PostgreSQL, progress handler di SQLite (lihat
+    ``configure_sqlite_timeouts``). Statement yang melewati batas gagal
+    dengan ``OperationalError``.
+    """
+    def apply(session, transaction, connection):
+        dialect = connection.dialect.name
+        if dialect == 'postgresql':
+            connection.exec_driver_sql('SET LOCAL statement_timeout = %d' % timeout_ms)
+        elif dialect == 'sqlite':
+            connection.info['statement_timeout'] = timeout_ms / 1000.0
+
+    event.listen(dbsession, 'after_begin', apply)
+
+
+def get_tm_session(session_factory, transaction_manager, statement_timeout=None):
     """
     Get a ``sqlalchemy.orm.Session`` instance backed by a transaction.
 
     This function will hook the session to the transaction manager which
-    will take care of committing any changes.
+    will take care of committing any changes. ``statement_timeout`` (ms)
+    membatasi lama setiap statement di session tersebut.
 
     - When using pyramid_tm it will automatically be committed or aborted
       depending on whether an exception is raised.
@@ -50,6 +233,8 @@ def get_tm_session(session_factory, transaction_manager):
 
     """
     dbsession = session_factory()
+    if statement_timeout:
+        set_statement_timeout(dbsession, statement_timeout)
     zope.sqlalchemy.register(
         dbsession, transaction_manager=transaction_manager)
     return dbsession
@@ -63,6 +248,12 @@ def includeme(config):
 
     """
     settings = config.get_settings()
+
+    # run configure_mappers after defining all of the models to ensure
+    # all relationships can be setup; dilakukan saat konfigurasi, bukan saat
+    # import, agar script dan test yang hanya mengimpor model tidak membayarnya
+    configure_mappers()
+
     settings['tm.manager_hook'] = 'pyramid_tm.explicit_manager'
 
     # use pyramid_tm to hook the transaction lifecycle to the request
@@ -73,11 +264,23 @@ def includeme(config):
 
     session_factory = get_session_factory(get_engine(settings))
     config.registry['dbsession_factory'] = session_factory
+    default_timeout, route_timeouts = statement_timeouts(settings)
+
+    def dbsession(request):
+        # Entry point ASGI menyertakan session yang I/O-nya berjalan lewat
+        # driver async (lihat backend_edutrack.asgi)
+        # Session yang dibuat sebelum routing (mis. oleh tween idempotency)
+        # memakai batas default
+        route = getattr(request, 'matched_route', None)
+        timeout = route_timeouts.get(route.name, default_timeout) if route is not None else default_timeout
+        session = request.environ.get('backend_edutrack.dbsession')
+        if session is None:
+            # r.tm is the transaction manager used by pyramid_tm
+            return get_tm_session(session_factory, request.tm, statement_timeout=timeout)
+        if timeout:
+            set_statement_timeout(session, timeout)
+        zope.sqlalchemy.register(session, transaction_manager=request.tm)
+        return session
 
     # make request.dbsession available for use in Pyramid
-    config.add_request_method(
-        # r.tm is the transaction manager used by pyramid_tm
-        lambda r: get_tm_session(session_factory, r.tm),
-        'dbsession',
-        reify=True
-    )
+    config.add_request_method(dbsession, 'dbsession', reify=True)
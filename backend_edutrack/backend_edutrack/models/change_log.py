@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime
+from .meta import Base
+
+class ChangeLog(Base):
+    """
+    Log perubahan append-only untuk ``/api/sync``. Ditulis di transaksi yang
+    sama dengan view yang mengubah data; ``id`` menjadi token sinkronisasi.
+    """
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        # Untuk mencari baris yang belum mengendap (token awal klien baru)
+        Index('ix_change_log_created_at', 'created_at'),
+        # AUTOINCREMENT di SQLite agar id tidak pernah dipakai ulang
+        {'sqlite_autoincrement': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    # 'post' (isi/counter berubah), 'comment' (komentar baru), 'recommendation'
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    post_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Index, UniqueConstraint
+from datetime import datetime
+from .meta import Base
+
+class IdempotencyKey(Base):
+    """
+    Respons pertama untuk setiap header ``Idempotency-Key`` per pengguna,
+    diputar ulang untuk request duplikat. Baris lebih tua dari
+    ``idempotency.ttl`` dianggap kedaluwarsa dan dihapus berkala.
+    """
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        # Key hanya unik per pengguna; 0 untuk request tanpa login
+        UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_id_key'),
+        # Untuk pembersihan TTL
+        Index('ix_idempotency_keys_created_at', 'created_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    key = Column(String(255), nullable=False)
+    # sha256 dari method, path, dan body; key yang sama untuk request lain ditolak
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    content_type = Column(String(100), nullable=True)
+    body = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
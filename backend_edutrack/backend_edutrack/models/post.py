@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Table, ForeignKey, Text, DateTime, String, UniqueConstraint 
+from sqlalchemy import Column, Integer, Float, Index, Table, ForeignKey, Text, DateTime, String, UniqueConstraint 
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .meta import Base
@@ -19,7 +19,11 @@ class PostInteraction(Base):
     post = relationship("Post", back_populates="post_interactions")
 
     # Pastikan setiap user hanya bisa memiliki satu interaksi (like/dislike) per post
-    __table_args__ = (UniqueConstraint('user_id', 'post_id', name='_user_post_uc'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'post_id', name='_user_post_uc'),
+        # Untuk menghitung interaksi terbaru per post (skor hot)
+        Index('ix_post_interactions_post_id_created_at', 'post_id', 'created_at'),
+    )
 
     def __repr__(self):
         return f"<PostInteraction(user_id={self.user_id}, post_id={self.post_id}, type='{self.interaction_type}')>"
@@ -30,7 +34,11 @@ post_recommendations = Table(
     "post_recommendations",
     Base.metadata,
     Column("post_id", Integer, ForeignKey("posts.id"), primary_key=True),
-    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True)
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("created_at", DateTime, nullable=False, default=datetime.utcnow),
+    # Feed /api/posts/recommended: urutan waktu untuk semua dosen / per dosen
+    Index("ix_post_recommendations_created_at_post_id", "created_at", "post_id"),
+    Index("ix_post_recommendations_user_id_created_at", "user_id", "created_at", "post_id"),
 )
 
 post_references = Table(
@@ -42,7 +50,14 @@ post_references = Table(
 
 class Post(Base):
     __tablename__ = 'posts'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Feed sort=hot: index scan berurutan (hot_score, id) untuk keyset pagination
+        Index('ix_posts_hot_score_id', 'hot_score', 'id'),
+        # Feed terfilter ?prodi= dan ?author_id= / author=self, urut created_at
+        Index('ix_posts_author_prodi_created_at', 'author_prodi', 'created_at'),
+        Index('ix_posts_author_id_created_at', 'author_id', 'created_at'),
+        {'extend_existing': True},
+    )
     
     id = Column(Integer, primary_key=True)
     title = Column(Text, nullable=False)
@@ -53,10 +68,24 @@ class Post(Base):
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     author = relationship("User", back_populates="posts")
 
+    # Salinan User.prodi penulis (denormalisasi) agar feed per prodi tidak
+    # perlu join ke users; diperbarui oleh update_my_identity
+    author_prodi = Column(String(255), nullable=True)
+
     # Likes, dislikes
     likes = Column(Integer, default=0)
     dislikes = Column(Integer, default=0)
 
+    # Jumlah komentar (denormalisasi), dijaga atomik oleh add_comment
+    comment_count = Column(Integer, nullable=False, default=0, server_default='0')
+
+    # Versi representasi post, dinaikkan oleh like/dislike, rekomendasi dan
+    # komentar. Dipakai sebagai dasar ETag.
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+
+    # Skor ranking feed "hot", dihitung ulang secara berkala oleh utils.hot.HotRanker
+    hot_score = Column(Float, nullable=False, default=0, server_default='0')
+
     # Relasi komentar
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
 
@@ -75,3 +104,9 @@ class Post(Base):
     )
     
     post_interactions = relationship("PostInteraction", back_populates="post")
+
+    def bump_version(self):
+        """
+        Naikkan versi secara atomik di database (UPDATE ... SET version = version + 1).
+        """
+        self.version = Post.version + 1
@@ -1,3 +1,16 @@
+# Batas rate default per nama route: "<scope> <jumlah>/<detik>", scope
+# ``ip`` atau ``user`` (id dari JWT, jatuh ke IP jika belum login). Bisa
+# diganti lewat setting ``ratelimit.routes`` (lihat utils/ratelimit.py).
+RATE_LIMITS = {
+    'login': ('ip 10/60',),
+    'register': ('ip 5/60',),
+    'change_password': ('user 5/60',),
+    'list_posts': ('user 60/60', 'ip 300/60'),
+    'search_posts': ('user 60/60',),
+    'interactions_batch': ('user 30/60',),
+}
+
+
 def includeme(config):
                 """Add routes to the config."""
                 config.add_static_view('static', 'static', cache_max_age=3600)
@@ -6,10 +19,17 @@ def includeme(config):
                 config.add_route('home', '/')
                 
                  # Post routes
+                # GET /api/posts?ids= (ambil banyak post); POST tetap ke create_post
+                config.add_route('get_posts', '/api/posts', request_method='GET')
                 config.add_route('create_post', '/api/posts')
                 config.add_route('list_posts', '/api/posts/all')
+                config.add_route('search_posts', '/api/posts/search')
+                config.add_route('recommended_posts', '/api/posts/recommended')
                 config.add_route('get_post', '/api/posts/{id}')
                 
+                # Autocomplete
+                config.add_route('suggest', '/api/suggest')
+
                 # Recommend Posts                
                 config.add_route('recommend_post', '/api/posts/{id}/recommend')
                 config.add_route('unrecommend_post', '/api/posts/{id}/unrecommend')
@@ -22,8 +42,21 @@ def includeme(config):
                 config.add_route('like_post', '/api/posts/{id}/like')
                 config.add_route('dislike_post', '/api/posts/{id}/dislike')
                 
+                # Batch like/dislike
+                config.add_route('interactions_batch', '/api/interactions/batch')
+
+                # Delta sync
+                config.add_route('sync', '/api/sync')
+
+                # Server-Sent Events
+                config.add_route('stream', '/api/stream')
+
                 # Auth
                 config.add_route("register", "/api/register")
                 config.add_route("login", "/api/login")
                 config.add_route("me", "/api/me")
-                config.add_route("change_password", "/api/change-password") 
+                config.add_route("change_password", "/api/change-password")
+
+                # Metrik operasional dan ekspor data (admin)
+                config.add_route('metrics', '/api/metrics')
+                config.add_route('export', '/api/admin/export')
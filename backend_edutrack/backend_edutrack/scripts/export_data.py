@@ -0,0 +1,55 @@
+import argparse
+import sys
+import time
+
+from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy.exc import OperationalError
+
+from ..utils.export import ENTITIES, FORMATS, export_chunks
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Ekspor post, komentar, dan interaksi sebagai NDJSON atau CSV (streaming).',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument('--entity', choices=ENTITIES + ('all',), default='all',
+                        help="Entitas yang diekspor; 'all' hanya untuk NDJSON")
+    parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--gzip', action='store_true', help='Kompres hasil dengan gzip')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Baris per fetch dari cursor')
+    parser.add_argument('-o', '--output', default='-', help="File tujuan (default '-' untuk stdout)")
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    entities = ENTITIES if args.entity == 'all' else (args.entity,)
+    if args.format == 'csv' and len(entities) != 1:
+        print('Format CSV hanya untuk satu entitas; pilih --entity.', file=sys.stderr)
+        return 1
+
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+    engine = env['registry']['dbsession_factory'].kw['bind']
+
+    started = time.perf_counter()
+    written = 0
+    output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        for chunk in export_chunks(engine, entities, args.format, args.batch_size, args.gzip):
+            output.write(chunk)
+            written += len(chunk)
+    except OperationalError as e:
+        print('Gagal membaca database: %s' % e, file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        env['closer']()
+
+    print('%d byte diekspor dalam %.2f detik.' % (written, time.perf_counter() - started), file=sys.stderr)
+    return 0
@@ -0,0 +1,239 @@
+"""
+Impor banyak pengguna sekaligus dari file CSV (misalnya satu angkatan
+mahasiswa baru).
+
+Kolom yang dibaca: ``name``, ``email``, ``nim``, ``prodi``, dan opsional
+``password``. Role diturunkan dari domain email seperti pada registrasi;
+email di luar domain ITERA ditolak, NIM dan prodi hanya disimpan untuk
+Mahasiswa. Baris tanpa kolom ``password`` mendapat password acak per
+pengguna (bukan NIM, yang mudah ditebak) yang ditulis ke file
+``--passwords-output`` (CSV ``email,password``, mode 0600) untuk dibagikan; pengguna dapat menggantinya lewat ``/api/change-password``.
+
+Email dan NIM yang sudah terdaftar diambil sekali di awal ke dalam set,
+sehingga pengecekan duplikasi (termasuk duplikasi di dalam file) tidak
+membutuhkan query per baris. Hash bcrypt dihitung paralel di process pool
+dan baris di-insert per batch, satu transaksi per batch.
+
+Index autocomplete server disimpan di memori proses server, jadi pengguna
+hasil impor muncul di ``/api/suggest`` setelah pembaruan berkala berikutnya
+(``suggest.refresh_interval``).
+
+Contoh:
+
+    import_backend_edutrack_users development.ini angkatan2026.csv --workers 8 \
+        --passwords-output password-angkatan2026.csv
+"""
+import argparse
+import csv
+import os
+import secrets
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.hash import bcrypt
+from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from ..models import User
+from ..views.auth import get_role_from_email
+
+REQUIRED_COLUMNS = ('name', 'email')
+
+# Byte acak per password awal (16 karakter base64 URL-safe)
+PASSWORD_BYTES = 12
+
+
+def generate_password():
+    return secrets.token_urlsafe(PASSWORD_BYTES)
+
+
+def hash_password(password, rounds=None):
+    """Hash bcrypt seperti ``register``; dijalankan di proses worker."""
+    hasher = bcrypt.using(rounds=rounds) if rounds else bcrypt
+    return hasher.hash(password)
+
+
+def load_existing(dbsession):
+    """Set email dan set NIM yang sudah terdaftar, diambil dengan satu query."""
+    emails, nims = set(), set()
+    for email, nim in dbsession.execute(select(User.email, User.nim)):
+        emails.add(email)
+        if nim:
+            nims.add(nim)
+    return emails, nims
+
+
+def validate_rows(rows, emails, nims, generate=generate_password):
+    """
+    Periksa baris CSV (dict) terhadap ``emails``/``nims``, yang ikut
+    diperbarui agar duplikasi di dalam file juga tertangkap. Mengembalikan
+    ``(pengguna_valid, [(nomor_baris, alasan), ...], [(email, password), ...])``;
+    list terakhir berisi password hasil ``generate`` untuk baris tanpa kolom
+    password. Password pengguna valid masih berupa teks biasa.
+    """
+    users, errors, generated = [], [], []
+    # Baris 1 adalah header
+    for line, row in enumerate(rows, start=2):
+        name = (row.get('name') or '').strip()
+        email = (row.get('email') or '').strip()
+        nim = (row.get('nim') or '').strip() or None
+        prodi = (row.get('prodi') or '').strip() or None
+
+        if not name or not email:
+            errors.append((line, "Field tidak lengkap."))
+            continue
+        role = get_role_from_email(email)
+        if role == "Tamu":
+            errors.append((line, "Domain email tidak diizinkan."))
+            continue
+        if role != "Mahasiswa":
+            nim = prodi = None
+        if email in emails:
+            errors.append((line, "Email sudah terdaftar."))
+            continue
+        if nim is not None and (nim in nims or len(nim) > 20):
+            errors.append((line, "NIM sudah terdaftar." if nim in nims else "NIM tidak valid."))
+            continue
+        password = (row.get('password') or '').strip()
+        if not password:
+            password = generate()
+            generated.append((email, password))
+
+        emails.add(email)
+        if nim is not None:
+            nims.add(nim)
+        users.append({
+            "name": name,
+            "email": email,
+            "password": password,
+            "role": role,
+            "prodi": prodi,
+            "nim": nim,
+        })
+    return users, errors, generated
+
+
+def write_passwords(path, generated):
+    """Tulis ``email,password`` ke ``path`` yang hanya bisa dibaca pemiliknya."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    # Mode di os.open hanya berlaku untuk file baru
+    os.fchmod(fd, 0o600)
+    with open(fd, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(('email', 'password'))
+        writer.writerows(generated)
+
+
+def import_users(session_factory, users, hashes, batch_size=1000, progress=None):
+    """
+    Insert ``users`` per ``batch_size`` baris. ``hashes`` adalah iterable
+    hash password dengan urutan yang sama (boleh berupa iterator hasil
+    process pool, sehingga insert berjalan sambil hashing berlanjut).
+    Mengembalikan jumlah pengguna yang di-insert.
+    """
+    inserted = 0
+    batch = []
+    for user, hashed in zip(users, hashes):
+        batch.append(dict(user, password=hashed))
+        if len(batch) >= batch_size:
+            inserted += _insert_batch(session_factory, batch)
+            batch = []
+            if progress is not None:
+                progress(inserted)
+    if batch:
+        inserted += _insert_batch(session_factory, batch)
+        if progress is not None:
+            progress(inserted)
+    return inserted
+
+
+def _insert_batch(session_factory, batch):
+    with session_factory() as dbsession:
+        dbsession.execute(insert(User), batch)
+        dbsession.commit()
+    return len(batch)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Impor pengguna dari CSV (name, email, nim, prodi[, password]).',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument('csv_path', help='File CSV dengan baris header')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Jumlah proses untuk hashing bcrypt (default: jumlah CPU)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Baris per INSERT/transaksi')
+    parser.add_argument('--rounds', type=int, default=None, help='Cost bcrypt (default: sama dengan registrasi)')
+    parser.add_argument('--passwords-output', default=None,
+                        help='File CSV tujuan password acak untuk baris tanpa kolom password')
+    parser.add_argument('--dry-run', action='store_true', help='Hanya validasi, tanpa menyimpan')
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+
+    try:
+        with open(args.csv_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or ())]
+            if missing:
+                print('Kolom wajib tidak ada di CSV: %s' % ', '.join(missing))
+                return 1
+            rows = list(reader)
+
+        session_factory = env['registry']['dbsession_factory']
+        with session_factory() as dbsession:
+            emails, nims = load_existing(dbsession)
+        users, errors, generated = validate_rows(rows, emails, nims)
+        for line, reason in errors:
+            print('Baris %d dilewati: %s' % (line, reason))
+        print('%d baris valid, %d dilewati, %d password dibuat acak.' % (len(users), len(errors), len(generated)))
+        if generated and not args.dry_run and not args.passwords_output:
+            print('Ada baris tanpa kolom password; isi --passwords-output untuk menyimpan password acaknya.')
+            return 1
+        if args.dry_run or not users:
+            return 0
+        if generated:
+            # Ditulis sebelum insert agar tidak ada password yang hilang jika
+            # impor berhenti di tengah jalan
+            write_passwords(args.passwords_output, generated)
+            print('Password acak ditulis ke %s.' % args.passwords_output)
+
+        started = time.perf_counter()
+
+        def progress(done):
+            elapsed = time.perf_counter() - started
+            print('%d/%d pengguna tersimpan (%.0f pengguna/detik)' % (done, len(users), done / elapsed))
+
+        passwords = [user["password"] for user in users]
+        rounds = [args.rounds] * len(users)
+        if args.workers > 1:
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                hashes = pool.map(hash_password, passwords, rounds,
+                                  chunksize=max(1, min(64, len(users) // (args.workers * 4))))
+                inserted = import_users(session_factory, users, hashes, args.batch_size, progress)
+        else:
+            hashes = map(hash_password, passwords, rounds)
+            inserted = import_users(session_factory, users, hashes, args.batch_size, progress)
+    except IntegrityError as e:
+        # Pengguna yang mendaftar bersamaan dengan impor; batch yang sudah
+        # ter-commit tetap tersimpan
+        print('Gagal menyimpan batch karena email/NIM bentrok: %s' % e.orig)
+        return 1
+    except OperationalError as e:
+        print('Gagal mengakses database: %s' % e)
+        return 1
+    finally:
+        env['closer']()
+
+    elapsed = time.perf_counter() - started
+    print('%d pengguna diimpor dalam %.2f detik (%.0f pengguna/detik).' % (inserted, elapsed, inserted / elapsed))
+    return 0
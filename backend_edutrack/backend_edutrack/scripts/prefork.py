@@ -0,0 +1,357 @@
+"""
+Server produksi multi-proses (prefork) di atas waitress.
+
+Master memuat aplikasi sekali (preload), membuka socket ``listen`` dari
+``[server:main]``, lalu mem-fork N worker. Setiap worker menjalankan waitress
+dengan thread pool sendiri pada socket yang sama dan membuat engine database
+sendiri setelah fork. Worker tidak berbagi state (shared-nothing): cache
+respons, index autocomplete, dan job ``hot_score`` berjalan per worker.
+
+Agar halaman memori hasil preload tetap dibagi copy-on-write, garbage
+collector dimatikan di master dan ``gc.freeze()`` dipanggil tepat sebelum
+fork (lihat dokumentasi modul ``gc``).
+
+Sinyal untuk master:
+
+- ``TERM``/``INT``: berhenti dengan anggun (worker menyelesaikan request
+  yang sedang berjalan, paling lama ``prefork.graceful_timeout`` detik)
+- ``HUP``: reload tanpa downtime. Master di-exec ulang dengan socket yang
+  sama dan memuat kode baru. Worker baru dijalankan dulu, baru worker lama
+  dihentikan dengan anggun. Jika kode baru gagal dimuat, worker lama tetap
+  melayani. Master tanpa aplikasi tidak bisa mem-fork pengganti, jadi begitu
+  ada worker lama yang berhenti (misalnya karena ``max_requests``) master
+  di-exec ulang untuk mencoba memuat kode lagi. Jika masih gagal dan tidak ada
+  worker yang tersisa, master keluar dengan kode bukan nol.
+
+Setting di ``[app:main]`` (bisa ditimpa argumen baris perintah):
+
+- ``prefork.workers`` (default jumlah CPU)
+- ``prefork.max_requests`` (default 0 = tidak pernah): worker diganti setelah
+  sekian request, ditambah acak hingga ``prefork.max_requests_jitter``
+- ``prefork.graceful_timeout`` (detik, default 30)
+"""
+import argparse
+import gc
+import itertools
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+
+from pyramid.paster import get_app, setup_logging
+
+log = logging.getLogger(__name__)
+
+MODULE = 'backend_edutrack.scripts.prefork'
+FDS_ENV = 'BACKEND_EDUTRACK_PREFORK_FDS'
+OLD_WORKERS_ENV = 'BACKEND_EDUTRACK_PREFORK_OLD_WORKERS'
+# Opsi [server:main] yang ditangani master, bukan waitress di worker
+MASTER_SERVER_OPTIONS = ('use', 'listen', 'host', 'port', 'unix_socket', 'sockets')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Jalankan aplikasi dengan beberapa proses worker waitress.',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., production.ini',
+    )
+    parser.add_argument('--workers', type=int, help='jumlah proses worker')
+    parser.add_argument('--max-requests', type=int, help='ganti worker setelah sekian request (0 = tidak pernah)')
+    parser.add_argument('--max-requests-jitter', type=int, help='tambahan acak untuk --max-requests')
+    parser.add_argument('--graceful-timeout', type=float, help='batas waktu (detik) worker menyelesaikan request')
+    return parser.parse_args(argv[1:])
+
+
+def worker_options(args, settings):
+    def pick(value, name, default, cast):
+        if value is not None:
+            return value
+        return cast(settings.get(name, default))
+
+    return {
+        "workers": pick(args.workers, 'prefork.workers', os.cpu_count() or 1, int),
+        "max_requests": pick(args.max_requests, 'prefork.max_requests', 0, int),
+        "max_requests_jitter": pick(args.max_requests_jitter, 'prefork.max_requests_jitter', 0, int),
+        "graceful_timeout": pick(args.graceful_timeout, 'prefork.graceful_timeout', 30, float),
+    }
+
+
+def server_settings(config_uri):
+    import plaster
+
+    return dict(plaster.get_loader(config_uri, protocols=['wsgi']).get_settings('server:main'))
+
+
+def bind_sockets(listen, backlog=1024):
+    from waitress.adjustments import Adjustments
+
+    sockets = []
+    for family, socktype, proto, sockaddr in Adjustments(listen=listen).listen:
+        sock = socket.socket(family, socktype, proto)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(sockaddr)
+        sock.listen(backlog)
+        sockets.append(sock)
+    return sockets
+
+
+def inherited_sockets():
+    fds = os.environ.pop(FDS_ENV, '')
+    return [socket.socket(fileno=int(fd)) for fd in fds.split(',') if fd]
+
+
+class RequestLimit:
+    """Middleware WSGI yang memanggil ``on_limit`` sekali setelah ``limit`` request."""
+
+    def __init__(self, app, limit, on_limit):
+        self.app = app
+        self.limit = limit
+        self.on_limit = on_limit
+        self._count = itertools.count(1)
+
+    def __call__(self, environ, start_response):
+        if next(self._count) == self.limit:
+            self.on_limit()
+        return self.app(environ, start_response)
+
+
+def prepare_master(app):
+    """Pastikan tidak ada thread atau koneksi database milik master yang ikut ter-fork."""
+    registry = app.registry
+    ranker = registry.get('hot_ranker')
+    if ranker is not None:
+        ranker.stop()
+    registry['dbsession_factory'].kw['bind'].dispose()
+
+
+def run_worker(app, sockets, server_kw, max_requests, graceful_timeout):
+    from waitress import create_server, wasyncore
+    from waitress.server import BaseWSGIServer
+
+    from ..models import rebind_engine
+
+    gc.enable()
+    registry = app.registry
+    engine = rebind_engine(registry)
+    ranker = registry.get('hot_ranker')
+    if ranker is not None:
+        ranker.start(registry['dbsession_factory'])
+
+    state = {"stopping": False}
+
+    def stop(signum=None, frame=None):
+        state["stopping"] = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    if max_requests:
+        app = RequestLimit(app, max_requests, stop)
+    server = create_server(app, sockets=sockets, **server_kw)
+    socket_map = server.map if hasattr(server, 'map') else server._map
+    listeners = [d for d in socket_map.values() if isinstance(d, BaseWSGIServer)]
+    timeout = server.adj.asyncore_loop_timeout
+
+    while not state["stopping"]:
+        wasyncore.loop(timeout=timeout, map=socket_map, count=1)
+
+    # Berhenti menerima koneksi; worker lain tetap melayani socket yang sama
+    for listener in listeners:
+        listener.accepting = False
+        listener.del_channel()
+        listener.socket.close()
+
+    deadline = time.monotonic() + graceful_timeout
+    while time.monotonic() < deadline:
+        channels = [c for listener in listeners for c in listener.active_channels.values()]
+        if not channels:
+            break
+        for channel in channels:
+            if not channel.requests:
+                # Koneksi keep-alive yang sedang idle ditutup
+                channel.will_close = True
+        wasyncore.loop(timeout=0.1, map=socket_map, count=1)
+
+    server.task_dispatcher.shutdown()
+    wasyncore.close_all(socket_map)
+    if ranker is not None:
+        ranker.stop(timeout=5)
+    engine.dispose()
+
+
+class Arbiter:
+
+    def __init__(self, app, sockets, server_kw, argv, workers=1, max_requests=0,
+                 max_requests_jitter=0, graceful_timeout=30.0):
+        self.app = app
+        self.sockets = sockets
+        self.server_kw = server_kw
+        self.argv = argv
+        self.num_workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.workers = {}      # pid -> waktu mulai
+        self.retiring = set()  # worker lama yang sedang dihentikan
+        self.signals = []
+
+    def spawn(self):
+        limit = 0
+        if self.max_requests:
+            limit = self.max_requests + random.randint(0, self.max_requests_jitter)
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sockets, self.server_kw, limit, self.graceful_timeout)
+            except BaseException:
+                log.exception("Worker %d berhenti karena error", os.getpid())
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        log.info("Worker %d dijalankan", pid)
+
+    def reap(self):
+        """Kumpulkan worker yang sudah selesai; kembalikan True jika ada yang crash cepat."""
+        crashed = False
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            started = self.workers.pop(pid, None)
+            self.retiring.discard(pid)
+            code = os.waitstatus_to_exitcode(status)
+            log.info("Worker %d selesai (kode %s)", pid, code)
+            if started is not None and code != 0 and time.monotonic() - started < 1:
+                crashed = True
+        return crashed
+
+    def kill_workers(self, pids, sig):
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def handle_signal(self, signum, frame):
+        self.signals.append(signum)
+
+    def run(self, old_workers=()):
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, self.handle_signal)
+
+        if self.app is None:
+            # Kode baru gagal dimuat saat reload: worker lama tetap dipakai,
+            # dan jumlahnya menjadi target yang dijaga maintain_workers
+            self.workers.update((pid, time.monotonic()) for pid in old_workers)
+            self.num_workers = len(self.workers)
+        else:
+            for _ in range(self.num_workers):
+                self.spawn()
+            self.retiring.update(old_workers)
+            self.kill_workers(old_workers, signal.SIGTERM)
+
+        while True:
+            while self.signals:
+                signum = self.signals.pop(0)
+                if signum in (signal.SIGTERM, signal.SIGINT):
+                    return self.stop()
+                if signum == signal.SIGHUP:
+                    self.reload()
+            if self.reap():
+                # Hindari loop fork yang terus crash (misalnya database mati)
+                time.sleep(1)
+            self.maintain_workers()
+            time.sleep(0.5)
+
+    def maintain_workers(self):
+        """Jalankan worker pengganti hingga ``num_workers``."""
+        if len(self.workers) >= self.num_workers:
+            return
+        if self.app is None:
+            log.warning("Worker lama tersisa %d dari %d dan aplikasi belum termuat; memuat ulang kode",
+                        len(self.workers), self.num_workers)
+            self.reload()
+            return
+        while len(self.workers) < self.num_workers:
+            self.spawn()
+
+    def stop(self):
+        log.info("Menghentikan %d worker", len(self.workers) + len(self.retiring))
+        pids = set(self.workers) | self.retiring
+        self.kill_workers(pids, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while (self.workers or self.retiring) and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        self.kill_workers(set(self.workers) | self.retiring, signal.SIGKILL)
+        self.reap()
+        for sock in self.sockets:
+            sock.close()
+        return 0
+
+    def reload(self):
+        log.info("Reload: menjalankan ulang master dengan kode baru")
+        for sock in self.sockets:
+            os.set_inheritable(sock.fileno(), True)
+        env = dict(os.environ)
+        env[FDS_ENV] = ','.join(str(sock.fileno()) for sock in self.sockets)
+        env[OLD_WORKERS_ENV] = ','.join(str(pid) for pid in set(self.workers) | self.retiring)
+        logging.shutdown()
+        os.execve(sys.executable, [sys.executable, '-m', MODULE] + list(self.argv[1:]), env)
+
+
+def main(argv=sys.argv):
+    # Matikan GC sejak awal agar objek hasil preload tidak meninggalkan
+    # "lubang" di halaman memori yang dibagi ke worker
+    gc.disable()
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+
+    old_workers = [int(pid) for pid in os.environ.pop(OLD_WORKERS_ENV, '').split(',') if pid]
+    sockets = inherited_sockets()
+
+    try:
+        app = get_app(args.config_uri)
+    except Exception:
+        if not old_workers:
+            log.exception("Gagal memuat aplikasi")
+            for sock in sockets:
+                sock.close()
+            return 1
+        log.exception("Gagal memuat aplikasi; worker lama tetap berjalan")
+        app = None
+
+    server_kw = server_settings(args.config_uri)
+    if not sockets:
+        sockets = bind_sockets(server_kw.get('listen', '0.0.0.0:6543'), int(server_kw.get('backlog', 1024)))
+    server_kw = {key: value for key, value in server_kw.items() if key not in MASTER_SERVER_OPTIONS}
+
+    settings = app.registry.settings if app is not None else {}
+    options = worker_options(args, settings)
+    if app is not None:
+        prepare_master(app)
+
+    addresses = ', '.join(str(sock.getsockname()) for sock in sockets)
+    if app is None:
+        log.info("Master %d melayani %s dengan %d worker lama", os.getpid(), addresses, len(old_workers))
+    else:
+        log.info("Master %d melayani %s dengan %d worker", os.getpid(), addresses, options["workers"])
+    arbiter = Arbiter(app, sockets, server_kw, argv, **options)
+    return arbiter.run(old_workers)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import argparse
+import sys
+import time
+
+from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy.exc import OperationalError
+
+from ..utils.search import get_search_backend
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Bangun ulang index full-text search untuk semua post.',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+
+    backend = get_search_backend(env['request'])
+    if backend is None:
+        print('Database ini tidak mendukung full-text search.')
+        return 1
+
+    started = time.perf_counter()
+    try:
+        with env['request'].tm:
+            connection = env['request'].dbsession.connection()
+            backend.reindex(connection)
+    except OperationalError as e:
+        print('Gagal membangun ulang index pencarian: %s' % e)
+        return 1
+    finally:
+        env['closer']()
+
+    print('Index pencarian selesai dibangun ulang dalam %.2f detik.' % (time.perf_counter() - started))
+    return 0
@@ -0,0 +1,125 @@
+import pytest
+from unittest.mock import MagicMock
+from pyramid import testing
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.urldispatch import RoutesMapper
+
+from backend_edutrack.utils.admission import AdmissionController, admission_tween_factory
+from backend_edutrack.views.metrics import metrics
+
+
+def make_controller(**kwargs):
+    kwargs.setdefault('low_priority_routes', ['list_posts'])
+    kwargs.setdefault('exclude_routes', ['stream'])
+    return AdmissionController(**kwargs)
+
+
+class TestAdmissionController:
+
+    def test_low_priority_shed_at_max_in_flight(self):
+        controller = make_controller(max_in_flight=2)
+
+        assert controller.admit('login', False, now=0)
+        assert controller.admit('list_posts', True, now=0)
+        assert not controller.admit('list_posts', True, now=0)
+        # Prioritas tinggi tetap diterima melewati batas
+        assert controller.admit('comment_add', False, now=0)
+
+        metrics = controller.metrics(now=0)
+        assert metrics["in_flight"] == 3
+        assert metrics["shed_by_route"] == {'list_posts': 1}
+
+    def test_high_latency_sheds_until_it_decays(self):
+        controller = make_controller(latency_target=1.0, latency_window=5.0)
+        controller.admit('login', False, now=0)
+        controller.release(4.0, now=0)
+
+        assert not controller.admit('list_posts', True, now=1)
+        # 4 detik meluruh ke 1 detik setelah dua kali latency_window
+        assert controller.admit('list_posts', True, now=10.1)
+
+    def test_ewma_follows_recent_samples(self):
+        controller = make_controller(latency_window=1e9)
+        for elapsed in (1.0, 0.0):
+            controller.admit('get_post', False, now=0)
+            controller.release(elapsed, now=0)
+
+        assert controller.metrics(now=0)["latency_ms"] == 800.0
+        assert controller.metrics(now=0)["in_flight"] == 0
+
+    def test_only_reads_are_low_priority(self):
+        controller = make_controller()
+
+        assert controller.is_low_priority('list_posts', 'GET')
+        assert not controller.is_low_priority('list_posts', 'POST')
+        assert not controller.is_low_priority('login', 'GET')
+
+
+class TestAdmissionTween:
+
+    def tween(self, controller, handler):
+        mapper = RoutesMapper()
+        mapper.connect('list_posts', '/api/posts/all')
+        mapper.connect('login', '/api/login')
+        mapper.connect('stream', '/api/stream')
+        registry = MagicMock(get={'admission': controller}.get, settings={'admission.retry_after': '3'})
+        registry.queryUtility.return_value = mapper
+        return admission_tween_factory(handler, registry)
+
+    def test_overloaded_low_priority_gets_503(self):
+        controller = make_controller(max_in_flight=0)
+        handler = MagicMock(return_value=Response(json_body={}))
+        tween = self.tween(controller, handler)
+
+        shed = tween(Request.blank('/api/posts/all'))
+        login = tween(Request.blank('/api/login', method='POST'))
+
+        assert shed.status_code == 503
+        assert shed.headers['Retry-After'] == '3'
+        assert login.status_code == 200
+        handler.assert_called_once()
+        assert controller.metrics()["in_flight"] == 0
+
+    def test_excluded_routes_not_counted(self):
+        controller = make_controller()
+        seen = []
+        tween = self.tween(controller, lambda request: seen.append(controller.metrics()["in_flight"]))
+
+        tween(Request.blank('/api/stream'))
+        tween(Request.blank('/api/login'))
+
+        assert seen == [0, 1]
+        assert controller.metrics()["admitted"] == 1
+
+    def test_in_flight_released_on_error(self):
+        controller = make_controller()
+        tween = self.tween(controller, MagicMock(side_effect=RuntimeError))
+
+        with pytest.raises(RuntimeError):
+            tween(Request.blank('/api/login'))
+
+        assert controller.metrics()["in_flight"] == 0
+
+
+class TestMetricsView:
+
+    @pytest.fixture(autouse=True)
+    def config(self):
+        with testing.testConfig(settings={'admin.user_ids': '1 7'}) as config:
+            yield config
+
+    def make_request(self, user_id):
+        request = testing.DummyRequest()
+        request.user = {"id": user_id}
+        return request
+
+    def test_admin_sees_admission_metrics(self, config):
+        config.registry['admission'] = make_controller()
+
+        result = metrics(self.make_request(7))
+
+        assert result["admission"]["in_flight"] == 0
+
+    def test_non_admin_forbidden(self):
+        assert metrics(self.make_request(2)).status_code == 403
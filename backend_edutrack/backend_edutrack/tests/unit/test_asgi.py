@@ -0,0 +1,282 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from backend_edutrack.asgi import AsgiAdapter, build_environ, call_wsgi
+from backend_edutrack.utils.events import EventBroker
+from backend_edutrack.views.stream import EventStream
+
+
+def scope_for(method='GET', path='/api/posts/1', query=b'', headers=()):
+    return {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': list(headers),
+        'server': ('127.0.0.1', 6543),
+        'client': ('10.0.0.1', 5000),
+    }
+
+
+def run_http(app, scope, body=b''):
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def hello_app(environ, start_response):
+    start_response('201 Created', [('Content-Type', 'text/plain'), ('X-Thread', threading.current_thread().name)])
+    return [environ['REQUEST_METHOD'].encode(), b':', environ['wsgi.input'].read()]
+
+
+class TestBuildEnviron:
+
+    def test_maps_scope_to_wsgi(self):
+        environ = build_environ(scope_for(
+            path='/api/posts/é',
+            query=b'a=1&b=2',
+            headers=[(b'content-type', b'application/json'), (b'authorization', b'Bearer x'),
+                     (b'accept', b'a'), (b'accept', b'b')],
+        ), b'{}')
+
+        assert environ['PATH_INFO'] == '/api/posts/é'.encode('utf-8').decode('latin-1')
+        assert environ['QUERY_STRING'] == 'a=1&b=2'
+        assert environ['CONTENT_TYPE'] == 'application/json'
+        assert environ['HTTP_AUTHORIZATION'] == 'Bearer x'
+        assert environ['HTTP_ACCEPT'] == 'a,b'
+        assert environ['REMOTE_ADDR'] == '10.0.0.1'
+        assert environ['wsgi.input'].read() == b'{}'
+
+
+class TestCallWsgi:
+
+    def test_joins_body(self):
+        def app(environ, start_response):
+            start_response('200 OK', [])
+            return [b'a', b'b']
+
+        assert call_wsgi(app, {}) == ('200 OK', [], b'ab')
+
+    def test_generator_is_passed_through(self):
+        def app(environ, start_response):
+            start_response('200 OK', [])
+            return (chunk for chunk in [b'a', b'b'])
+
+        body = call_wsgi(app, {})[2]
+        assert not isinstance(body, bytes)
+        assert list(body) == [b'a', b'b']
+
+    def test_async_iterable_is_passed_through(self):
+        stream = EventStream(EventBroker(), None)
+
+        def app(environ, start_response):
+            start_response('200 OK', [])
+            return stream
+
+        assert call_wsgi(app, {})[2] is stream
+
+
+class TestAsgiAdapter:
+
+    @pytest.fixture
+    def adapter(self):
+        hello_app.registry = {}
+        adapter = AsgiAdapter(hello_app, MagicMock(), threads=1, thread_paths=['/api/suggest'])
+        yield adapter
+        adapter.executor.shutdown()
+
+    def test_dispatch(self, adapter):
+        assert adapter.runs_async('GET', '/api/posts/1')
+        assert adapter.runs_async('HEAD', '/api/posts/all')
+        assert not adapter.runs_async('POST', '/api/posts')
+        assert not adapter.runs_async('GET', '/api/suggest')
+
+    def test_writes_run_in_thread_pool(self, adapter):
+        sent = run_http(adapter, scope_for('POST', '/api/posts'), b'isi')
+
+        assert sent[0]['status'] == 201
+        headers = dict(sent[0]['headers'])
+        assert headers[b'x-thread'].startswith(b'asgi')
+        assert sent[1]['body'] == b'POST:isi'
+
+    def test_reads_use_async_session(self, adapter):
+        async def call_async(environ):
+            return call_wsgi(hello_app, environ)
+
+        adapter.call_async = MagicMock(side_effect=call_async)
+
+        sent = run_http(adapter, scope_for('GET', '/api/posts/1'))
+
+        adapter.call_async.assert_called_once()
+        assert sent[1]['body'] == b'GET:'
+
+    def test_generator_body_is_streamed_from_one_thread(self, adapter):
+        threads = set()
+
+        def export_like(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'application/x-ndjson')])
+
+            def chunks():
+                for i in range(3):
+                    threads.add(threading.current_thread().name)
+                    yield b'%d\n' % i
+            return chunks()
+
+        adapter.wsgi_app = export_like
+
+        sent = run_http(adapter, scope_for('GET', '/api/suggest'))
+
+        assert [m['body'] for m in sent[1:]] == [b'0\n', b'1\n', b'2\n', b'']
+        assert all(m['more_body'] for m in sent[1:-1])
+        assert len(threads) == 1 and threads.pop().startswith('asgi')
+
+    def test_event_stream_is_sent_incrementally(self, adapter):
+        broker = EventBroker()
+        subscriber = broker.subscribe([1])
+        stream = EventStream(broker, subscriber, heartbeat=0.05, max_duration=0.3)
+
+        async def call_async(environ):
+            return '200 OK', [('Content-Type', 'text/event-stream')], stream
+
+        adapter.call_async = call_async
+        # Publish dari thread lain, seperti ChangeFeed
+        threading.Timer(0.1, lambda: broker.publish([{"id": 1, "post_id": 1, "frame": b"id: 1\n\n"}])).start()
+
+        sent = run_http(adapter, scope_for('GET', '/api/stream', b'post_ids=1'))
+
+        bodies = [m['body'] for m in sent[1:]]
+        assert bodies[0].startswith(b'retry:')
+        assert b'id: 1\n\n' in bodies
+        assert bodies[-1] == b''
+        assert broker.subscriber_count() == 0
+
+
+class TestAsyncIntegration:
+
+    def make_app(self, tmp_path, **settings):
+        pytest.importorskip('aiosqlite')
+        pytest.importorskip('greenlet')
+        from sqlalchemy import create_engine
+        from backend_edutrack.asgi import main
+        from backend_edutrack.models import Base, Post, User
+        from sqlalchemy.orm import Session
+
+        db_path = os.path.join(str(tmp_path), 'asgi.sqlite')
+        engine = create_engine('sqlite:///' + db_path)
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(User(id=1, name="Mhs", email="m@student.itera.ac.id", password="x", role="Mahasiswa"))
+            session.add(Post(id=1, title="Judul", content="Isi", author_id=1))
+            session.commit()
+        engine.dispose()
+
+        return main({}, **dict({
+            'sqlalchemy.url': 'sqlite:///' + db_path,
+            'hot.enabled': 'false',
+            'suggest.enabled': 'false',
+        }, **settings))
+
+    def get(self, app, path='/api/posts/1', query=b''):
+        from backend_edutrack.security import create_token
+
+        token = create_token({'id': 1, 'role': 'Mahasiswa', 'name': 'Mhs'})
+        sent = run_http(app, scope_for('GET', path, query, headers=[
+            (b'authorization', ('Bearer ' + token).encode())]))
+        app.executor.shutdown()
+        return sent
+
+    def test_get_post_through_async_engine(self, tmp_path):
+        app = self.make_app(tmp_path)
+        assert app.async_engine.dialect.driver == 'aiosqlite'
+        assert app.registry.get('singleflight') is None
+
+        sent = self.get(app)
+
+        assert sent[0]['status'] == 200
+        assert b'"title": "Judul"' in sent[1]['body']
+
+    def test_statement_timeout_and_breaker_on_async_engine(self, tmp_path):
+        app = self.make_app(tmp_path, **{
+            'db.statement_timeout': '30000',
+            'db.breaker.enabled': 'true',
+        })
+        breaker = app.registry['db_breaker']
+
+        sent = self.get(app)
+
+        assert sent[0]['status'] == 200
+        assert b'"title": "Judul"' in sent[1]['body']
+        assert breaker.metrics()['calls'] > 0
+
+    def test_export_streams_from_thread_pool(self, tmp_path):
+        app = self.make_app(tmp_path, **{'admin.user_ids': '1'})
+        assert not app.runs_async('GET', '/api/admin/export')
+
+        sent = self.get(app, '/api/admin/export', b'entity=posts')
+
+        assert sent[0]['status'] == 200
+        assert sent[1]['more_body'] and sent[-1] == {'type': 'http.response.body', 'body': b''}
+        assert b''.join(m['body'] for m in sent[1:]).startswith(b'{"type": "post", "id": 1')
+
+    def test_slow_queries_do_not_serialize(self, tmp_path):
+        pytest.importorskip('aiosqlite')
+        pytest.importorskip('greenlet')
+        from sqlalchemy import event, text
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        async_engine = create_async_engine('sqlite+aiosqlite:///' + os.path.join(str(tmp_path), 'slow.sqlite'))
+
+        @event.listens_for(async_engine.sync_engine, 'connect')
+        def add_sleep(dbapi_connection, connection_record):
+            # Berjalan di thread aiosqlite, seperti query lambat di database
+            dbapi_connection.create_function('sleep', 1, lambda seconds: time.sleep(seconds) or 1)
+
+        def slow_app(environ, start_response):
+            environ['backend_edutrack.dbsession'].execute(text('SELECT sleep(0.3)'))
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [b'ok']
+
+        slow_app.registry = {}
+        adapter = AsgiAdapter(slow_app, async_engine, threads=1)
+
+        async def request():
+            sent = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                sent.append(message)
+
+            await adapter(scope_for('GET', '/api/posts/1'), receive, send)
+            return sent
+
+        async def run_concurrently():
+            try:
+                return await asyncio.gather(*[request() for _ in range(4)])
+            finally:
+                await async_engine.dispose()
+
+        started = time.monotonic()
+        results = asyncio.run(run_concurrently())
+        elapsed = time.monotonic() - started
+        adapter.executor.shutdown()
+
+        assert [sent[1]['body'] for sent in results] == [b'ok'] * 4
+        # Berurutan akan memakan >= 1.2 detik
+        assert elapsed < 0.9
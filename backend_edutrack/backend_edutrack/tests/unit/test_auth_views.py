@@ -405,6 +405,7 @@ class TestUpdateMyIdentityView:
         assert response.json_body["user"]["name"] == "Nama Baru Mahasiswa"
         assert mock_user_mahasiswa_auth.name == "Nama Baru Mahasiswa" # Ensure user object is updated
         mock_dbsession.flush.assert_called_once()
+        mock_dbsession.execute.assert_not_called()
 
     def test_update_my_identity_success_prodi(self, dummy_request, mock_dbsession, mock_user_mahasiswa_auth):
         dummy_request.user = {"id": mock_user_mahasiswa_auth.id, "role": mock_user_mahasiswa_auth.role}
@@ -420,6 +421,12 @@ class TestUpdateMyIdentityView:
         assert mock_user_mahasiswa_auth.prodi == "Teknik Lingkungan"
         mock_dbsession.flush.assert_called_once()
 
+        # Salinan prodi di post milik user ikut diperbarui dalam transaksi yang sama
+        mock_dbsession.execute.assert_called_once()
+        update_stmt = mock_dbsession.execute.call_args[0][0]
+        assert update_stmt.table.name == "posts"
+        assert update_stmt.compile().params["author_prodi"] == "Teknik Lingkungan"
+
     def test_update_my_identity_success_prodi_to_none(self, dummy_request, mock_dbsession, mock_user_mahasiswa_auth):
         dummy_request.user = {"id": mock_user_mahasiswa_auth.id, "role": mock_user_mahasiswa_auth.role}
         dummy_request.json_body = {"prodi": ""} # Empty string should become None
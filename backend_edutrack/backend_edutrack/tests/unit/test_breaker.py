@@ -0,0 +1,112 @@
+import time
+
+import pytest
+from unittest.mock import MagicMock
+from pyramid.response import Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from backend_edutrack.utils.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    breaker_tween_factory,
+)
+
+
+def trip(breaker, now=0):
+    for _ in range(breaker.min_calls):
+        breaker.record(False, now=now)
+
+
+class TestCircuitBreaker:
+
+    def test_opens_when_failure_ratio_crossed(self):
+        breaker = CircuitBreaker(min_calls=4, failure_ratio=0.5)
+        for success in (True, True, False):
+            breaker.record(success, now=0)
+        assert breaker.state == CLOSED
+
+        breaker.record(False, now=0)
+
+        assert breaker.state == OPEN
+        assert breaker.allow(now=1) == (False, False)
+        assert breaker.retry_after(now=1) == 9
+
+    def test_old_failures_leave_window(self):
+        breaker = CircuitBreaker(window=10, min_calls=4, failure_ratio=0.5)
+        for _ in range(3):
+            breaker.record(False, now=0)
+
+        breaker.record(False, now=20)
+
+        assert breaker.state == CLOSED
+
+    def test_half_open_allows_one_probe(self):
+        breaker = CircuitBreaker(min_calls=2, reset_timeout=10)
+        trip(breaker)
+
+        assert breaker.allow(now=10) == (True, True)
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow(now=10) == (False, False)
+
+        breaker.record(True, now=10)
+
+        assert breaker.state == CLOSED
+        assert breaker.allow(now=10) == (True, False)
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(min_calls=2, reset_timeout=10)
+        trip(breaker)
+        breaker.allow(now=10)
+
+        breaker.record(False, now=10)
+
+        assert breaker.state == OPEN
+        assert breaker.allow(now=15) == (False, False)
+
+    def test_counts_only_operational_errors(self):
+        breaker = CircuitBreaker(min_calls=2, failure_ratio=0.5)
+        engine = create_engine('sqlite://')
+        breaker.attach(engine)
+
+        with engine.connect() as connection:
+            connection.execute(text('CREATE TABLE t (id INTEGER PRIMARY KEY)'))
+            connection.execute(text('INSERT INTO t VALUES (1)'))
+            with pytest.raises(IntegrityError):
+                connection.execute(text('INSERT INTO t VALUES (1)'))
+            assert breaker.metrics()["failures"] == 0
+
+            with pytest.raises(OperationalError):
+                connection.execute(text('SELECT * FROM tidak_ada'))
+
+        assert breaker.metrics()["failures"] == 1
+        assert breaker.metrics()["calls"] == 3
+
+
+class TestBreakerTween:
+
+    def tween(self, breaker, handler):
+        return breaker_tween_factory(handler, MagicMock(get={'db_breaker': breaker}.get))
+
+    def test_open_breaker_returns_503(self):
+        breaker = CircuitBreaker(min_calls=2)
+        trip(breaker, now=time.monotonic())
+        handler = MagicMock()
+
+        response = self.tween(breaker, handler)(MagicMock())
+
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+        handler.assert_not_called()
+
+    def test_probe_without_statements_frees_slot(self):
+        breaker = CircuitBreaker(min_calls=2, reset_timeout=0)
+        trip(breaker)
+        tween = self.tween(breaker, MagicMock(return_value=Response()))
+
+        tween(MagicMock())
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() == (True, True)
@@ -0,0 +1,171 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from datetime import datetime
+
+from backend_edutrack.utils.cache import (
+    MemoryCacheBackend,
+    ResponseCache,
+    invalidate_after_commit,
+)
+from backend_edutrack.views.post import get_post, list_posts
+from backend_edutrack.models.post import Post
+from backend_edutrack.models.user import User
+
+from .conftest import dummy_request, mock_dbsession
+
+
+@pytest.fixture
+def response_cache(dummy_request):
+    cache = ResponseCache(MemoryCacheBackend(max_entries=100), post_ttl=60, feed_ttl=60, feed_pages=2)
+    dummy_request.registry['response_cache'] = cache
+    yield cache
+    # Registry DummyRequest adalah registry global, jadi bersihkan lagi
+    dummy_request.registry.pop('response_cache', None)
+
+
+@pytest.fixture
+def mock_recommended_post():
+    dosen = MagicMock(spec=User)
+    dosen.id = 2
+    dosen.name = "Dosen Test"
+    author = MagicMock(spec=User)
+    author.name = "Mahasiswa Test"
+
+    post = MagicMock(spec=Post)
+    post.id = 101
+    post.title = "Judul"
+    post.content = "Konten"
+    post.created_at = datetime(2025, 5, 27, 10, 0, 0)
+    post.author_id = 1
+    post.author = author
+    post.likes = 3
+    post.dislikes = 0
+    post.references = []
+    post.recommended_by = [dosen]
+    return post
+
+
+class TestMemoryCacheBackend:
+
+    def test_get_set_delete(self):
+        backend = MemoryCacheBackend()
+        backend.set("a", 1)
+        assert backend.get("a") == 1
+        backend.delete("a")
+        assert backend.get("a") is None
+
+    def test_ttl_expiry(self):
+        backend = MemoryCacheBackend()
+        with patch('backend_edutrack.utils.cache.time.monotonic', return_value=100.0):
+            backend.set("a", 1, ttl=5)
+        with patch('backend_edutrack.utils.cache.time.monotonic', return_value=104.0):
+            assert backend.get("a") == 1
+        with patch('backend_edutrack.utils.cache.time.monotonic', return_value=106.0):
+            assert backend.get("a") is None
+
+    def test_lru_eviction(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")  # "a" jadi paling baru dipakai
+        backend.set("c", 3)
+        assert backend.get("b") is None
+        assert backend.get("a") == 1
+        assert backend.get("c") == 3
+
+
+class TestResponseCache:
+
+    def test_invalidate_feed_changes_generation(self):
+        cache = ResponseCache(MemoryCacheBackend())
+        cache.set_feed(1, 10, {"post_ids": [1], "pagination": {}})
+        assert cache.get_feed(1, 10) is not None
+        cache.invalidate_feed()
+        assert cache.get_feed(1, 10) is None
+
+    def test_invalidate_post_keeps_feed(self):
+        cache = ResponseCache(MemoryCacheBackend())
+        cache.set_post(1, {"post": {"id": 1}, "recommender_ids": []})
+        cache.set_feed(1, 10, {"post_ids": [1], "pagination": {}})
+        cache.invalidate_post(1)
+        assert cache.get_post(1) is None
+        assert cache.get_feed(1, 10) is not None
+
+    def test_invalidate_after_commit_uses_hook(self, dummy_request, response_cache):
+        response_cache.set_post(5, {"post": {"id": 5}, "recommender_ids": []})
+        dummy_request.tm = MagicMock()
+
+        invalidate_after_commit(dummy_request, post_ids=[5])
+        assert response_cache.get_post(5) is not None
+
+        hook = dummy_request.tm.get.return_value.addAfterCommitHook.call_args[0][0]
+        hook(False)
+        assert response_cache.get_post(5) is not None
+        hook(True)
+        assert response_cache.get_post(5) is None
+
+
+class TestCachedViews:
+
+    def test_get_post_served_from_cache(self, dummy_request, mock_dbsession, response_cache, mock_recommended_post):
+        dummy_request.matchdict = {"id": "101"}
+        mock_query_chain = MagicMock()
+        mock_query_chain.options.return_value = mock_query_chain
+        mock_query_chain.filter_by.return_value.first.return_value = mock_recommended_post
+        mock_dbsession.query.return_value = mock_query_chain
+
+        first = get_post(dummy_request)
+        second = get_post(dummy_request)
+
+        assert first == second
+        assert mock_dbsession.query.call_count == 1
+
+    def test_get_post_overlays_per_user_field(self, dummy_request, mock_dbsession, response_cache, mock_recommended_post):
+        dummy_request.matchdict = {"id": "101"}
+        mock_query_chain = MagicMock()
+        mock_query_chain.options.return_value = mock_query_chain
+        mock_query_chain.filter_by.return_value.first.return_value = mock_recommended_post
+        mock_dbsession.query.return_value = mock_query_chain
+
+        dummy_request.user = {"id": 2, "role": "Dosen"}
+        assert get_post(dummy_request)["is_recommended_by_current_user"] is True
+
+        dummy_request.user = {"id": 1, "role": "Mahasiswa"}
+        assert get_post(dummy_request)["is_recommended_by_current_user"] is False
+        assert "is_recommended_by_current_user" not in response_cache.get_post(101)["post"]
+
+    def test_list_posts_second_call_uses_cache(self, dummy_request, mock_dbsession, response_cache, mock_recommended_post):
+        query_chain = MagicMock()
+        query_chain.count.return_value = 1
+        query_chain.options.return_value = query_chain
+        query_chain.order_by.return_value = query_chain
+        query_chain.offset.return_value = query_chain
+        query_chain.limit.return_value = query_chain
+        query_chain.all.return_value = [mock_recommended_post]
+        mock_dbsession.query.return_value = query_chain
+        dummy_request.params = {}
+
+        first = list_posts(dummy_request)
+        second = list_posts(dummy_request)
+
+        assert first == second
+        assert second["posts"][0]["id"] == 101
+        assert mock_dbsession.query.call_count == 1
+
+    def test_list_posts_filtered_feed_not_cached(self, dummy_request, mock_dbsession, response_cache):
+        query_chain = MagicMock()
+        query_chain.count.return_value = 0
+        query_chain.filter.return_value = query_chain
+        query_chain.options.return_value = query_chain
+        query_chain.order_by.return_value = query_chain
+        query_chain.offset.return_value = query_chain
+        query_chain.limit.return_value = query_chain
+        query_chain.all.return_value = []
+        mock_dbsession.query.return_value = query_chain
+        dummy_request.params = {"author": "self"}
+        dummy_request.user = {"id": 1}
+
+        list_posts(dummy_request)
+        list_posts(dummy_request)
+
+        assert mock_dbsession.query.call_count == 2
@@ -290,4 +290,23 @@ class TestGetCommentsByPostView:
 
         response = get_comments_by_post(dummy_request)
         assert_json_response(response, 500, {"error": "Terjadi kesalahan server tidak terduga."})
-        dummy_request.log.exception.assert_called_once_with("Unexpected error in get_comments_by_post:")
\ No newline at end of file
+        dummy_request.log.exception.assert_called_once_with("Unexpected error in get_comments_by_post:")
+
+class TestCommentCounter:
+
+    def test_add_comment_increments_counter_in_sql(self, dummy_request, mock_dbsession, mock_user_commenter, mock_post_with_comments):
+        dummy_request.user = {"id": mock_user_commenter.id}
+        dummy_request.json_body = {"post_id": mock_post_with_comments.id, "content": "Komentar"}
+        mock_dbsession.get.side_effect = lambda model, obj_id: {
+            Post: mock_post_with_comments,
+            User: mock_user_commenter
+        }.get(model)
+        mock_dbsession.flush.side_effect = lambda: None
+
+        with patch('backend_edutrack.views.comment.Comment') as MockComment:
+            MockComment.return_value.created_at = datetime(2025, 5, 28, 10, 0, 0)
+            add_comment(dummy_request)
+
+        # Harus berupa ekspresi SQL "comment_count + 1", bukan nilai yang dihitung di Python
+        assert str(mock_post_with_comments.comment_count) == "posts.comment_count + :comment_count_1"
+        mock_post_with_comments.bump_version.assert_called_once()
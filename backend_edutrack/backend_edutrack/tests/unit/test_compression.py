@@ -0,0 +1,90 @@
+import gzip
+import json
+
+import pytest
+from unittest.mock import MagicMock, patch
+from pyramid import testing
+from pyramid.response import Response
+
+from backend_edutrack.utils.compression import (
+    choose_encoding,
+    compress,
+    compression_tween_factory,
+)
+
+
+def make_tween(handler, **settings):
+    registry = MagicMock()
+    registry.settings = settings
+    return compression_tween_factory(handler, registry)
+
+
+def json_response(size):
+    return Response(body=json.dumps({"data": "x" * size}).encode(), content_type='application/json')
+
+
+def make_request(accept_encoding=None):
+    request = testing.DummyRequest()
+    if accept_encoding is not None:
+        request.headers["Accept-Encoding"] = accept_encoding
+    return request
+
+
+class TestChooseEncoding:
+
+    def test_prefers_server_order_on_equal_q(self):
+        assert choose_encoding("gzip, br", ("br", "gzip")) == "br"
+
+    def test_respects_q_zero(self):
+        assert choose_encoding("gzip;q=0, br", ("gzip",)) is None
+
+    def test_wildcard(self):
+        assert choose_encoding("*", ("gzip",)) == "gzip"
+
+    def test_missing_header(self):
+        assert choose_encoding(None, ("gzip",)) is None
+
+
+class TestCompressionTween:
+
+    def test_compresses_large_json(self):
+        with patch('backend_edutrack.utils.compression.brotli', None):
+            tween = make_tween(lambda request: json_response(5000))
+            response = tween(make_request("gzip"))
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert json.loads(gzip.decompress(response.body))["data"] == "x" * 5000
+
+    def test_small_body_untouched(self):
+        tween = make_tween(lambda request: json_response(10), **{"compression.min_size": "1024"})
+        response = tween(make_request("gzip"))
+        assert "Content-Encoding" not in response.headers
+
+    def test_non_json_untouched(self):
+        tween = make_tween(lambda request: Response(body=b"x" * 5000, content_type='text/html'))
+        response = tween(make_request("gzip"))
+        assert "Content-Encoding" not in response.headers
+
+    def test_no_accept_encoding(self):
+        tween = make_tween(lambda request: json_response(5000))
+        response = tween(make_request())
+        assert "Content-Encoding" not in response.headers
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+    def test_compressed_body_is_reused(self):
+        with patch('backend_edutrack.utils.compression.compress', wraps=compress) as mock_compress, \
+             patch('backend_edutrack.utils.compression.brotli', None):
+            tween = make_tween(lambda request: json_response(5000))
+            first = tween(make_request("gzip"))
+            second = tween(make_request("gzip"))
+
+        assert first.body == second.body
+        assert mock_compress.call_count == 1
+
+    def test_brotli_when_available(self):
+        brotli = pytest.importorskip("brotli")
+        tween = make_tween(lambda request: json_response(5000))
+        response = tween(make_request("gzip, br"))
+        assert response.headers["Content-Encoding"] == "br"
+        assert json.loads(brotli.decompress(response.body))["data"] == "x" * 5000
@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import MagicMock
+from pyramid.response import Response
+
+from backend_edutrack.utils.etag import post_etag, comments_etag, etag_matches
+from backend_edutrack.views.post import get_post
+from backend_edutrack.views.comment import get_comments_by_post
+from backend_edutrack.models.post import Post
+
+from .conftest import dummy_request, mock_dbsession
+
+
+class TestEtagMatches:
+
+    def test_no_header(self, dummy_request):
+        assert etag_matches(dummy_request, post_etag(1, 1)) is False
+
+    def test_weak_and_strong_forms_match(self, dummy_request):
+        dummy_request.headers["If-None-Match"] = '"post-1-3"'
+        assert etag_matches(dummy_request, post_etag(1, 3)) is True
+
+    def test_list_of_tags(self, dummy_request):
+        dummy_request.headers["If-None-Match"] = 'W/"post-1-2", W/"post-1-3"'
+        assert etag_matches(dummy_request, post_etag(1, 3)) is True
+        assert etag_matches(dummy_request, post_etag(1, 4)) is False
+
+    def test_wildcard(self, dummy_request):
+        dummy_request.headers["If-None-Match"] = '*'
+        assert etag_matches(dummy_request, post_etag(7, 1)) is True
+
+
+class TestConditionalGetPost:
+
+    def test_not_modified_uses_version_lookup_only(self, dummy_request, mock_dbsession):
+        dummy_request.matchdict = {"id": "5"}
+        dummy_request.headers["If-None-Match"] = post_etag(5, 4)
+        mock_dbsession.query.return_value.filter.return_value.scalar.return_value = 4
+
+        response = get_post(dummy_request)
+
+        assert isinstance(response, Response)
+        assert response.status_code == 304
+        assert response.headers["ETag"] == post_etag(5, 4)
+        mock_dbsession.query.return_value.options.assert_not_called()
+
+    def test_stale_etag_returns_body(self, dummy_request, mock_dbsession):
+        dummy_request.matchdict = {"id": "5"}
+        dummy_request.headers["If-None-Match"] = post_etag(5, 3)
+        query_chain = MagicMock()
+        query_chain.filter.return_value.scalar.return_value = 4
+        query_chain.options.return_value = query_chain
+        post = MagicMock(spec=Post)
+        query_chain.filter_by.return_value.first.return_value = post
+        post.id = 5
+        post.version = 4
+        post.created_at = None
+        post.references = []
+        post.recommended_by = []
+        mock_dbsession.query.return_value = query_chain
+
+        response = get_post(dummy_request)
+
+        assert isinstance(response, dict)
+        assert dummy_request.response.headers["ETag"] == post_etag(5, 4)
+
+    def test_missing_post_with_etag(self, dummy_request, mock_dbsession):
+        dummy_request.matchdict = {"id": "5"}
+        dummy_request.headers["If-None-Match"] = post_etag(5, 1)
+        mock_dbsession.query.return_value.filter.return_value.scalar.return_value = None
+
+        response = get_post(dummy_request)
+
+        assert response.status_code == 404
+
+
+class TestConditionalGetComments:
+
+    def test_not_modified(self, dummy_request, mock_dbsession):
+        dummy_request.matchdict = {"post_id": "9"}
+        dummy_request.params = {"page": "1", "per_page": "5"}
+        dummy_request.headers["If-None-Match"] = comments_etag(9, 2, 1, 5)
+        mock_dbsession.query.return_value.filter.return_value.scalar.return_value = 2
+
+        response = get_comments_by_post(dummy_request)
+
+        assert response.status_code == 304
+        mock_dbsession.get.assert_not_called()
+
+    def test_other_page_is_not_matched(self, dummy_request, mock_dbsession):
+        dummy_request.matchdict = {"post_id": "9"}
+        dummy_request.params = {"page": "2", "per_page": "5"}
+        dummy_request.headers["If-None-Match"] = comments_etag(9, 2, 1, 5)
+        mock_dbsession.query.return_value.filter.return_value.scalar.return_value = 2
+        mock_dbsession.get.return_value = None
+
+        response = get_comments_by_post(dummy_request)
+
+        assert response.status_code == 404
+        mock_dbsession.get.assert_called_once()
@@ -0,0 +1,147 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+from pyramid import testing
+from sqlalchemy import create_engine, insert
+from sqlalchemy.pool import StaticPool
+
+from backend_edutrack.models import Base, User, Post, Comment
+from backend_edutrack.models.post import PostInteraction, post_references
+from backend_edutrack.models.url import URL
+from backend_edutrack.utils.export import export_chunks, chunked
+from backend_edutrack.views.export import export
+
+CREATED = datetime(2026, 10, 19, 12, 0, 0)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"id": 1, "name": "Dosen", "email": "dosen@itera.ac.id", "password": "x", "role": "Dosen"},
+        ])
+        connection.execute(insert(URL), [{"id": 1, "url": "https://a"}, {"id": 2, "url": "https://b"}])
+        connection.execute(insert(Post), [
+            {"id": i, "title": "Post %d" % i, "content": "isi", "author_id": 1, "created_at": CREATED}
+            for i in (1, 2, 3)
+        ])
+        connection.execute(insert(post_references), [
+            {"post_id": 1, "url_id": 1}, {"post_id": 1, "url_id": 2}, {"post_id": 3, "url_id": 2},
+        ])
+        connection.execute(insert(Comment), [
+            {"id": 1, "post_id": 1, "user_id": 1, "content": "halo, \"dunia\"", "created_at": CREATED},
+        ])
+        connection.execute(insert(PostInteraction), [
+            {"id": 1, "post_id": 2, "user_id": 1, "interaction_type": "like", "created_at": CREATED},
+        ])
+    return engine
+
+
+def ndjson(chunks):
+    return [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines()]
+
+
+class TestExportChunks:
+
+    def test_ndjson_all_entities(self, engine):
+        records = ndjson(export_chunks(engine))
+
+        assert [(r["type"], r["id"]) for r in records] == [
+            ('post', 1), ('post', 2), ('post', 3), ('comment', 1), ('interaction', 1)]
+        assert records[0]["references"] == ['https://a', 'https://b']
+        assert records[1]["references"] == []
+        assert records[2]["references"] == ['https://b']
+        assert records[0]["created_at"] == '2026-10-19T12:00:00'
+        assert records[4]["interaction_type"] == 'like'
+
+    def test_small_batches_keep_post_references_together(self, engine):
+        records = ndjson(export_chunks(engine, ('posts',), batch_size=1))
+
+        assert [len(r["references"]) for r in records] == [2, 0, 1]
+
+    def test_csv(self, engine):
+        data = b''.join(export_chunks(engine, ('comments',), 'csv')).decode('utf-8')
+
+        rows = list(csv.reader(io.StringIO(data)))
+        assert rows[0] == ['id', 'post_id', 'user_id', 'content', 'created_at']
+        assert rows[1][3] == 'halo, "dunia"'
+
+    def test_gzip(self, engine):
+        plain = b''.join(export_chunks(engine, ('posts',), 'csv'))
+
+        assert gzip.decompress(b''.join(export_chunks(engine, ('posts',), 'csv', compress=True))) == plain
+        assert plain.decode('utf-8').splitlines()[1].endswith('https://a https://b')
+
+    def test_invalid_arguments(self, engine):
+        with pytest.raises(ValueError):
+            export_chunks(engine, ('posts', 'comments'), 'csv')
+        with pytest.raises(ValueError):
+            export_chunks(engine, ('users',))
+
+    def test_sqlite_reads_one_snapshot(self, tmp_path, monkeypatch):
+        from backend_edutrack.models import get_engine
+        from backend_edutrack.utils import export as export_module
+
+        url = 'sqlite:///' + str(tmp_path / 'export.sqlite')
+        engine = get_engine({'sqlalchemy.url': url})
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(insert(User), [
+                {"id": 1, "name": "Dosen", "email": "dosen@itera.ac.id", "password": "x", "role": "Dosen"}])
+            connection.execute(insert(Post), [{"id": 1, "title": "Post", "content": "isi", "author_id": 1}])
+        # Satu potongan per baris, agar generator bisa dihentikan di tengah
+        monkeypatch.setattr(export_module, 'chunked', lambda lines: (line.encode('utf-8') for line in lines))
+
+        chunks = export_chunks(engine, ('posts', 'comments'))
+        assert json.loads(next(chunks))["type"] == 'post'
+        # Komentar yang ter-commit setelah ekspor dimulai tidak ikut
+        with get_engine({'sqlalchemy.url': url}).begin() as connection:
+            connection.execute(insert(Comment), [{"id": 1, "post_id": 1, "user_id": 1, "content": "baru"}])
+        assert list(chunks) == []
+
+    def test_chunked_groups_lines(self):
+        assert list(chunked(['ab', 'cd', 'e'], size=4)) == [b'abcd', b'e']
+
+
+class TestExportView:
+
+    @pytest.fixture
+    def config(self, engine):
+        with testing.testConfig(settings={'admin.user_ids': '1'}) as config:
+            config.registry['dbsession_factory'] = testing.DummyResource(kw={'bind': engine})
+            yield config
+
+    def make_request(self, user_id=1, **params):
+        request = testing.DummyRequest(params=params)
+        request.user = {"id": user_id}
+        return request
+
+    def test_streams_ndjson(self, config):
+        response = export(self.make_request())
+
+        assert response.content_type == 'application/x-ndjson'
+        assert 'attachment' in response.headers['Content-Disposition']
+        assert not isinstance(response.app_iter, (list, tuple))
+        assert len(ndjson(response.app_iter)) == 5
+
+    def test_gzip_when_accepted(self, config):
+        request = self.make_request(entity='interactions', format='csv')
+        request.headers['Accept-Encoding'] = 'gzip, br'
+
+        response = export(request)
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(b''.join(response.app_iter)).splitlines()[1].startswith(b'1,2,1,like')
+
+    def test_invalid_params(self, config):
+        assert export(self.make_request(format='xml')).status_code == 400
+        assert export(self.make_request(entity='all', format='csv')).status_code == 400
+
+    def test_non_admin_forbidden(self, config):
+        assert export(self.make_request(user_id=2)).status_code == 403
@@ -0,0 +1,170 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from backend_edutrack.models import Base, Post, User
+from backend_edutrack.models.post import PostInteraction, post_recommendations
+from backend_edutrack.utils.hot import HotRanker, hot_score, mark_hot_after_commit
+from backend_edutrack.utils.pagination import encode_cursor, decode_cursor
+from backend_edutrack.views.post import list_posts
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+class TestHotScore:
+
+    def test_engagement_raises_score(self):
+        base = hot_score(0, 0, 0, 0, 0, NOW, NOW)
+        assert hot_score(5, 0, 0, 0, 0, NOW, NOW) > base
+        assert hot_score(0, 5, 0, 0, 0, NOW, NOW) < base
+        # Rekomendasi dosen lebih berbobot dari satu like
+        assert hot_score(0, 0, 0, 1, 0, NOW, NOW) > hot_score(1, 0, 0, 0, 0, NOW, NOW)
+
+    def test_decays_with_age(self):
+        fresh = hot_score(10, 0, 0, 0, 0, NOW, NOW)
+        old = hot_score(10, 0, 0, 0, 0, NOW - timedelta(hours=48), NOW)
+        assert old < fresh
+
+
+class TestHotRankerRefresh:
+
+    @pytest.fixture
+    def session(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.execute(insert(User), [
+                {"id": 1, "name": "Mhs", "email": "m@student.itera.ac.id", "password": "x", "role": "Mahasiswa"},
+                {"id": 2, "name": "Dosen", "email": "d@itera.ac.id", "password": "x", "role": "Dosen"},
+            ])
+            session.execute(insert(Post), [
+                {"id": 1, "title": "a", "content": "a", "author_id": 1, "created_at": NOW - timedelta(hours=1), "likes": 0, "dislikes": 0},
+                {"id": 2, "title": "b", "content": "b", "author_id": 1, "created_at": NOW - timedelta(hours=1), "likes": 3, "dislikes": 0},
+                {"id": 3, "title": "c", "content": "c", "author_id": 1, "created_at": NOW - timedelta(days=30), "likes": 50, "dislikes": 0, "hot_score": 9.0},
+            ])
+            session.execute(insert(post_recommendations), [{"post_id": 1, "user_id": 2}])
+            session.execute(insert(PostInteraction), [
+                {"user_id": 2, "post_id": 2, "interaction_type": "like", "created_at": NOW - timedelta(minutes=5)},
+            ])
+            session.commit()
+            yield session
+
+    def scores(self, session):
+        return dict(session.execute(select(Post.id, Post.hot_score)).all())
+
+    def test_full_refresh_ranks_window_and_zeroes_old_posts(self, session):
+        ranker = HotRanker(window_days=14)
+        assert ranker.refresh(session, now=NOW) == 2
+        scores = self.scores(session)
+
+        assert scores[1] == pytest.approx(hot_score(0, 0, 0, 1, 0, NOW - timedelta(hours=1), NOW))
+        assert scores[2] == pytest.approx(hot_score(3, 0, 0, 0, 1, NOW - timedelta(hours=1), NOW))
+        assert scores[3] == 0
+
+    def test_refresh_only_dirty_posts(self, session):
+        ranker = HotRanker()
+        ranker.mark_dirty(2)
+        assert ranker.refresh(session, post_ids=ranker.take_dirty(), now=NOW) == 1
+        scores = self.scores(session)
+        assert scores[1] == 0
+        assert scores[2] > 0
+        assert ranker.take_dirty() == set()
+
+
+class TestMarkHotAfterCommit:
+
+    def test_marks_dirty_on_commit_only(self, dummy_request):
+        ranker = HotRanker()
+        dummy_request.registry['hot_ranker'] = ranker
+        hooks = []
+        dummy_request.tm = MagicMock()
+        dummy_request.tm.get.return_value.addAfterCommitHook.side_effect = hooks.append
+        try:
+            mark_hot_after_commit(dummy_request, 7)
+            assert ranker.take_dirty() == set()
+            hooks[0](False)
+            assert ranker.take_dirty() == set()
+            hooks[0](True)
+            assert ranker.take_dirty() == {7}
+        finally:
+            dummy_request.registry.pop('hot_ranker', None)
+
+
+class TestRankerStartup:
+
+    def test_starts_on_first_request_only(self):
+        from webtest import TestApp
+        from backend_edutrack import main
+        from backend_edutrack.security import create_token
+
+        app = main({}, **{'sqlalchemy.url': 'sqlite://', 'suggest.enabled': 'false', 'hot.dirty_interval': '60'})
+        ranker = app.registry['hot_ranker']
+        # Seperti bootstrap() di script: aplikasi dibuat tanpa melayani request
+        assert ranker._thread is None
+
+        try:
+            token = create_token({'id': 1, 'role': 'Mahasiswa', 'name': 'Mhs'})
+            TestApp(app).get('/api/tidak-ada', headers={'Authorization': 'Bearer ' + token}, status=404)
+            assert ranker._thread is not None and ranker._thread.is_alive()
+        finally:
+            ranker.stop(timeout=5)
+
+
+class TestListHotPosts:
+
+    def setup_query(self, mock_dbsession, rows):
+        query = MagicMock()
+        query.filter.return_value = query
+        query.order_by.return_value = query
+        query.limit.return_value = query
+        query.all.return_value = rows
+        mock_dbsession.query.return_value = query
+        return query
+
+    def row(self, post_id, score):
+        row = MagicMock()
+        row.id = post_id
+        row.hot_score = score
+        return row
+
+    @patch('backend_edutrack.views.post.add_viewer_state')
+    @patch('backend_edutrack.views.post.load_post_entries')
+    def test_first_page_has_cursor(self, mock_load, mock_viewer, dummy_request, mock_dbsession):
+        self.setup_query(mock_dbsession, [self.row(5, 3.0), self.row(2, 2.0), self.row(9, 1.0)])
+        mock_load.side_effect = lambda request, cache, ids: {i: {"post": {"id": i}} for i in ids}
+        dummy_request.params = {"sort": "hot", "per_page": "2"}
+
+        response = list_posts(dummy_request)
+
+        assert [p["id"] for p in response["posts"]] == [5, 2]
+        assert response["pagination"]["has_next"] is True
+        assert decode_cursor(response["pagination"]["next_cursor"], 2) == [2.0, 2]
+
+    @patch('backend_edutrack.views.post.add_viewer_state')
+    @patch('backend_edutrack.views.post.load_post_entries')
+    def test_cursor_applies_keyset_filter(self, mock_load, mock_viewer, dummy_request, mock_dbsession):
+        query = self.setup_query(mock_dbsession, [self.row(9, 1.0)])
+        mock_load.side_effect = lambda request, cache, ids: {i: {"post": {"id": i}} for i in ids}
+        dummy_request.params = {"sort": "hot", "per_page": "2", "cursor": encode_cursor([2.0, 2])}
+
+        response = list_posts(dummy_request)
+
+        query.filter.assert_called_once()
+        assert [p["id"] for p in response["posts"]] == [9]
+        assert response["pagination"]["has_next"] is False
+        assert response["pagination"]["next_cursor"] is None
+
+    def test_invalid_sort_and_cursor(self, dummy_request):
+        dummy_request.params = {"sort": "populer"}
+        assert list_posts(dummy_request).status_code == 400
+        dummy_request.params = {"sort": "hot", "cursor": "???"}
+        assert list_posts(dummy_request).status_code == 400
+
+    @pytest.mark.parametrize('values', [["x", "y"], [1.5, "y"], [None, 2], [1.5, [2]]])
+    def test_cursor_with_wrong_types(self, dummy_request, mock_dbsession, values):
+        dummy_request.params = {"sort": "hot", "cursor": encode_cursor(values)}
+
+        assert list_posts(dummy_request).status_code == 400
+        mock_dbsession.query.assert_not_called()
@@ -0,0 +1,178 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from pyramid import testing
+from pyramid.response import Response
+from pyramid_retry import IRetryableError
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend_edutrack.models import Base, IdempotencyKey, User
+from backend_edutrack.utils.idempotency import IdempotencyStore, idempotency_tween_factory
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def make_request(session, key='k1', method='POST', body=b'{"post_id": 1}', user_id=1):
+    request = testing.DummyRequest(method=method, path='/api/comments', body=body)
+    request.method = method
+    request.body = body
+    request.headers['Idempotency-Key'] = key
+    request.dbsession = session
+    request.user = {"id": user_id}
+    return request
+
+
+def json_response(status=200):
+    return Response(json_body={"message": "ok"}, status=status)
+
+
+class TestIdempotencyStore:
+
+    def test_save_and_lookup(self, session):
+        store = IdempotencyStore(cache_entries=0)
+        store.save(make_request(session), 1, 'k1', 'fp', json_response(201), now=NOW)
+
+        record = store.lookup(session, 1, 'k1', now=NOW + timedelta(seconds=10))
+
+        assert record["status_code"] == 201
+        assert record["fingerprint"] == 'fp'
+        assert store.lookup(session, 2, 'k1', now=NOW) is None
+
+    def test_front_cache_skips_database(self, session):
+        store = IdempotencyStore()
+        store.save(make_request(session), 1, 'k1', 'fp', json_response(), now=NOW)
+        dbsession = MagicMock()
+
+        assert store.lookup(dbsession, 1, 'k1')["fingerprint"] == 'fp'
+        dbsession.execute.assert_not_called()
+
+    def test_expired_row_is_deleted(self, session):
+        store = IdempotencyStore(ttl=60, cache_entries=0)
+        store.save(make_request(session), 1, 'k1', 'fp', json_response(), now=NOW)
+
+        assert store.lookup(session, 1, 'k1', now=NOW + timedelta(seconds=61)) is None
+        assert session.execute(select(func.count(IdempotencyKey.id))).scalar() == 0
+
+    def test_cleanup_removes_old_rows(self, session):
+        store = IdempotencyStore(ttl=60, cache_entries=0, cleanup_interval=0)
+        store.save(make_request(session), 1, 'lama', 'fp', json_response(), now=NOW)
+        store.save(make_request(session), 1, 'baru', 'fp', json_response(), now=NOW + timedelta(seconds=120))
+
+        keys = session.execute(select(IdempotencyKey.key)).scalars().all()
+        assert keys == ['baru']
+
+    def test_conflicting_insert_is_retryable(self, session):
+        store = IdempotencyStore(cache_entries=0)
+        store.save(make_request(session), 1, 'k1', 'fp', json_response(), now=NOW)
+
+        with pytest.raises(IntegrityError) as info:
+            store.save(make_request(session), 1, 'k1', 'fp', json_response(), now=NOW)
+        assert IRetryableError.providedBy(info.value)
+
+
+class TestIdempotencyTween:
+
+    def tween(self, handler, route_name='comment_add'):
+        registry = {'idempotency_store': IdempotencyStore()}
+        route = MagicMock()
+        route.name = route_name
+        mapper = MagicMock(return_value={'route': route})
+        return idempotency_tween_factory(
+            handler, MagicMock(get=registry.get, queryUtility=MagicMock(return_value=mapper)))
+
+    def test_duplicate_is_replayed_without_running_view(self, session):
+        handler = MagicMock(return_value=json_response(201))
+        tween = self.tween(handler)
+
+        first = tween(make_request(session))
+        second = tween(make_request(session))
+
+        handler.assert_called_once()
+        assert second.status_code == 201
+        assert second.body == first.body
+        assert second.headers['Idempotent-Replayed'] == 'true'
+
+    def test_same_key_different_body_rejected(self, session):
+        tween = self.tween(MagicMock(return_value=json_response()))
+        tween(make_request(session))
+
+        response = tween(make_request(session, body=b'{"post_id": 2}'))
+
+        assert response.status_code == 422
+
+    def test_server_errors_not_stored(self, session):
+        handler = MagicMock(return_value=json_response(500))
+        tween = self.tween(handler)
+
+        tween(make_request(session))
+        tween(make_request(session))
+
+        assert handler.call_count == 2
+
+    def test_conflict_after_failed_flush_not_stored(self, session):
+        session.add(User(name='A', email='a@example.com', password='x'))
+        session.commit()
+
+        def view(request):
+            # Seperti create_post/register: IntegrityError ditangkap tanpa rollback
+            request.dbsession.add(User(name='B', email='a@example.com', password='x'))
+            try:
+                request.dbsession.flush()
+            except IntegrityError:
+                return json_response(409)
+            return json_response(201)
+
+        handler = MagicMock(side_effect=view)
+        tween = self.tween(handler)
+
+        first = tween(make_request(session))
+        session.rollback()
+        second = tween(make_request(session))
+
+        assert first.status_code == second.status_code == 409
+        assert handler.call_count == 2
+        session.rollback()
+        assert session.execute(select(func.count(IdempotencyKey.id))).scalar() == 0
+
+    def test_without_key_or_safe_method_passes_through(self, session):
+        handler = MagicMock(return_value=json_response())
+        tween = self.tween(handler)
+        request = make_request(session, method='GET')
+
+        tween(request)
+        tween(request)
+
+        assert handler.call_count == 2
+        assert session.execute(select(func.count(IdempotencyKey.id))).scalar() == 0
+
+    @pytest.mark.parametrize('user_id,route_name', [
+        (None, 'comment_add'),
+        (1, 'login'),
+    ])
+    def test_anonymous_and_auth_routes_not_stored(self, session, user_id, route_name):
+        handler = MagicMock(return_value=json_response())
+        tween = self.tween(handler, route_name)
+
+        tween(make_request(session, user_id=user_id))
+        tween(make_request(session, user_id=user_id))
+
+        assert handler.call_count == 2
+        assert session.execute(select(func.count(IdempotencyKey.id))).scalar() == 0
+
+    def test_invalid_key(self, session):
+        handler = MagicMock()
+
+        response = self.tween(handler)(make_request(session, key='x' * 256))
+
+        assert response.status_code == 400
+        handler.assert_not_called()
@@ -0,0 +1,114 @@
+import csv
+import os
+import stat
+
+import pytest
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend_edutrack.models import Base, User
+from backend_edutrack.scripts.import_users import (
+    hash_password,
+    import_users,
+    load_existing,
+    validate_rows,
+    write_passwords,
+)
+
+
+def row(name='Budi', email='budi@student.itera.ac.id', nim='120140001', prodi='Teknik Informatika', **extra):
+    return dict(name=name, email=email, nim=nim, prodi=prodi, **extra)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+class TestValidateRows:
+
+    def test_roles_and_fields(self):
+        users, errors, generated = validate_rows([
+            row(),
+            row(name='Dosen', email='dosen@itera.ac.id', nim='999', prodi='TI', password='rahasia'),
+        ], set(), set(), generate=lambda: 'acak')
+
+        assert errors == []
+        assert users[0]["role"] == "Mahasiswa"
+        assert users[0]["password"] == 'acak'
+        assert generated == [('budi@student.itera.ac.id', 'acak')]
+        # NIM dan prodi hanya untuk Mahasiswa
+        assert (users[1]["role"], users[1]["nim"], users[1]["prodi"]) == ("Dosen", None, None)
+        assert users[1]["password"] == 'rahasia'
+
+    def test_duplicates_against_database_and_file(self):
+        emails, nims = {'lama@student.itera.ac.id'}, {'120140009'}
+
+        users, errors, _ = validate_rows([
+            row(email='lama@student.itera.ac.id', nim='1'),
+            row(email='baru@student.itera.ac.id', nim='120140009'),
+            row(),
+            row(nim='2'),
+            row(email='lain@student.itera.ac.id'),
+        ], emails, nims)
+
+        assert [u["email"] for u in users] == ['budi@student.itera.ac.id']
+        assert [line for line, _ in errors] == [2, 3, 5, 6]
+
+    def test_rejected_rows(self):
+        users, errors, generated = validate_rows([
+            row(email='tamu@gmail.com'),
+            row(name=''),
+        ], set(), set())
+
+        assert users == [] and generated == []
+        assert [reason for _, reason in errors] == [
+            "Domain email tidak diizinkan.",
+            "Field tidak lengkap.",
+        ]
+
+    def test_generated_passwords_are_random_and_not_nim(self):
+        users, _, generated = validate_rows(
+            [row(email='m%d@student.itera.ac.id' % i, nim='1201400%02d' % i) for i in range(3)], set(), set())
+
+        passwords = [u["password"] for u in users]
+        assert len(set(passwords)) == 3
+        assert not set(passwords) & {u["nim"] for u in users}
+        assert generated == [(u["email"], u["password"]) for u in users]
+
+    def test_write_passwords(self, tmp_path):
+        path = os.path.join(str(tmp_path), 'password.csv')
+
+        write_passwords(path, [('budi@student.itera.ac.id', 'acak')])
+
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        with open(path, newline='') as f:
+            assert list(csv.reader(f)) == [['email', 'password'], ['budi@student.itera.ac.id', 'acak']]
+
+
+class TestImportUsers:
+
+    def test_inserts_in_batches(self, session_factory):
+        users, _, _ = validate_rows(
+            [row(email='m%d@student.itera.ac.id' % i, nim='1201400%02d' % i) for i in range(5)], set(), set())
+        progress = []
+
+        inserted = import_users(session_factory, users, ('hash-%d' % i for i in range(5)),
+                                batch_size=2, progress=progress.append)
+
+        assert inserted == 5
+        assert progress == [2, 4, 5]
+        with session_factory() as dbsession:
+            assert dbsession.execute(select(User.password).order_by(User.id)).scalars().all() == [
+                'hash-%d' % i for i in range(5)]
+            assert load_existing(dbsession)[1] == {'1201400%02d' % i for i in range(5)}
+
+    def test_hash_password_verifies(self):
+        hashed = hash_password('120140001', rounds=4)
+
+        assert hashed.startswith('$2b$04$')
+        assert bcrypt.verify('120140001', hashed)
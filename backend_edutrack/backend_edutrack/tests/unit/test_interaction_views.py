@@ -0,0 +1,142 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from backend_edutrack.models import Base, ChangeLog, Post, User
+from backend_edutrack.models.post import PostInteraction
+from backend_edutrack.views.interaction import (
+    apply_action,
+    apply_counter_deltas,
+    interactions_batch,
+    parse_operations,
+    upsert_interactions,
+)
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(User), [
+            {"id": 1, "name": "Mhs", "email": "m@student.itera.ac.id", "password": "x", "role": "Mahasiswa"},
+        ])
+        session.execute(insert(Post), [
+            {"id": i, "title": "Post %d" % i, "content": "isi", "author_id": 1} for i in (1, 2, 3)
+        ])
+        yield session
+
+
+def interactions(session):
+    return dict(session.execute(
+        select(PostInteraction.post_id, PostInteraction.interaction_type).where(PostInteraction.user_id == 1)
+    ).all())
+
+
+def interaction_times(session):
+    return dict(session.execute(
+        select(PostInteraction.post_id, PostInteraction.created_at).where(PostInteraction.user_id == 1)
+    ).all())
+
+
+class TestApplyAction:
+
+    def test_toggle_and_switch(self):
+        assert apply_action(None, 'like')[0] == 'like'
+        assert apply_action('like', 'like')[0] is None
+        assert apply_action('like', 'dislike') == ('dislike', "Like diubah menjadi dislike.")
+
+
+class TestParseOperations:
+
+    def test_invalid_operations_are_marked(self):
+        parsed = parse_operations({"operations": [
+            {"post_id": 1, "action": "like"},
+            {"post_id": "1", "action": "like"},
+            {"post_id": 2, "action": "love"},
+            {"post_id": True, "action": "like"},
+            "like",
+        ]})
+
+        assert parsed == [(1, 'like'), None, None, None, None]
+
+    @pytest.mark.parametrize("data", [{}, {"operations": []}, [], {"operations": [{}] * 101}])
+    def test_invalid_body(self, data):
+        with pytest.raises(ValueError):
+            parse_operations(data)
+
+
+class TestWrites:
+
+    def test_upsert_inserts_and_updates_in_one_statement(self, session):
+        session.add(PostInteraction(user_id=1, post_id=1, interaction_type='like', created_at=NOW))
+        session.flush()
+
+        upsert_interactions(session, 1, {1: 'dislike', 2: 'like'}, NOW + timedelta(hours=1))
+
+        assert interactions(session) == {1: 'dislike', 2: 'like'}
+        # Interaksi yang berganti jenis dihitung sebagai interaksi terbaru
+        assert interaction_times(session)[1] == NOW + timedelta(hours=1)
+
+    def test_upsert_fallback_for_other_dialects(self, session):
+        session.add(PostInteraction(user_id=1, post_id=1, interaction_type='like', created_at=NOW))
+        session.flush()
+        dbsession = MagicMock(wraps=session)
+        dbsession.get_bind.return_value.dialect.name = 'mysql'
+
+        upsert_interactions(dbsession, 1, {1: 'dislike', 2: 'like'}, NOW + timedelta(hours=1))
+
+        assert interactions(session) == {1: 'dislike', 2: 'like'}
+        assert interaction_times(session)[1] == NOW + timedelta(hours=1)
+
+    def test_counter_deltas_single_update(self, session):
+        apply_counter_deltas(session, {1: (1, 0), 2: (-1, 1)})
+
+        rows = {row.id: row for row in session.execute(select(Post.id, Post.likes, Post.dislikes, Post.version))}
+        assert (rows[1].likes, rows[1].dislikes, rows[1].version) == (1, 0, 2)
+        assert (rows[2].likes, rows[2].dislikes, rows[2].version) == (-1, 1, 2)
+        assert rows[3].version == 1
+
+
+class TestInteractionsBatch:
+
+    def test_applies_operations_in_one_pass(self, dummy_request, session):
+        session.add(PostInteraction(user_id=1, post_id=2, interaction_type='like', created_at=NOW))
+        session.execute(Post.__table__.update().where(Post.id == 2).values(likes=1))
+        dummy_request.dbsession = session
+        dummy_request.user = {"id": 1}
+        dummy_request.json_body = {"operations": [
+            {"post_id": 1, "action": "like"},
+            {"post_id": 2, "action": "dislike"},
+            {"post_id": 3, "action": "like"},
+            {"post_id": 3, "action": "like"},
+            {"post_id": 9, "action": "like"},
+        ]}
+
+        response = interactions_batch(dummy_request)
+
+        assert [r["status"] for r in response["results"]] == ["ok", "ok", "ok", "ok", "not_found"]
+        assert response["results"][1]["message"] == "Like diubah menjadi dislike."
+        assert response["posts"] == [
+            {"id": 1, "likes": 1, "dislikes": 0, "my_interaction": "like"},
+            {"id": 2, "likes": 0, "dislikes": 1, "my_interaction": "dislike"},
+            {"id": 3, "likes": 0, "dislikes": 0, "my_interaction": None},
+        ]
+        assert interactions(session) == {1: 'like', 2: 'dislike'}
+        # Post 3 kembali ke keadaan awal: tidak ada perubahan yang dicatat
+        assert sorted(session.execute(select(ChangeLog.post_id)).scalars()) == [1, 2]
+
+    def test_requires_auth(self, dummy_request):
+        dummy_request.user = {}
+
+        assert interactions_batch(dummy_request).status_code == 401
+
+    def test_invalid_body(self, dummy_request):
+        dummy_request.user = {"id": 1}
+        dummy_request.json_body = {"operations": "like"}
+
+        assert interactions_batch(dummy_request).status_code == 400
@@ -10,9 +10,12 @@ from backend_edutrack.views.post import (
     create_post,
     list_posts,
     get_post,
+    get_posts,
     like_post,
     dislike_post,
-    post_to_dict
+    post_to_dict,
+    add_viewer_state,
+    parse_feed_filters,
 )
 from backend_edutrack.models.post import Post, PostInteraction
 from backend_edutrack.models.user import User
@@ -924,4 +927,131 @@ class TestDislikePostView:
             assert response.json_body["error"] == "Terjadi kesalahan server tidak terduga."
             mock_error_response.assert_called_once_with(
                 dummy_request, "Terjadi kesalahan server tidak terduga.", 500
-            )
\ No newline at end of file
+            )
+
+
+# --- TEST UNTUK add_viewer_state (state per-viewer di feed) ---
+class TestAddViewerState:
+
+    def test_anonymous_viewer_gets_defaults_without_queries(self, dummy_request, mock_dbsession):
+        dummy_request.user = {}
+        posts_data = [{"id": 1}, {"id": 2}]
+
+        add_viewer_state(dummy_request, posts_data)
+
+        assert posts_data == [
+            {"id": 1, "my_interaction": None, "recommended_by_me": False},
+            {"id": 2, "my_interaction": None, "recommended_by_me": False},
+        ]
+        mock_dbsession.query.assert_not_called()
+        mock_dbsession.execute.assert_not_called()
+
+    def test_mahasiswa_gets_interactions_with_one_query(self, dummy_request, mock_dbsession):
+        dummy_request.user = {"id": 1, "role": "Mahasiswa"}
+        mock_dbsession.query.return_value.filter.return_value.all.return_value = [(2, "like"), (3, "dislike")]
+        posts_data = [{"id": 1}, {"id": 2}, {"id": 3}]
+
+        add_viewer_state(dummy_request, posts_data)
+
+        assert [p["my_interaction"] for p in posts_data] == [None, "like", "dislike"]
+        assert mock_dbsession.query.call_count == 1
+        mock_dbsession.execute.assert_not_called()
+
+    def test_dosen_gets_recommendations_with_one_query(self, dummy_request, mock_dbsession):
+        dummy_request.user = {"id": 2, "role": "Dosen"}
+        mock_dbsession.query.return_value.filter.return_value.all.return_value = []
+        mock_dbsession.execute.return_value = [MagicMock(post_id=3)]
+        posts_data = [{"id": 1}, {"id": 3}]
+
+        add_viewer_state(dummy_request, posts_data)
+
+        assert [p["recommended_by_me"] for p in posts_data] == [False, True]
+        assert mock_dbsession.execute.call_count == 1
+
+
+class TestFeedFilters:
+
+    def test_parse_filters(self, dummy_request):
+        dummy_request.params = {"prodi": " Teknik Informatika ", "author_id": "7"}
+        filters, error = parse_feed_filters(dummy_request)
+        assert error is None
+        assert filters == {"author_id": 7, "prodi": "Teknik Informatika"}
+
+    def test_author_self_uses_current_user(self, dummy_request):
+        dummy_request.user = {"id": 3, "role": "Mahasiswa"}
+        dummy_request.params = {"author": "self", "author_id": "7"}
+        filters, error = parse_feed_filters(dummy_request)
+        assert filters["author_id"] == 3
+
+    def test_invalid_author_id(self, dummy_request):
+        dummy_request.params = {"author_id": "abc"}
+        filters, error = parse_feed_filters(dummy_request)
+        assert filters is None
+        assert error.status_code == 400
+
+    def test_prodi_filter_skips_feed_cache(self, dummy_request, mock_dbsession, mock_post, mock_user_mahasiswa):
+        mock_post.author = mock_user_mahasiswa
+        query = MagicMock()
+        query.filter.return_value = query
+        query.options.return_value = query
+        query.order_by.return_value = query
+        query.offset.return_value = query
+        query.limit.return_value = query
+        query.count.return_value = 1
+        query.all.return_value = [mock_post]
+        mock_dbsession.query.return_value = query
+
+        cache = MagicMock()
+        cache.feed_cacheable.return_value = True
+        dummy_request.registry['response_cache'] = cache
+        try:
+            dummy_request.params = {"prodi": "Teknik Informatika"}
+            response = list_posts(dummy_request)
+        finally:
+            dummy_request.registry.pop('response_cache', None)
+
+        assert len(response["posts"]) == 1
+        query.filter.assert_called_once()
+        cache.get_feed.assert_not_called()
+        cache.set_feed.assert_not_called()
+
+
+# --- TEST UNTUK get_posts VIEW (GET /api/posts?ids=) ---
+class TestGetPosts:
+
+    @patch('backend_edutrack.views.post.add_viewer_state')
+    @patch('backend_edutrack.views.post.load_post_entries')
+    def test_request_order_and_not_found_markers(self, mock_load, mock_viewer, dummy_request):
+        mock_load.return_value = {
+            1: {"post": {"id": 1, "title": "Satu"}},
+            3: {"post": {"id": 3, "title": "Tiga"}},
+        }
+        dummy_request.params = {"ids": "3,7,1,3"}
+
+        response = get_posts(dummy_request)
+
+        mock_load.assert_called_once_with(dummy_request, None, [3, 7, 1])
+        assert response["posts"] == [
+            {"id": 3, "title": "Tiga"},
+            {"id": 7, "not_found": True},
+            {"id": 1, "title": "Satu"},
+        ]
+        # Penanda not-found tidak diberi state viewer
+        assert [p["id"] for p in mock_viewer.call_args[0][1]] == [3, 1]
+
+    @pytest.mark.parametrize("ids", [None, "", "1,a", ",".join(str(i) for i in range(101))])
+    def test_invalid_ids(self, dummy_request, ids):
+        dummy_request.params = {} if ids is None else {"ids": ids}
+
+        response = get_posts(dummy_request)
+
+        assert response.status_code == 400
+
+    @patch('backend_edutrack.views.post.load_post_entries')
+    def test_db_api_error(self, mock_load, dummy_request):
+        mock_load.side_effect = DBAPIError("stmt", {}, Exception("db down"))
+        dummy_request.params = {"ids": "1"}
+
+        response = get_posts(dummy_request)
+
+        assert response.status_code == 500
@@ -0,0 +1,120 @@
+import argparse
+import socket
+
+from unittest.mock import MagicMock
+from pyramid.registry import Registry
+from sqlalchemy.orm import sessionmaker
+
+from backend_edutrack.models import get_engine, rebind_engine
+from backend_edutrack.scripts.prefork import (
+    Arbiter,
+    RequestLimit,
+    bind_sockets,
+    parse_args,
+    prepare_master,
+    worker_options,
+)
+
+
+class TestOptions:
+
+    def test_arguments_override_settings(self):
+        args = parse_args(['prefork', 'production.ini', '--workers', '3'])
+        options = worker_options(args, {'prefork.workers': '8', 'prefork.max_requests': '1000'})
+
+        assert options == {
+            "workers": 3,
+            "max_requests": 1000,
+            "max_requests_jitter": 0,
+            "graceful_timeout": 30.0,
+        }
+
+    def test_defaults(self):
+        args = argparse.Namespace(workers=None, max_requests=None, max_requests_jitter=None, graceful_timeout=None)
+        options = worker_options(args, {})
+
+        assert options["workers"] >= 1
+        assert options["max_requests"] == 0
+
+
+class TestRequestLimit:
+
+    def test_calls_on_limit_once(self):
+        app = MagicMock(return_value=[b'ok'])
+        on_limit = MagicMock()
+        limited = RequestLimit(app, 2, on_limit)
+
+        for _ in range(4):
+            assert limited({}, None) == [b'ok']
+
+        on_limit.assert_called_once()
+        assert app.call_count == 4
+
+
+class TestMaster:
+
+    def test_bind_sockets(self):
+        sockets = bind_sockets('127.0.0.1:0')
+        try:
+            assert len(sockets) == 1
+            assert sockets[0].getsockname()[0] == '127.0.0.1'
+            assert sockets[0].getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR)
+        finally:
+            for sock in sockets:
+                sock.close()
+
+    def test_prepare_master_stops_threads_and_connections(self):
+        registry = Registry()
+        ranker = MagicMock()
+        engine = MagicMock()
+        registry['hot_ranker'] = ranker
+        registry['dbsession_factory'] = sessionmaker(bind=engine)
+
+        prepare_master(MagicMock(registry=registry))
+
+        ranker.stop.assert_called_once()
+        engine.dispose.assert_called_once()
+
+    def test_rebind_engine_creates_new_engine(self):
+        registry = Registry()
+        registry.settings = {'sqlalchemy.url': 'sqlite://'}
+        old_engine = get_engine(registry.settings)
+        registry['dbsession_factory'] = sessionmaker(bind=old_engine)
+
+        engine = rebind_engine(registry)
+
+        assert engine is not old_engine
+        assert registry['dbsession_factory']().get_bind() is engine
+
+
+class TestArbiter:
+
+    def make_arbiter(self, app, workers):
+        arbiter = Arbiter(app, [], {}, ['prefork', 'production.ini'], workers=workers)
+        arbiter.spawn = MagicMock(side_effect=lambda: arbiter.workers.update({len(arbiter.workers) + 100: 0}))
+        arbiter.reload = MagicMock()
+        return arbiter
+
+    def test_respawns_up_to_worker_count(self):
+        arbiter = self.make_arbiter(MagicMock(), workers=3)
+        arbiter.workers = {100: 0}
+
+        arbiter.maintain_workers()
+
+        assert arbiter.spawn.call_count == 2
+        arbiter.reload.assert_not_called()
+
+    def test_failed_reload_reloads_when_old_worker_exits(self):
+        # Worker lama yang tetap melayani setelah reload gagal
+        arbiter = self.make_arbiter(None, workers=2)
+        arbiter.num_workers = 2
+        arbiter.workers = {100: 0, 101: 0}
+        arbiter.maintain_workers()
+        arbiter.reload.assert_not_called()
+
+        # Worker 101 pensiun karena max_requests
+        del arbiter.workers[101]
+        arbiter.maintain_workers()
+
+        arbiter.spawn.assert_not_called()
+        arbiter.reload.assert_called_once()
@@ -0,0 +1,155 @@
+import pytest
+from unittest.mock import MagicMock
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.urldispatch import RoutesMapper
+
+from backend_edutrack.utils.ratelimit import (
+    MemoryRateLimitBackend,
+    RateLimiter,
+    RedisRateLimitBackend,
+    Rule,
+    parse_route_limits,
+    ratelimit_tween_factory,
+)
+
+
+class TestRules:
+
+    def test_parse(self):
+        rule = Rule.parse('user 60/30')
+
+        assert (rule.scope, rule.capacity, rule.period, rule.rate) == ('user', 60, 30.0, 2.0)
+
+    @pytest.mark.parametrize('spec', ['user 60', 'host 10/60', 'ip 0/60', 'ip 10/0', 'ip x/60'])
+    def test_parse_invalid(self, spec):
+        with pytest.raises(ValueError):
+            Rule.parse(spec)
+
+    def test_settings_replace_route_defaults(self):
+        defaults = {'login': ('ip 10/60',), 'list_posts': ('user 60/60', 'ip 300/60'), 'register': ('ip 5/60',)}
+        settings = {'ratelimit.routes': '\nlist_posts user 5/1\nregister off\nsuggest ip 20/1'}
+
+        limits = parse_route_limits(settings, defaults)
+
+        assert sorted(limits) == ['list_posts', 'login', 'suggest']
+        assert [(r.scope, r.capacity) for r in limits['list_posts']] == [('user', 5)]
+        assert limits['login'][0].capacity == 10
+
+
+class TestMemoryBackend:
+
+    def test_bucket_empties_and_refills(self):
+        backend = MemoryRateLimitBackend()
+
+        assert [backend.take('k', 2, 1.0, now=0)[0] for _ in range(3)] == [True, True, False]
+        assert backend.take('k', 2, 1.0, now=0) == (False, 1.0)
+        assert backend.take('k', 2, 1.0, now=1.0)[0] is True
+
+    def test_full_buckets_expire_lazily(self):
+        backend = MemoryRateLimitBackend()
+        backend.take('a', 2, 1.0, now=0)
+        backend.take('b', 2, 1.0, now=0)
+        assert len(backend) == 2
+
+        # Setelah 1 detik kedua bucket penuh lagi dan dibuang saat akses berikutnya
+        backend.take('c', 2, 1.0, now=1.0)
+
+        assert len(backend) == 1
+
+    def test_max_keys_evicts_least_recent(self):
+        backend = MemoryRateLimitBackend(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            backend.take(key, 1, 0.001, now=0)
+
+        assert len(backend) == 2
+        # 'a' sudah dibuang, jadi bucket-nya penuh lagi
+        assert backend.take('a', 1, 0.001, now=0)[0] is True
+        assert backend.take('c', 1, 0.001, now=0)[0] is False
+
+    def test_take_all_is_all_or_nothing(self):
+        backend = MemoryRateLimitBackend()
+        backend.take('user', 1, 1.0, now=0)
+
+        assert backend.take_all([('ip', 2, 1.0), ('user', 1, 1.0)], now=0) == (False, 1.0)
+        # Bucket ip tidak berkurang oleh request yang ditolak
+        assert backend.take_all([('ip', 2, 1.0)], now=0)[0] is True
+        assert backend.take_all([('ip', 2, 1.0)], now=0)[0] is True
+        assert backend.take_all([('ip', 2, 1.0)], now=0)[0] is False
+
+
+class TestRedisBackend:
+
+    def test_take_runs_script_with_prefixed_key(self):
+        script = MagicMock(return_value=[0, b'2'])
+        client = MagicMock()
+        client.register_script.return_value = script
+
+        allowed, retry_after = RedisRateLimitBackend(client).take_all(
+            [('list_posts:0:user:1', 60, 1.0), ('list_posts:1:ip:1.2.3.4', 300, 5.0)], now=100.0)
+
+        assert (allowed, retry_after) == (False, 2.0)
+        script.assert_called_once_with(
+            keys=['ratelimit:list_posts:0:user:1', 'ratelimit:list_posts:1:ip:1.2.3.4'],
+            args=[100.0, 60, 1.0, 300, 5.0],
+        )
+
+
+def make_request(path, user=None, addr='10.0.0.1', method='GET'):
+    request = Request.blank(path, environ={'REMOTE_ADDR': addr}, method=method)
+    if user is not None:
+        request.user = user
+    return request
+
+
+class TestRateLimitTween:
+
+    def tween(self, limits):
+        mapper = RoutesMapper()
+        mapper.connect('login', '/api/login')
+        mapper.connect('list_posts', '/api/posts/all')
+        mapper.connect('get_post', '/api/posts/{id}')
+        limiter = RateLimiter(MemoryRateLimitBackend(), parse_route_limits({}, limits))
+        registry = MagicMock(get={'rate_limiter': limiter}.get)
+        registry.queryUtility.return_value = mapper
+        handler = MagicMock(return_value=Response(json_body={}))
+        return ratelimit_tween_factory(handler, registry), handler
+
+    def test_over_limit_returns_429_with_retry_after(self):
+        tween, handler = self.tween({'login': ('ip 2/60',)})
+
+        statuses = [tween(make_request('/api/login', method='POST')).status_code for _ in range(3)]
+        response = tween(make_request('/api/login', method='POST'))
+
+        assert statuses == [200, 200, 429]
+        assert response.headers['Retry-After'] == '30'
+        assert handler.call_count == 2
+        # IP lain punya bucket sendiri
+        assert tween(make_request('/api/login', addr='10.0.0.2')).status_code == 200
+
+    def test_user_scope_is_per_user(self):
+        tween, _ = self.tween({'list_posts': ('user 1/60',)})
+
+        assert tween(make_request('/api/posts/all', user={"id": 1})).status_code == 200
+        assert tween(make_request('/api/posts/all', user={"id": 1})).status_code == 429
+        # Pengguna lain dari IP yang sama tidak ikut terkena
+        assert tween(make_request('/api/posts/all', user={"id": 2})).status_code == 200
+
+    def test_denied_request_does_not_drain_other_buckets(self):
+        tween, _ = self.tween({'list_posts': ('user 1/60', 'ip 2/60')})
+
+        assert tween(make_request('/api/posts/all', user={"id": 1})).status_code == 200
+        # Ditolak bucket user; bucket ip (sisa 1) tidak boleh ikut berkurang
+        for _ in range(3):
+            assert tween(make_request('/api/posts/all', user={"id": 1})).status_code == 429
+        assert tween(make_request('/api/posts/all', user={"id": 2})).status_code == 200
+
+    def test_unlimited_routes_and_preflight_pass_through(self):
+        tween, handler = self.tween({'login': ('ip 1/60',)})
+
+        for _ in range(3):
+            tween(make_request('/api/posts/5'))
+            tween(make_request('/api/login', method='OPTIONS'))
+            tween(make_request('/tidak-ada'))
+
+        assert handler.call_count == 9
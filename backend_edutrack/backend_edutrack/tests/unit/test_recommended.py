@@ -0,0 +1,96 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from backend_edutrack.models import Base, Post, User
+from backend_edutrack.models.post import post_recommendations
+from backend_edutrack.utils.pagination import encode_cursor, decode_cursor
+from backend_edutrack.views.recommended import (
+    recommended_page_query,
+    load_recommenders,
+    recommended_posts,
+)
+
+T0 = datetime(2026, 10, 19, 8, 0, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(User), [
+            {"id": 1, "name": "Mhs", "email": "m@student.itera.ac.id", "password": "x", "role": "Mahasiswa"},
+            {"id": 2, "name": "Dosen A", "email": "a@itera.ac.id", "password": "x", "role": "Dosen"},
+            {"id": 3, "name": "Dosen B", "email": "b@itera.ac.id", "password": "x", "role": "Dosen"},
+        ])
+        session.execute(insert(Post), [
+            {"id": i, "title": "P%d" % i, "content": "x", "author_id": 1} for i in range(1, 5)
+        ])
+        session.execute(insert(post_recommendations), [
+            {"post_id": 1, "user_id": 2, "created_at": T0},
+            {"post_id": 2, "user_id": 2, "created_at": T0 + timedelta(minutes=1)},
+            {"post_id": 1, "user_id": 3, "created_at": T0 + timedelta(minutes=2)},
+            {"post_id": 3, "user_id": 3, "created_at": T0 + timedelta(minutes=3)},
+        ])
+        session.commit()
+        yield session
+
+
+class TestRecommendedQuery:
+
+    def test_any_dosen_lists_each_post_once_by_latest_recommendation(self, session):
+        rows = session.execute(recommended_page_query(None, None, 10)).all()
+        assert [post_id for post_id, _ in rows] == [3, 1, 2]
+        assert rows[1][1] == T0 + timedelta(minutes=2)
+
+    def test_keyset_continues_after_cursor(self, session):
+        rows = session.execute(recommended_page_query(None, (T0 + timedelta(minutes=2), 1), 10)).all()
+        assert [post_id for post_id, _ in rows] == [2]
+
+    def test_filter_by_dosen(self, session):
+        rows = session.execute(recommended_page_query(2, None, 10)).all()
+        assert [post_id for post_id, _ in rows] == [2, 1]
+
+    def test_load_recommenders_in_one_query(self, session):
+        result = load_recommenders(session, [1, 2, 4])
+        assert [r["name"] for r in result[1]] == ["Dosen B", "Dosen A"]
+        assert [r["id"] for r in result[2]] == [2]
+        assert result[4] == []
+
+
+class TestRecommendedView:
+
+    @patch('backend_edutrack.views.recommended.add_viewer_state')
+    @patch('backend_edutrack.views.recommended.load_recommenders')
+    @patch('backend_edutrack.views.recommended.load_post_entries')
+    def test_page_with_next_cursor(self, mock_entries, mock_recommenders, mock_viewer, dummy_request, mock_dbsession):
+        mock_dbsession.execute.return_value.all.return_value = [
+            (3, T0 + timedelta(minutes=3)),
+            (1, T0 + timedelta(minutes=2)),
+            (2, T0 + timedelta(minutes=1)),
+        ]
+        mock_entries.side_effect = lambda request, cache, ids: {i: {"post": {"id": i}} for i in ids}
+        mock_recommenders.return_value = {3: [{"id": 3, "name": "Dosen B"}], 1: []}
+        dummy_request.params = {"limit": "2"}
+
+        response = recommended_posts(dummy_request)
+
+        assert [p["id"] for p in response["posts"]] == [3, 1]
+        assert response["posts"][0]["recommenders"] == [{"id": 3, "name": "Dosen B"}]
+        assert response["posts"][0]["recommended_at"] == (T0 + timedelta(minutes=3)).isoformat()
+        assert mock_recommenders.call_args[0][1] == [3, 1]
+        assert response["pagination"]["has_next"] is True
+        assert decode_cursor(response["pagination"]["next_cursor"], 2) == [(T0 + timedelta(minutes=2)).isoformat(), 1]
+
+    @pytest.mark.parametrize("params", [
+        {"cursor": "bukan-cursor"},
+        {"cursor": encode_cursor(["kemarin", 1])},
+        {"dosen_id": "abc"},
+    ])
+    def test_invalid_params(self, dummy_request, params):
+        dummy_request.params = params
+        response = recommended_posts(dummy_request)
+        assert response.status_code == 400
@@ -0,0 +1,154 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from backend_edutrack.models import Base, Post, User
+from backend_edutrack.utils.pagination import encode_cursor, decode_cursor, parse_limit
+from backend_edutrack.utils.search import PostgresSearch, SqliteFtsSearch, search_backend_for, tokenize
+from backend_edutrack.views.search import search_posts
+
+
+@pytest.fixture
+def search_backend(dummy_request):
+    backend = MagicMock()
+    dummy_request.registry['search_backend'] = backend
+    yield backend
+    dummy_request.registry.pop('search_backend', None)
+
+
+def fake_entries(ids):
+    return {post_id: {"post": {"id": post_id, "title": "Post %d" % post_id}} for post_id in ids}
+
+
+class TestPagination:
+
+    def test_cursor_roundtrip(self):
+        token = encode_cursor([1.5, 42])
+        assert decode_cursor(token, 2) == [1.5, 42]
+
+    @pytest.mark.parametrize("token", ["bukan-cursor", encode_cursor([1]), encode_cursor({"a": 1})])
+    def test_invalid_cursor(self, token):
+        with pytest.raises(ValueError):
+            decode_cursor(token, 2)
+
+    def test_parse_limit(self):
+        assert parse_limit(None) == 10
+        assert parse_limit('5') == 5
+        assert parse_limit('500') == 10
+        with pytest.raises(ValueError):
+            parse_limit('abc')
+
+
+class TestSearchView:
+
+    def test_missing_query(self, dummy_request, search_backend):
+        response = search_posts(dummy_request)
+        assert response.status_code == 400
+        search_backend.search.assert_not_called()
+
+    def test_invalid_cursor(self, dummy_request, search_backend):
+        dummy_request.params = {'q': 'python', 'cursor': '!!!'}
+        response = search_posts(dummy_request)
+        assert response.status_code == 400
+
+    def test_no_backend(self, dummy_request):
+        dummy_request.params = {'q': 'python'}
+        response = search_posts(dummy_request)
+        assert response.status_code == 501
+
+    def test_results_in_score_order_with_next_cursor(self, dummy_request, search_backend):
+        dummy_request.params = {'q': 'python', 'limit': '2'}
+        search_backend.search.return_value = [(7, 3.0), (3, 2.0), (5, 1.0)]
+
+        with patch('backend_edutrack.views.search.load_post_entries', side_effect=lambda r, c, ids: fake_entries(ids)) as load:
+            result = search_posts(dummy_request)
+
+        search_backend.search.assert_called_once_with(dummy_request.dbsession, 'python', 3, after=None)
+        load.assert_called_once()
+        assert load.call_args[0][2] == [7, 3]
+        assert [p["id"] for p in result["posts"]] == [7, 3]
+        assert result["posts"][0]["score"] == 3.0
+        assert result["pagination"]["has_next"] is True
+        assert decode_cursor(result["pagination"]["next_cursor"], 2) == [2.0, 3]
+
+    def test_cursor_passed_to_backend(self, dummy_request, search_backend):
+        dummy_request.params = {'q': 'python', 'cursor': encode_cursor([2.0, 3])}
+        search_backend.search.return_value = [(5, 1.0)]
+
+        with patch('backend_edutrack.views.search.load_post_entries', side_effect=lambda r, c, ids: fake_entries(ids)):
+            result = search_posts(dummy_request)
+
+        assert search_backend.search.call_args.kwargs['after'] == [2.0, 3]
+        assert result["pagination"]["has_next"] is False
+        assert result["pagination"]["next_cursor"] is None
+
+
+class TestSqliteFtsSearch:
+
+    @pytest.fixture
+    def session(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        backend = SqliteFtsSearch()
+        with engine.begin() as connection:
+            backend.ensure_schema(connection)
+        with Session(engine) as session:
+            session.execute(insert(User), [{
+                "id": 1, "name": "Tester", "email": "t@student.itera.ac.id",
+                "password": "x", "role": "Mahasiswa",
+            }])
+            yield session
+
+    def add_post(self, session, backend, post_id, title, content):
+        post = Post(id=post_id, title=title, content=content, author_id=1)
+        session.add(post)
+        session.flush()
+        backend.index_post(session, post)
+
+    def test_title_match_ranks_higher_and_paginates(self, session):
+        backend = SqliteFtsSearch()
+        self.add_post(session, backend, 1, "Catatan kalkulus", "Belajar python untuk integral")
+        self.add_post(session, backend, 2, "Python dasar", "Pengantar pemrograman")
+        self.add_post(session, backend, 3, "Biologi sel", "Tidak berhubungan")
+
+        hits = backend.search(session, 'python', 10)
+        assert [post_id for post_id, _ in hits] == [2, 1]
+
+        last_id, last_score = hits[0]
+        rest = backend.search(session, 'python', 10, after=(last_score, last_id))
+        assert [post_id for post_id, _ in rest] == [1]
+
+    def test_fts_syntax_is_escaped(self, session):
+        backend = SqliteFtsSearch()
+        self.add_post(session, backend, 1, "Python", "isi")
+        # Tanda kutip/operator FTS5 dari pengguna tidak boleh memicu syntax error
+        assert [post_id for post_id, _ in backend.search(session, '"python"* (', 10)] == [1]
+        assert backend.search(session, '***', 10) == []
+
+
+def test_backend_for_dialect():
+    assert isinstance(search_backend_for('sqlite'), SqliteFtsSearch)
+    assert search_backend_for('mysql') is None
+    assert tokenize("Belajar, Python!") == ["belajar", "python"]
+
+
+class TestPostgresSearch:
+
+    def test_config_from_settings(self):
+        backend = search_backend_for('postgresql', {'search.pg_config': 'english'})
+
+        assert backend.config == 'english'
+        assert "to_tsvector('english'" in backend.create_index_sql()
+        with pytest.raises(ValueError):
+            PostgresSearch(config="simple'); DROP TABLE posts; --")
+
+    def test_reindex_recreates_index_with_current_config(self):
+        connection = MagicMock()
+
+        PostgresSearch(config='english').reindex(connection)
+
+        statements = [str(call[0][0]) for call in connection.execute.call_args_list]
+        assert statements[0] == 'DROP INDEX IF EXISTS ix_posts_search_document'
+        assert statements[1].startswith('CREATE INDEX IF NOT EXISTS ix_posts_search_document')
+        assert "to_tsvector('english'" in statements[1]
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from backend_edutrack.utils.singleflight import SingleFlight, coalesce
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_one_load(self):
+        group = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def load():
+            calls.append(1)
+            release.wait(5)
+            return {"id": 1}
+
+        def call():
+            return group.do("post:1", load)
+
+        # Lepas leader setelah semua follower sempat bergabung
+        threading.Timer(0.2, release.set).start()
+        results, errors = run_concurrently(20, call)
+
+        assert errors == [None] * 20
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert group.in_flight() == 0
+
+    def test_error_propagates_to_followers(self):
+        group = SingleFlight()
+        release = threading.Event()
+
+        def load():
+            release.wait(5)
+            raise RuntimeError("db down")
+
+        threading.Timer(0.2, release.set).start()
+        results, errors = run_concurrently(5, lambda: group.do("k", load))
+
+        assert all(isinstance(e, RuntimeError) for e in errors)
+        assert group.in_flight() == 0
+
+    def test_sequential_calls_are_not_shared(self):
+        group = SingleFlight()
+        load = MagicMock(side_effect=[1, 2])
+        assert group.do("k", load) == 1
+        assert group.do("k", load) == 2
+
+    def test_follower_timeout_runs_own_load(self):
+        group = SingleFlight(timeout=0.05)
+        release = threading.Event()
+        leader = threading.Thread(target=lambda: group.do("k", lambda: release.wait(5)))
+        leader.start()
+        time.sleep(0.05)
+
+        assert group.do("k", lambda: "own") == "own"
+        release.set()
+        leader.join(5)
+
+
+class TestCoalesce:
+
+    def make_request(self, route_name, group):
+        request = MagicMock()
+        request.registry = {"singleflight": group} if group else {}
+        request.matched_route.name = route_name
+        return request
+
+    def test_disabled_route_calls_directly(self):
+        group = MagicMock(routes=frozenset(["get_post"]))
+        request = self.make_request("list_posts", group)
+        assert coalesce(request, 1, lambda: "direct") == "direct"
+        group.do.assert_not_called()
+
+    def test_enabled_route_uses_group(self):
+        group = SingleFlight(routes=["get_post"])
+        request = self.make_request("get_post", group)
+        assert coalesce(request, 1, lambda: "shared") == "shared"
+
+    def test_no_group_configured(self):
+        request = self.make_request("get_post", None)
+        assert coalesce(request, 1, lambda: "direct") == "direct"
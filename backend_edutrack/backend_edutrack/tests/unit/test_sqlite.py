@@ -0,0 +1,93 @@
+import os
+import time
+
+import pytest
+import transaction
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from backend_edutrack.models import (
+    get_engine,
+    get_session_factory,
+    get_tm_session,
+    sqlite_pragmas,
+    statement_timeouts,
+)
+
+
+def pragma(engine, name):
+    with engine.connect() as connection:
+        return connection.execute(text('PRAGMA %s' % name)).scalar()
+
+
+class TestSqlitePragmas:
+
+    def test_defaults_applied_to_file_database(self, tmp_path):
+        engine = get_engine({'sqlalchemy.url': 'sqlite:///' + os.path.join(str(tmp_path), 'db.sqlite')})
+
+        assert pragma(engine, 'journal_mode') == 'wal'
+        assert pragma(engine, 'synchronous') == 1
+        assert pragma(engine, 'busy_timeout') == 5000
+        assert pragma(engine, 'cache_size') == -65536
+        assert pragma(engine, 'temp_store') == 2
+        engine.dispose()
+
+    def test_settings_override_and_disable(self, tmp_path):
+        engine = get_engine({
+            'sqlalchemy.url': 'sqlite:///' + os.path.join(str(tmp_path), 'db.sqlite'),
+            'sqlite.journal_mode': '',
+            'sqlite.busy_timeout': '250',
+        })
+
+        assert pragma(engine, 'journal_mode') == 'delete'
+        assert pragma(engine, 'busy_timeout') == 250
+        engine.dispose()
+
+    def test_in_memory_skips_file_pragmas(self):
+        names = [name for name, _ in sqlite_pragmas({}, in_memory=True)]
+
+        assert 'journal_mode' not in names
+        assert 'mmap_size' not in names
+        assert 'busy_timeout' in names
+
+    def test_invalid_value_rejected(self):
+        with pytest.raises(ValueError):
+            sqlite_pragmas({'sqlite.cache_size': '1; DROP TABLE users'})
+
+
+SLOW_QUERY = text(
+    'WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000000) '
+    'SELECT count(*) FROM c'
+)
+
+
+class TestStatementTimeouts:
+
+    def test_parse_settings(self):
+        settings = {'db.statement_timeout': '30000', 'db.route_statement_timeouts': '\nlist_posts 5000\nsuggest 0'}
+
+        assert statement_timeouts(settings) == (30000, {'list_posts': 5000, 'suggest': 0})
+        assert statement_timeouts({}) == (0, {})
+
+    def test_sqlite_statement_interrupted(self, tmp_path):
+        engine = get_engine({
+            'sqlalchemy.url': 'sqlite:///' + os.path.join(str(tmp_path), 'db.sqlite'),
+            'db.statement_timeout': '100',
+        })
+        manager = transaction.TransactionManager(explicit=True)
+
+        manager.begin()
+        dbsession = get_tm_session(get_session_factory(engine), manager, statement_timeout=100)
+        started = time.monotonic()
+        with pytest.raises(OperationalError):
+            dbsession.execute(SLOW_QUERY)
+        assert time.monotonic() - started < 5
+        manager.abort()
+
+        # Batas tidak terbawa ke session berikutnya yang memakai koneksi yang sama
+        manager.begin()
+        dbsession = get_tm_session(get_session_factory(engine), manager)
+        assert dbsession.execute(text('SELECT 1')).scalar() == 1
+        assert dbsession.connection().info.get('statement_timeout') is None
+        manager.abort()
+        engine.dispose()
@@ -0,0 +1,48 @@
+import json
+import subprocess
+import sys
+
+from webtest import TestApp
+
+from backend_edutrack import main
+from backend_edutrack.security import create_token
+
+SETTINGS = {
+    'sqlalchemy.url': 'sqlite://',
+    'hot.enabled': 'false',
+    'suggest.enabled': 'false',
+}
+
+
+def loaded_modules(settings):
+    """Bangun aplikasi di interpreter baru dan kembalikan modul yang termuat."""
+    code = (
+        "import json, sys\n"
+        "from backend_edutrack import main\n"
+        "main({}, **json.loads(sys.argv[1]))\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code, json.dumps(settings)],
+                            capture_output=True, text=True, check=True)
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+class TestStartup:
+
+    def test_scan_only_imports_views(self):
+        modules = loaded_modules(SETTINGS)
+
+        assert 'backend_edutrack.views.post' in modules
+        assert 'backend_edutrack.scripts.prefork' not in modules
+        assert 'backend_edutrack.asgi' not in modules
+        assert not any(name.startswith('backend_edutrack.tests') for name in modules)
+        assert 'pyramid_jinja2' not in modules
+
+    def test_notfound_is_json_without_templates(self):
+        app = TestApp(main({}, **SETTINGS))
+        token = create_token({'id': 1, 'role': 'Mahasiswa', 'name': 'Mhs'})
+
+        response = app.get('/api/tidak-ada', headers={'Authorization': 'Bearer ' + token}, status=404)
+
+        assert response.content_type == 'application/json'
+        assert response.json == {"error": "Halaman tidak ditemukan."}
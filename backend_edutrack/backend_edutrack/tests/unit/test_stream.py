@@ -0,0 +1,250 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from backend_edutrack.models import Base, ChangeLog, Post, User, Comment
+from backend_edutrack.utils.changelog import ENTITY_POST, ENTITY_COMMENT, ENTITY_RECOMMENDATION
+from backend_edutrack.utils.events import EventBroker, ChangeFeed, wake_after_commit
+from backend_edutrack.views.stream import EventStream, hydrate_changes, stream
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+def event(event_id, post_id):
+    return {"id": event_id, "post_id": post_id, "frame": f"id: {event_id}\n\n".encode()}
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def feed(dummy_request):
+    feed = ChangeFeed(EventBroker(max_subscribers=2, history=10, queue_size=3))
+    feed.ensure_started = MagicMock()
+    dummy_request.registry['change_feed'] = feed
+    dummy_request.registry['dbsession_factory'] = MagicMock()
+    yield feed
+    dummy_request.registry.pop('change_feed', None)
+    dummy_request.registry.pop('dbsession_factory', None)
+
+
+class TestEventBroker:
+
+    def test_publish_only_reaches_subscribed_posts(self):
+        broker = EventBroker()
+        a = broker.subscribe([1, 2])
+        b = broker.subscribe([3])
+
+        broker.publish([event(1, 1), event(2, 3), event(3, 2)])
+
+        assert [e["id"] for e in a.drain(0)[0]] == [1, 3]
+        assert [e["id"] for e in b.drain(0)[0]] == [2]
+
+    def test_connection_limit_and_unsubscribe(self):
+        broker = EventBroker(max_subscribers=1)
+        subscriber = broker.subscribe([1])
+        assert broker.subscribe([1]) is None
+
+        broker.unsubscribe(subscriber)
+        assert broker.subscriber_count() == 0
+        assert broker._by_post == {}
+        assert broker.subscribe([1]) is not None
+
+    def test_last_event_id_replays_history(self):
+        broker = EventBroker()
+        broker.publish([event(1, 1), event(2, 1), event(3, 2), event(4, 1)])
+
+        subscriber = broker.subscribe([1], last_event_id=2)
+
+        events, overflowed = subscriber.drain(0)
+        assert [e["id"] for e in events] == [4]
+        assert overflowed is False
+
+    def test_last_event_id_older_than_history_requests_resync(self):
+        broker = EventBroker(history=2)
+        broker.publish([event(1, 1), event(2, 1), event(3, 1)])
+
+        subscriber = broker.subscribe([1], last_event_id=0)
+
+        events, overflowed = subscriber.drain(0)
+        assert [e["id"] for e in events] == [2, 3]
+        assert overflowed is True
+
+    def test_slow_subscriber_overflows(self):
+        broker = EventBroker(queue_size=2)
+        subscriber = broker.subscribe([1])
+        broker.publish([event(i, 1) for i in range(1, 5)])
+
+        events, overflowed = subscriber.drain(0)
+        assert [e["id"] for e in events] == [3, 4]
+        assert overflowed is True
+        assert subscriber.drain(0) == ([], False)
+
+
+class TestChangeFeed:
+
+    def test_idle_feed_only_tracks_position(self, session):
+        feed = ChangeFeed(EventBroker())
+        session.execute(insert(ChangeLog), [
+            {"entity": ENTITY_POST, "entity_id": 1, "post_id": 1, "created_at": NOW}
+        ] * 3)
+        hydrate = MagicMock()
+
+        feed.poll_once(session, hydrate)
+
+        assert feed.last_id == 3
+        hydrate.assert_not_called()
+
+    def test_poll_publishes_new_rows(self, session):
+        feed = ChangeFeed(EventBroker())
+        feed.last_id = 0
+        subscriber = feed.broker.subscribe([1])
+        session.execute(insert(ChangeLog), [
+            {"entity": ENTITY_POST, "entity_id": 1, "post_id": 1, "created_at": NOW}
+        ] * 2)
+        hydrate = MagicMock(side_effect=lambda db, rows: [event(row.id, row.post_id) for row in rows])
+
+        assert feed.poll_once(session, hydrate) == 2
+
+        assert feed.last_id == 2
+        assert [e["id"] for e in subscriber.drain(0)[0]] == [1, 2]
+        assert feed.poll_once(session, hydrate) == 0
+
+    def test_late_commit_below_last_id_is_published(self, session):
+        feed = ChangeFeed(EventBroker(), settle_seconds=2)
+        feed.last_id = 0
+        subscriber = feed.broker.subscribe([1])
+        hydrate = MagicMock(side_effect=lambda db, rows: [event(row.id, row.post_id) for row in rows])
+        change = {"entity": ENTITY_POST, "entity_id": 1, "post_id": 1, "created_at": NOW}
+        # Transaksi yang memegang id 2 belum commit saat id 3 sudah terlihat
+        session.execute(insert(ChangeLog), [dict(change, id=1), dict(change, id=3)])
+
+        assert feed.poll_once(session, hydrate, now=100.0) == 2
+        assert feed.last_id == 3 and feed.gaps == {2: 100.0}
+
+        session.execute(insert(ChangeLog), [dict(change, id=2)])
+        assert feed.poll_once(session, hydrate, now=101.0) == 1
+        assert [e["id"] for e in subscriber.drain(0)[0]] == [1, 3, 2]
+        assert feed.gaps == {}
+
+    def test_gap_expires_after_settle_seconds(self, session):
+        feed = ChangeFeed(EventBroker(), settle_seconds=2)
+        feed.last_id = 0
+        feed.broker.subscribe([1])
+        hydrate = MagicMock(return_value=[])
+        session.execute(insert(ChangeLog), [
+            {"id": 2, "entity": ENTITY_POST, "entity_id": 1, "post_id": 1, "created_at": NOW}])
+
+        feed.poll_once(session, hydrate, now=100.0)
+        assert feed.gaps == {1: 100.0}
+
+        # Id 1 tidak pernah ter-commit (rollback)
+        feed.poll_once(session, hydrate, now=103.0)
+        assert feed.gaps == {}
+
+    def test_wake_after_commit_uses_hook(self, dummy_request, feed):
+        dummy_request.tm = MagicMock()
+        wake_after_commit(dummy_request)
+
+        hook = dummy_request.tm.get.return_value.addAfterCommitHook.call_args[0][0]
+        hook(False)
+        assert not feed._wake.is_set()
+        hook(True)
+        assert feed._wake.is_set()
+
+
+class TestHydrateChanges:
+
+    def test_builds_one_event_per_post_and_comment(self, session):
+        session.add_all([
+            User(id=1, name="Mhs", email="m@student.itera.ac.id", password="x", role="Mahasiswa"),
+            Post(id=5, title="Judul", content="Isi", author_id=1, likes=3, dislikes=1, comment_count=1),
+        ])
+        session.flush()
+        session.add(Comment(id=9, content="hai", post_id=5, user_id=1))
+        session.flush()
+        rows = [
+            MagicMock(id=11, entity=ENTITY_POST, entity_id=5, post_id=5),
+            MagicMock(id=12, entity=ENTITY_COMMENT, entity_id=9, post_id=5),
+            MagicMock(id=13, entity=ENTITY_POST, entity_id=5, post_id=5),
+            MagicMock(id=14, entity=ENTITY_RECOMMENDATION, entity_id=2, post_id=5),
+        ]
+
+        events = hydrate_changes(session, rows)
+
+        assert [e["id"] for e in events] == [12, 13, 14]
+        assert b'event: comment' in events[0]["frame"]
+        assert b'"likes":3' in events[1]["frame"]
+        assert b'"recommenders":[]' in events[2]["frame"]
+
+
+class TestEventStream:
+
+    def test_stream_sends_events_and_heartbeat(self):
+        broker = EventBroker()
+        subscriber = broker.subscribe([1])
+        broker.publish([event(1, 1)])
+        iterator = iter(EventStream(broker, subscriber, heartbeat=0.01, max_duration=5, retry_ms=1000))
+
+        assert next(iterator) == b"retry: 1000\n\n"
+        assert next(iterator) == b"id: 1\n\n"
+        assert next(iterator) == b": ping\n\n"
+
+    def test_close_unsubscribes_without_iterating(self):
+        broker = EventBroker()
+        app_iter = EventStream(broker, broker.subscribe([1]))
+
+        app_iter.close()
+        app_iter.close()
+
+        assert broker.subscriber_count() == 0
+
+    def test_stream_ends_after_max_duration(self):
+        broker = EventBroker()
+        chunks = list(EventStream(broker, broker.subscribe([1]), heartbeat=0.01, max_duration=0.03))
+
+        assert chunks[0].startswith(b"retry:")
+        assert broker.subscriber_count() == 0
+
+
+class TestStreamView:
+
+    def test_disabled(self, dummy_request):
+        response = stream(dummy_request)
+        assert response.status_code == 501
+
+    @pytest.mark.parametrize("params", [{}, {"post_ids": "a,b"}, {"post_ids": ",".join(["1"] * 51)}])
+    def test_invalid_post_ids(self, dummy_request, feed, params):
+        dummy_request.params = params
+        response = stream(dummy_request)
+        assert response.status_code == 400
+
+    def test_opens_stream(self, dummy_request, feed):
+        dummy_request.params = {"post_ids": "1, 2"}
+        dummy_request.headers['Last-Event-ID'] = '7'
+
+        response = stream(dummy_request)
+
+        assert response.content_type == 'text/event-stream'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert isinstance(response.app_iter, EventStream)
+        assert response.app_iter.subscriber.post_ids == {1, 2}
+        feed.ensure_started.assert_called_once()
+        response.app_iter.close()
+
+    def test_full_returns_503(self, dummy_request, feed):
+        feed.broker.subscribe([1])
+        feed.broker.subscribe([1])
+        dummy_request.params = {"post_ids": "1"}
+
+        response = stream(dummy_request)
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '5'
@@ -0,0 +1,193 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from backend_edutrack.utils.cache import MemoryCacheBackend
+from backend_edutrack.utils.suggest import (
+    PrefixIndex,
+    SuggestService,
+    KIND_POST,
+    KIND_USER,
+    index_user_after_commit,
+    post_terms,
+    user_terms,
+)
+from backend_edutrack.views.suggest import suggest
+
+
+def make_service(posts=(), users=(), **kwargs):
+    service = SuggestService(**kwargs)
+    rows = [(KIND_POST, pid, {"id": pid, "title": title}, post_terms(title)) for pid, title in posts]
+    rows += [(KIND_USER, uid, {"id": uid, "name": name}, user_terms(name)) for uid, name in users]
+    service._load_rows = MagicMock(return_value=rows)
+    service._high_water = MagicMock(return_value=(max([0] + [r[1] for r in rows if r[0] == KIND_POST]),
+                                                  max([0] + [r[1] for r in rows if r[0] == KIND_USER])))
+    return service
+
+
+class TestPrefixIndex:
+
+    def test_prefix_matches_any_word(self):
+        index = PrefixIndex()
+        index.put(KIND_POST, 1, {"id": 1}, post_terms("Catatan Kalkulus Dasar"))
+        index.put(KIND_POST, 2, {"id": 2}, post_terms("Fisika Dasar"))
+
+        assert index.search(["kal"], KIND_POST, 10) == [{"id": 1}]
+        assert [d["id"] for d in index.search(["das"], KIND_POST, 10)] == [2, 1]
+        assert index.search(["fis", "das"], KIND_POST, 10) == [{"id": 2}]
+        assert index.search(["kimia"], KIND_POST, 10) == []
+
+    def test_put_replaces_old_terms(self):
+        index = PrefixIndex()
+        index.put(KIND_USER, 1, {"name": "Mhs"}, user_terms("Mhs"))
+        index.put(KIND_USER, 1, {"name": "Budi"}, user_terms("Budi Santoso"))
+
+        assert index.search(["mh"], KIND_USER, 10) == []
+        assert index.search(["san"], KIND_USER, 10) == [{"name": "Budi"}]
+        assert len(index) == 1
+
+    def test_results_are_bounded(self):
+        index = PrefixIndex()
+        index.bulk_load((KIND_POST, i, {"id": i}, ["python%d" % i]) for i in range(100))
+        assert len(index.search(["python"], KIND_POST, 5)) == 5
+        assert len(index.search(["python"], KIND_POST, 50, max_scan=10)) == 10
+
+
+class TestSuggestService:
+
+    def test_short_query_skips_index(self):
+        service = make_service(min_length=2)
+        assert service.suggest(MagicMock(), "k", 5) == {"posts": [], "users": []}
+        service._load_rows.assert_not_called()
+
+    def test_builds_once_and_caches_prefix(self):
+        service = make_service(
+            posts=[(1, "Kalkulus Dasar")],
+            users=[(5, "Kalila")],
+            cache=MemoryCacheBackend(),
+        )
+        first = service.suggest(MagicMock(), "kal", 5)
+        assert first == {"posts": [{"id": 1, "title": "Kalkulus Dasar"}],
+                         "users": [{"id": 5, "name": "Kalila"}]}
+
+        service.index.search = MagicMock()
+        assert service.suggest(MagicMock(), "KAL", 5) == first
+        service.index.search.assert_not_called()
+        service._load_rows.assert_called_once()
+
+    def test_put_invalidates_cached_prefix(self):
+        service = make_service(posts=[(1, "Kalkulus Dasar")], cache=MemoryCacheBackend())
+        service.suggest(MagicMock(), "kal", 5)
+
+        service.put_post(2, "Kalkulus Lanjut")
+        result = service.suggest(MagicMock(), "kal", 5)
+        assert [p["id"] for p in result["posts"]] == [2, 1]
+
+    def test_put_during_rebuild_is_not_lost(self):
+        service = make_service(posts=[(1, "Kalkulus Dasar")])
+        service.suggest(MagicMock(), "kal", 5)
+
+        def rows_with_concurrent_put(dbsession):
+            # Post dibuat oleh request lain setelah snapshot rebuild diambil
+            service.put_post(2, "Kalkulus Lanjut")
+            return [(KIND_POST, 1, {"id": 1, "title": "Kalkulus Dasar"}, post_terms("Kalkulus Dasar"))]
+
+        service._load_rows = rows_with_concurrent_put
+        service.rebuild(MagicMock())
+        result = service.suggest(MagicMock(), "kal", 5)
+        assert [p["id"] for p in result["posts"]] == [2, 1]
+
+    def test_refresh_loads_rows_from_other_processes(self):
+        service = make_service(posts=[(1, "Kalkulus Dasar")], users=[(3, "Kalila")], refresh_interval=10)
+        service.suggest(MagicMock(), "kal", 5)
+
+        # Pengguna hasil impor di proses lain
+        service._high_water.return_value = (1, 4)
+        service._load_rows = MagicMock(return_value=[(KIND_USER, 4, {"id": 4, "name": "Kalani"}, ["kalani"])])
+        service.suggest(MagicMock(), "kal", 5)
+        service._load_rows.assert_not_called()
+
+        service.refreshed_at -= 10
+        result = service.suggest(MagicMock(), "kal", 5)
+        service._load_rows.assert_called_once_with(service._load_rows.call_args[0][0], 1, 3)
+        assert sorted(u["id"] for u in result["users"]) == [3, 4]
+        assert service.high_water == (1, 4)
+
+        # Tanpa baris baru, refresh hanya membaca id terbesar
+        service.refreshed_at -= 10
+        service.suggest(MagicMock(), "kal", 5)
+        service._load_rows.assert_called_once()
+
+    def test_stale_index_rebuilt_in_background(self):
+        started, release = threading.Event(), threading.Event()
+        session_factory = MagicMock()
+        service = make_service(posts=[(1, "Kalkulus Dasar")], session_factory=session_factory)
+        service.suggest(MagicMock(), "kal", 5)
+        session_factory.assert_not_called()
+
+        def slow_rows(dbsession, post_since=0, user_since=0):
+            started.set()
+            release.wait(5)
+            return [(KIND_POST, 2, {"id": 2, "title": "Kalkulus Lanjut"}, post_terms("Kalkulus Lanjut"))]
+
+        service._load_rows = slow_rows
+        service.built_at -= 300
+        # Request tidak menunggu rebuild; hasil lama tetap dipakai
+        assert service.suggest(MagicMock(), "kal", 5)["posts"] == [{"id": 1, "title": "Kalkulus Dasar"}]
+        assert started.wait(5)
+        # Rebuild yang sedang berjalan tidak memulai thread kedua
+        service.suggest(MagicMock(), "kal", 5)
+        session_factory.assert_called_once()
+
+        release.set()
+        assert service._build_lock.acquire(timeout=5)
+        service._build_lock.release()
+        assert service.suggest(MagicMock(), "kal", 5)["posts"] == [{"id": 2, "title": "Kalkulus Lanjut"}]
+
+    def test_nim_is_not_indexed(self):
+        dbsession = MagicMock()
+        dbsession.execute.side_effect = [[], [(3, "Kalila")]]
+
+        rows = list(SuggestService()._load_rows(dbsession))
+
+        assert rows == [(KIND_USER, 3, {"id": 3, "name": "Kalila"}, ["kalila"])]
+        assert 'nim' not in str(dbsession.execute.call_args_list[1][0][0]).lower()
+
+
+@pytest.fixture
+def suggest_service(dummy_request):
+    service = make_service(posts=[(1, "Kalkulus Dasar")], users=[(3, "Kalila")])
+    dummy_request.registry['suggest'] = service
+    yield service
+    dummy_request.registry.pop('suggest', None)
+
+
+class TestSuggestView:
+
+    def test_returns_posts_and_users(self, dummy_request, suggest_service):
+        dummy_request.params = {'q': 'kal', 'limit': '5'}
+        result = suggest(dummy_request)
+        assert result["posts"] == [{"id": 1, "title": "Kalkulus Dasar"}]
+        assert result["users"] == [{"id": 3, "name": "Kalila"}]
+
+    def test_invalid_limit(self, dummy_request, suggest_service):
+        dummy_request.params = {'q': 'kal', 'limit': 'abc'}
+        response = suggest(dummy_request)
+        assert response.status_code == 400
+
+    def test_disabled(self, dummy_request):
+        dummy_request.params = {'q': 'kal'}
+        response = suggest(dummy_request)
+        assert response.status_code == 501
+
+    def test_profile_update_applied_after_commit(self, dummy_request, suggest_service):
+        suggest_service.suggest(MagicMock(), "kal", 5)
+        user = MagicMock(id=3, nim="120140003")
+        user.name = "Budi"
+
+        index_user_after_commit(dummy_request, user)
+
+        assert suggest_service.suggest(MagicMock(), "kal", 5)["users"] == []
+        assert suggest_service.suggest(MagicMock(), "bud", 5)["users"] == [{"id": 3, "name": "Budi"}]
+        assert suggest_service.suggest(MagicMock(), "1201", 5)["users"] == []
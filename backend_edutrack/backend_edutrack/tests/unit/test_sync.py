@@ -0,0 +1,137 @@
+import pytest
+import transaction
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from backend_edutrack.models import Base, ChangeLog
+from backend_edutrack.utils.changelog import (
+    record_changes,
+    read_changes,
+    latest_change_id,
+    ENTITY_POST,
+    ENTITY_COMMENT,
+    ENTITY_RECOMMENDATION,
+)
+from backend_edutrack.utils.pagination import encode_cursor, decode_cursor
+from backend_edutrack.views.sync import sync
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def add_rows(session, *ages):
+    session.execute(insert(ChangeLog), [
+        {"entity": ENTITY_POST, "entity_id": i + 1, "post_id": i + 1, "created_at": NOW - timedelta(seconds=age)}
+        for i, age in enumerate(ages)
+    ])
+
+
+class TestChangeLog:
+
+    def test_record_changes_uses_single_insert(self, dummy_request, mock_dbsession):
+        record_changes(dummy_request, (ENTITY_COMMENT, 9, 1), (ENTITY_POST, 1, 1))
+
+        mock_dbsession.execute.assert_called_once()
+        rows = mock_dbsession.execute.call_args[0][1]
+        assert [(r["entity"], r["entity_id"], r["post_id"]) for r in rows] == [("comment", 9, 1), ("post", 1, 1)]
+        mock_dbsession.add.assert_not_called()
+
+    def test_record_changes_inserts_just_before_commit(self, dummy_request, mock_dbsession):
+        # created_at harus dekat waktu commit agar jendela settle_seconds berlaku
+        dummy_request.tm = transaction.TransactionManager(explicit=True)
+        dummy_request.tm.begin()
+        record_changes(dummy_request, (ENTITY_POST, 1, 1))
+        mock_dbsession.execute.assert_not_called()
+
+        dummy_request.tm.commit()
+
+        mock_dbsession.execute.assert_called_once()
+
+    def test_read_changes_is_bounded(self, session):
+        add_rows(session, 60, 50, 40)
+        rows, has_more = read_changes(session, 0, 2, settle_seconds=2, now=NOW)
+        assert [r.id for r in rows] == [1, 2]
+        assert has_more is True
+
+        rows, has_more = read_changes(session, 2, 2, settle_seconds=2, now=NOW)
+        assert [r.id for r in rows] == [3]
+        assert has_more is False
+
+    def test_read_stops_at_first_unsettled_row(self, session):
+        # Baris 2 belum mengendap; baris 3 tidak boleh dikirim mendahuluinya
+        add_rows(session, 60, 1, 30)
+        rows, has_more = read_changes(session, 0, 10, settle_seconds=2, now=NOW)
+        assert [r.id for r in rows] == [1]
+        assert has_more is True
+
+    def test_latest_change_id(self, session):
+        assert latest_change_id(session, now=NOW) == 0
+        add_rows(session, 60, 50)
+        assert latest_change_id(session, settle_seconds=2, now=NOW) == 2
+        add_rows(session, 1, 30)
+        assert latest_change_id(session, settle_seconds=2, now=NOW) == 2
+
+
+def change(row_id, entity, entity_id, post_id):
+    row = MagicMock()
+    row.id, row.entity, row.entity_id, row.post_id = row_id, entity, entity_id, post_id
+    return row
+
+
+class TestSyncView:
+
+    def test_without_since_returns_start_token(self, dummy_request):
+        with patch('backend_edutrack.views.sync.latest_change_id', return_value=41):
+            response = sync(dummy_request)
+        assert decode_cursor(response["next_token"], 1) == [41]
+        assert response["posts"] == []
+
+    def test_invalid_token(self, dummy_request):
+        dummy_request.params = {"since": "bukan-token"}
+        response = sync(dummy_request)
+        assert response.status_code == 400
+
+    @patch('backend_edutrack.views.sync.add_viewer_state')
+    @patch('backend_edutrack.views.sync.load_recommenders')
+    @patch('backend_edutrack.views.sync.load_post_entries')
+    @patch('backend_edutrack.views.sync.read_changes')
+    def test_changes_are_deduplicated_and_batched(self, mock_read, mock_entries, mock_recommenders, mock_viewer, dummy_request, mock_dbsession):
+        mock_read.return_value = ([
+            change(11, ENTITY_POST, 5, 5),
+            change(12, ENTITY_COMMENT, 90, 5),
+            change(13, ENTITY_POST, 5, 5),
+            change(14, ENTITY_RECOMMENDATION, 2, 5),
+            change(15, ENTITY_POST, 3, 3),
+        ], True)
+        mock_entries.side_effect = lambda request, cache, ids: {i: {"post": {"id": i}} for i in ids}
+        mock_recommenders.return_value = {5: [{"id": 2, "name": "Dosen"}]}
+        comment = MagicMock(id=90, content="hai", created_at=NOW, post_id=5, user_id=1)
+        comment.user.name = "Mhs"
+        mock_dbsession.query.return_value.options.return_value.filter.return_value.order_by.return_value.all.return_value = [comment]
+        dummy_request.params = {"since": encode_cursor([10]), "limit": "5"}
+
+        response = sync(dummy_request)
+
+        assert mock_read.call_args[0][1:3] == (10, 5)
+        assert mock_entries.call_args[0][2] == [5, 3]
+        assert [p["id"] for p in response["posts"]] == [5, 3]
+        assert response["comments"][0]["username"] == "Mhs"
+        assert response["recommendations"] == {"5": [{"id": 2, "name": "Dosen"}]}
+        assert decode_cursor(response["next_token"], 1) == [15]
+        assert response["has_more"] is True
+
+    @patch('backend_edutrack.views.sync.read_changes', return_value=([], False))
+    def test_no_changes_keeps_token(self, mock_read, dummy_request):
+        dummy_request.params = {"since": encode_cursor([10])}
+        response = sync(dummy_request)
+        assert decode_cursor(response["next_token"], 1) == [10]
+        assert response["has_more"] is False
@@ -0,0 +1,170 @@
+"""
+Admission control: tolak lebih awal request berprioritas rendah saat server
+kelebihan beban, agar login dan operasi tulis tetap terlayani.
+
+Tween ini menghitung request yang sedang diproses (``in_flight``, yaitu
+thread waitress yang terpakai) dan rata-rata latensi terbaru (EWMA). Jika
+``in_flight`` mencapai ``admission.max_in_flight`` atau latensi di atas
+``admission.latency_target``, request GET/HEAD ke route berprioritas rendah
+(refresh feed, daftar komentar, pencarian, ...) langsung dijawab 503 dengan
+``Retry-After`` tanpa menyentuh database. Request lain selalu diterima.
+
+Latensi meluruh setengahnya setiap ``admission.latency_window`` detik tanpa
+sampel baru, sehingga setelah lonjakan mereda route berprioritas rendah
+diterima lagi walaupun semua request-nya sempat ditolak.
+
+Angka ``in_flight``, latensi dan jumlah request yang ditolak tersedia lewat
+``AdmissionController.metrics()`` (endpoint ``GET /api/metrics``).
+
+Setting yang dikenali:
+
+- ``admission.enabled`` (default true)
+- ``admission.low_priority_routes`` (default ``list_posts comment_by_post
+  recommended_posts search_posts suggest sync``)
+- ``admission.exclude_routes`` (default ``stream export``): tidak dihitung
+  sama sekali, misalnya koneksi SSE dan ekspor data yang memang berumur panjang
+- ``admission.max_in_flight`` (default 12)
+- ``admission.latency_target`` (detik, default 1.0)
+- ``admission.latency_window`` (detik, default 5)
+- ``admission.retry_after`` (detik, default 2)
+"""
+import threading
+import time
+
+from pyramid.interfaces import IRoutesMapper
+from pyramid.response import Response
+from pyramid.settings import asbool, aslist
+
+# Bobot sampel latensi terbaru pada EWMA
+EWMA_ALPHA = 0.2
+
+LOW_PRIORITY_METHODS = ('GET', 'HEAD')
+
+
+class AdmissionController:
+
+    def __init__(self, low_priority_routes=(), exclude_routes=(), max_in_flight=12,
+                 latency_target=1.0, latency_window=5.0):
+        self.low_priority_routes = frozenset(low_priority_routes)
+        self.exclude_routes = frozenset(exclude_routes)
+        self.max_in_flight = max_in_flight
+        self.latency_target = latency_target
+        self.latency_window = latency_window
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._latency = 0.0
+        self._latency_at = None
+        self._admitted = 0
+        self._shed = {}
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            low_priority_routes=aslist(settings.get(
+                'admission.low_priority_routes',
+                'list_posts comment_by_post recommended_posts search_posts suggest sync')),
+            exclude_routes=aslist(settings.get('admission.exclude_routes', 'stream export')),
+            max_in_flight=int(settings.get('admission.max_in_flight', 12)),
+            latency_target=float(settings.get('admission.latency_target', 1.0)),
+            latency_window=float(settings.get('admission.latency_window', 5)),
+        )
+
+    def is_low_priority(self, route_name, method):
+        return route_name in self.low_priority_routes and method in LOW_PRIORITY_METHODS
+
+    def _current_latency(self, now):
+        if self._latency_at is None:
+            return 0.0
+        return self._latency * 0.5 ** ((now - self._latency_at) / self.latency_window)
+
+    def _overloaded(self, now):
+        return self._in_flight >= self.max_in_flight or self._current_latency(now) > self.latency_target
+
+    def admit(self, route_name, low_priority, now=None):
+        """
+        Catat request baru. Mengembalikan False (tanpa mencatatnya sebagai
+        in-flight) jika request berprioritas rendah harus ditolak.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if low_priority and self._overloaded(now):
+                self._shed[route_name] = self._shed.get(route_name, 0) + 1
+                return False
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            self._admitted += 1
+            return True
+
+    def release(self, elapsed, now=None):
+        """Tandai request selesai setelah ``elapsed`` detik."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._in_flight -= 1
+            current = self._current_latency(now)
+            self._latency = elapsed if self._latency_at is None else current + EWMA_ALPHA * (elapsed - current)
+            self._latency_at = now
+
+    def metrics(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "max_in_flight": self.max_in_flight,
+                "latency_ms": round(self._current_latency(now) * 1000, 1),
+                "latency_target_ms": round(self.latency_target * 1000, 1),
+                "overloaded": self._overloaded(now),
+                "admitted": self._admitted,
+                "shed": sum(self._shed.values()),
+                "shed_by_route": dict(self._shed),
+            }
+
+
+def service_unavailable(retry_after):
+    response = Response(
+        json_body={"error": "Server sedang sibuk. Coba lagi sebentar lagi."},
+        status=503,
+    )
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def admission_tween_factory(handler, registry):
+    controller = registry.get('admission')
+    if controller is None:
+        return handler
+    mapper = registry.queryUtility(IRoutesMapper)
+    retry_after = int(registry.settings.get('admission.retry_after', 2))
+
+    def admission_tween(request):
+        # Routing baru terjadi setelah semua tween, jadi route dicocokkan di sini
+        route = mapper(request)['route']
+        route_name = route.name if route is not None else None
+        if route_name in controller.exclude_routes:
+            return handler(request)
+
+        if not controller.admit(route_name, controller.is_low_priority(route_name, request.method)):
+            return service_unavailable(retry_after)
+        started = time.monotonic()
+        try:
+            return handler(request)
+        finally:
+            controller.release(time.monotonic() - started)
+
+    return admission_tween
+
+
+def includeme(config):
+    """
+    Daftarkan ``AdmissionController`` dan tween-nya tepat di atas tween
+    autentikasi, sehingga request yang ditolak tidak perlu memeriksa JWT.
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('admission.enabled', True)):
+        return
+    config.registry['admission'] = AdmissionController.from_settings(settings)
+    config.add_tween(
+        'backend_edutrack.utils.admission.admission_tween_factory',
+        over='backend_edutrack.utils.auth_policy.auth_tween_factory',
+    )
@@ -1,4 +1,5 @@
 from pyramid.response import Response
+from pyramid.settings import aslist
 from .jwt_helper import decode_token
 
 def get_role_from_email(email):
@@ -9,6 +10,15 @@ def get_role_from_email(email):
     else:
         return 'Tamu'
 
+def is_admin(request):
+    """
+    True jika id pengguna dari JWT tercantum di setting ``admin.user_ids``
+    (daftar id dipisah spasi/baris). Dipakai endpoint operasional.
+    """
+    user_id = (getattr(request, 'user', None) or {}).get("id")
+    admin_ids = aslist((request.registry.settings or {}).get('admin.user_ids', ''))
+    return user_id is not None and str(user_id) in admin_ids
+
 def auth_tween_factory(handler, registry):
     def auth_tween(request):
         PUBLIC_PATH_PREFIXES = [
@@ -0,0 +1,186 @@
+"""
+Circuit breaker database: saat banyak statement gagal (koneksi putus,
+timeout, database terkunci), request baru langsung dijawab 503 alih-alih
+ikut mengantre di pool dan menunggu database yang sedang bermasalah.
+
+Hasil setiap statement dicatat lewat event engine (``after_cursor_execute``
+dan ``handle_error``) ke jendela bergulir per detik. Hanya error
+operasional yang dihitung gagal; ``IntegrityError`` dan sejenisnya adalah
+kesalahan data, bukan tanda database sakit.
+
+Status breaker:
+
+- ``closed``: semua request diteruskan. Jika dalam ``db.breaker.window``
+  detik terakhir ada minimal ``db.breaker.min_calls`` statement dan rasio
+  gagalnya >= ``db.breaker.failure_ratio``, breaker menjadi ``open``.
+- ``open``: semua request dijawab 503 dengan ``Retry-After`` selama
+  ``db.breaker.reset_timeout`` detik.
+- ``half_open``: satu request percobaan diteruskan. Statement yang berhasil
+  menutup breaker, yang gagal membukanya lagi.
+
+Setting yang dikenali:
+
+- ``db.breaker.enabled`` (default true)
+- ``db.breaker.window`` (detik, default 30)
+- ``db.breaker.min_calls`` (default 20)
+- ``db.breaker.failure_ratio`` (default 0.5)
+- ``db.breaker.reset_timeout`` (detik, default 10)
+"""
+import math
+import threading
+import time
+from collections import deque
+
+from pyramid.response import Response
+from pyramid.settings import asbool
+from sqlalchemy import event
+from sqlalchemy.exc import InterfaceError, InternalError, OperationalError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Error yang menandakan database (bukan data request) bermasalah
+FAILURE_ERRORS = (OperationalError, InterfaceError, InternalError)
+
+
+class CircuitBreaker:
+
+    def __init__(self, window=30, min_calls=20, failure_ratio=0.5, reset_timeout=10.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        # [detik, berhasil, gagal] per detik, paling lama ``window`` entri
+        self._buckets = deque()
+        self._opened_at = 0.0
+        self._probing = False
+        self._rejected = 0
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            window=int(settings.get('db.breaker.window', 30)),
+            min_calls=int(settings.get('db.breaker.min_calls', 20)),
+            failure_ratio=float(settings.get('db.breaker.failure_ratio', 0.5)),
+            reset_timeout=float(settings.get('db.breaker.reset_timeout', 10)),
+        )
+
+    def attach(self, engine):
+        """Catat hasil setiap statement ``engine``."""
+        event.listen(engine, 'after_cursor_execute', lambda *args: self.record(True))
+        event.listen(engine, 'handle_error', self._handle_error)
+
+    def _handle_error(self, context):
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, FAILURE_ERRORS):
+            self.record(False)
+
+    def record(self, success, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if success:
+                    self.state = CLOSED
+                    self._buckets.clear()
+                else:
+                    self._open(now)
+                return
+            if self.state == OPEN:
+                return
+
+            second = int(now)
+            if not self._buckets or self._buckets[-1][0] != second:
+                self._buckets.append([second, 0, 0])
+            self._buckets[-1][1 if success else 2] += 1
+            while self._buckets[0][0] <= second - self.window:
+                self._buckets.popleft()
+
+            if not success:
+                calls = sum(b[1] + b[2] for b in self._buckets)
+                failures = sum(b[2] for b in self._buckets)
+                if calls >= self.min_calls and failures >= calls * self.failure_ratio:
+                    self._open(now)
+
+    def _open(self, now):
+        self.state = OPEN
+        self._opened_at = now
+        self._buckets.clear()
+
+    def allow(self, now=None):
+        """
+        Boleh meneruskan request? Mengembalikan ``(diizinkan, probe)``;
+        ``probe`` True untuk request percobaan di status ``half_open``.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return True, False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True, True
+            self._rejected += 1
+            return False, False
+
+    def end_probe(self):
+        """Request percobaan selesai tanpa menjalankan statement apa pun."""
+        with self._lock:
+            self._probing = False
+
+    def retry_after(self, now=None):
+        now = time.monotonic() if now is None else now
+        return max(1, int(math.ceil(self.reset_timeout - (now - self._opened_at))))
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "calls": sum(b[1] + b[2] for b in self._buckets),
+                "failures": sum(b[2] for b in self._buckets),
+                "rejected": self._rejected,
+            }
+
+
+def breaker_tween_factory(handler, registry):
+    breaker = registry.get('db_breaker')
+    if breaker is None:
+        return handler
+
+    def breaker_tween(request):
+        allowed, probe = breaker.allow()
+        if not allowed:
+            response = Response(
+                json_body={"error": "Database sedang bermasalah. Coba lagi sebentar lagi."},
+                status=503,
+            )
+            response.headers['Retry-After'] = str(breaker.retry_after())
+            return response
+        if not probe:
+            return handler(request)
+        try:
+            return handler(request)
+        finally:
+            breaker.end_probe()
+
+    return breaker_tween
+
+
+def includeme(config):
+    """
+    Pasang ``CircuitBreaker`` ke engine ``dbsession_factory`` dan tween-nya
+    tepat di atas ``pyramid_tm``. Harus di-include setelah ``.models``.
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('db.breaker.enabled', True)):
+        return
+    breaker = CircuitBreaker.from_settings(settings)
+    breaker.attach(config.registry['dbsession_factory'].kw['bind'])
+    config.registry['db_breaker'] = breaker
+    config.add_tween(
+        'backend_edutrack.utils.breaker.breaker_tween_factory',
+        over='pyramid_tm.tm_tween_factory',
+    )
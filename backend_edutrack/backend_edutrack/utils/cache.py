@@ -0,0 +1,197 @@
+"""
+Cache respons untuk pembacaan post publik (``get_post`` dan halaman awal
+``list_posts``).
+
+Yang disimpan hanya bagian yang sama untuk semua pengguna:
+
+- ``post:<id>``  -> ``{"post": <post_to_dict>, "recommender_ids": [...]}``
+- ``feed:<gen>:<page>:<per_page>`` -> ``{"post_ids": [...], "pagination": {...}}``
+
+Halaman feed hanya menyimpan daftar ID, sehingga like/komentar pada satu post
+cukup menghapus ``post:<id>`` saja. Pembuatan post baru menggeser semua halaman,
+jadi feed di-invalidate dengan menaikkan generasi (``feed:gen``).
+
+Backend dapat diganti lewat setting ``cache.backend`` (dotted name ke kelas
+dengan ``from_settings(settings)`` serta method ``get``, ``get_many``, ``set``,
+``delete`` dan ``clear``), misalnya untuk memakai server cache lokal bersama.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from pyramid.settings import asbool
+
+FEED_GENERATION_KEY = 'feed:gen'
+
+
+class MemoryCacheBackend:
+    """
+    Backend default: cache di memori proses dengan TTL per entri dan eviksi LRU.
+    Aman dipakai dari banyak thread waitress sekaligus.
+    """
+
+    def __init__(self, max_entries=1024, default_ttl=60.0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            max_entries=int(settings.get('cache.max_entries', 1024)),
+            default_ttl=float(settings.get('cache.default_ttl', 60)),
+        )
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def get_many(self, keys):
+        result = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ResponseCache:
+    """
+    Lapisan di atas backend yang tahu format key post dan feed.
+    """
+
+    def __init__(self, backend, post_ttl=60.0, feed_ttl=15.0, feed_pages=3):
+        self.backend = backend
+        self.post_ttl = post_ttl
+        self.feed_ttl = feed_ttl
+        self.feed_pages = feed_pages
+
+    @staticmethod
+    def post_key(post_id):
+        return 'post:%d' % post_id
+
+    # --- Post tunggal ---
+    def get_post(self, post_id):
+        return self.backend.get(self.post_key(post_id))
+
+    def get_posts(self, post_ids):
+        """Ambil banyak entri post sekaligus, dikembalikan sebagai {id: entry}."""
+        keys = {self.post_key(pid): pid for pid in post_ids}
+        found = self.backend.get_many(list(keys))
+        return {keys[key]: entry for key, entry in found.items()}
+
+    def set_post(self, post_id, entry):
+        self.backend.set(self.post_key(post_id), entry, self.post_ttl)
+
+    def invalidate_post(self, post_id):
+        self.backend.delete(self.post_key(post_id))
+
+    # --- Halaman feed ---
+    def feed_cacheable(self, page):
+        return 1 <= page <= self.feed_pages
+
+    def _feed_generation(self):
+        generation = self.backend.get(FEED_GENERATION_KEY)
+        if generation is None:
+            # Mulai dari waktu sekarang agar generasi lama yang mungkin masih
+            # tersimpan tidak pernah terpakai lagi setelah key ini hilang.
+            generation = int(time.time() * 1000)
+            self.backend.set(FEED_GENERATION_KEY, generation, 0)
+        return generation
+
+    def _feed_key(self, page, per_page):
+        return 'feed:%d:%d:%d' % (self._feed_generation(), page, per_page)
+
+    def get_feed(self, page, per_page):
+        return self.backend.get(self._feed_key(page, per_page))
+
+    def set_feed(self, page, per_page, entry):
+        self.backend.set(self._feed_key(page, per_page), entry, self.feed_ttl)
+
+    def invalidate_feed(self):
+        current = self.backend.get(FEED_GENERATION_KEY) or 0
+        generation = max(current + 1, int(time.time() * 1000))
+        self.backend.set(FEED_GENERATION_KEY, generation, 0)
+
+
+def get_response_cache(request):
+    """Kembalikan ``ResponseCache`` aplikasi, atau None jika cache tidak aktif."""
+    return request.registry.get('response_cache')
+
+
+def invalidate_after_commit(request, post_ids=(), feed=False):
+    """
+    Hapus key yang terdampak setelah transaksi request berhasil di-commit,
+    supaya pembaca lain tidak mengisi ulang cache dengan data sebelum commit.
+    """
+    cache = get_response_cache(request)
+    if cache is None:
+        return
+
+    post_ids = list(post_ids)
+
+    def invalidate(success=True):
+        if not success:
+            return
+        for post_id in post_ids:
+            cache.invalidate_post(post_id)
+        if feed:
+            cache.invalidate_feed()
+
+    tm = getattr(request, 'tm', None)
+    if tm is None:
+        invalidate()
+        return
+    tm.get().addAfterCommitHook(invalidate)
+
+
+def includeme(config):
+    """
+    Aktifkan cache respons. Setting yang dikenali:
+
+    - ``cache.enabled`` (default true)
+    - ``cache.backend`` (default ``MemoryCacheBackend``)
+    - ``cache.max_entries``, ``cache.default_ttl``
+    - ``cache.post_ttl``, ``cache.feed_ttl``, ``cache.feed_pages``
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('cache.enabled', True)):
+        return
+
+    backend_cls = config.maybe_dotted(settings.get('cache.backend', MemoryCacheBackend))
+    config.registry['response_cache'] = ResponseCache(
+        backend_cls.from_settings(settings),
+        post_ttl=float(settings.get('cache.post_ttl', 60)),
+        feed_ttl=float(settings.get('cache.feed_ttl', 15)),
+        feed_pages=int(settings.get('cache.feed_pages', 3)),
+    )
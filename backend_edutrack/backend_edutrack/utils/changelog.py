@@ -0,0 +1,91 @@
+"""
+Pencatatan perubahan untuk delta sync (``/api/sync``).
+
+Setiap view yang mengubah data memanggil ``record_changes`` sebelum request
+selesai, sehingga baris ``change_log`` ikut ter-commit atau ter-rollback
+bersama perubahannya. Baris ditulis dengan ``INSERT`` langsung (bukan
+``dbsession.add``) agar tidak ikut unit-of-work ORM.
+
+Token sinkronisasi adalah ``change_log.id`` terakhir yang sudah dikirim,
+dibungkus sebagai cursor opaque. Pada PostgreSQL nilai sequence bisa
+ter-commit tidak berurutan, jadi pembaca hanya mengembalikan baris yang lebih
+tua dari ``sync.settle_seconds`` dan berhenti di baris pertama yang belum
+"mengendap", supaya transaksi yang commit belakangan tidak terlewati.
+
+Jendela itu diukur dari ``created_at``, yaitu saat baris di-insert. Karena
+itu ``record_changes`` menunda insert ke before-commit hook transaksi:
+``id`` dan ``created_at`` baru diambil di akhir request, bukan saat view
+memanggilnya. Batas yang tersisa: jika COMMIT sendiri (misalnya menunggu
+lock atau replikasi sinkron) lebih lama dari ``sync.settle_seconds``,
+barisnya bisa ter-commit dengan ``id`` di bawah token yang sudah dipegang
+klien dan tidak pernah dikirim lewat ``/api/sync``. Naikkan
+``sync.settle_seconds`` di atas waktu commit terlama yang wajar.
+
+Tabel yang sama menjadi sumber event untuk ``/api/stream`` (``utils.events``).
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from ..models.change_log import ChangeLog
+from .events import wake_after_commit
+
+ENTITY_POST = 'post'
+ENTITY_COMMENT = 'comment'
+ENTITY_RECOMMENDATION = 'recommendation'
+
+
+def insert_changes(dbsession, changes):
+    now = datetime.utcnow()
+    dbsession.execute(insert(ChangeLog), [
+        {"entity": entity, "entity_id": entity_id, "post_id": post_id, "created_at": now}
+        for entity, entity_id, post_id in changes
+    ])
+
+
+def record_changes(request, *changes):
+    """
+    Catat satu atau lebih perubahan ``(entity, entity_id, post_id)`` dalam
+    transaksi request saat ini. Insert-nya dijalankan tepat sebelum commit.
+    """
+    tm = getattr(request, 'tm', None)
+    if tm is None:
+        insert_changes(request.dbsession, changes)
+    else:
+        tm.get().addBeforeCommitHook(insert_changes, (request.dbsession, changes))
+    # Stream SSE di proses ini tidak perlu menunggu interval polling
+    wake_after_commit(request)
+
+
+def read_changes(dbsession, since, limit, settle_seconds=2.0, now=None):
+    """
+    Baca maksimal ``limit`` perubahan dengan ``id > since`` yang sudah mengendap.
+    Mengembalikan ``(rows, has_more)``.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=settle_seconds)
+    rows = dbsession.execute(
+        select(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.post_id, ChangeLog.created_at)
+        .where(ChangeLog.id > since)
+        .order_by(ChangeLog.id)
+        .limit(limit + 1)
+    ).all()
+
+    settled = []
+    for row in rows:
+        if row.created_at > cutoff:
+            # Sisanya dibaca di sync berikutnya
+            return settled, True
+        settled.append(row)
+    has_more = len(settled) > limit
+    return settled[:limit], has_more
+
+
+def latest_change_id(dbsession, settle_seconds=2.0, now=None):
+    """Token awal untuk klien baru: id perubahan terakhir yang sudah mengendap."""
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=settle_seconds)
+    first_unsettled = dbsession.execute(
+        select(func.min(ChangeLog.id)).where(ChangeLog.created_at > cutoff)
+    ).scalar()
+    if first_unsettled is not None:
+        return first_unsettled - 1
+    return dbsession.execute(select(func.max(ChangeLog.id))).scalar() or 0
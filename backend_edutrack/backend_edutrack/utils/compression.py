@@ -0,0 +1,127 @@
+"""
+Tween kompresi respons (gzip, dan Brotli jika paket ``brotli`` terpasang).
+
+Hanya respons JSON dengan body di atas ``compression.min_size`` byte yang
+dikompres, dan hanya jika klien mengirim ``Accept-Encoding`` yang sesuai.
+Hasil kompresi disimpan di cache kecil berdasarkan digest body, sehingga
+payload yang sama (misalnya halaman feed dari cache respons) tidak perlu
+dikompres ulang di setiap hit.
+
+Setting yang dikenali:
+
+- ``compression.enabled`` (default true)
+- ``compression.min_size`` (default 1024)
+- ``compression.gzip_level`` (default 6)
+- ``compression.brotli_quality`` (default 5)
+- ``compression.content_types`` (default ``application/json``)
+- ``compression.cache_entries`` (default 256, 0 untuk mematikan cache)
+"""
+import gzip
+import hashlib
+
+from pyramid.settings import asbool, aslist
+
+from .cache import MemoryCacheBackend
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli opsional
+    brotli = None
+
+
+def parse_accept_encoding(header):
+    """
+    Ubah header ``Accept-Encoding`` menjadi {encoding: q}.
+    """
+    result = {}
+    for part in header.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        coding, _, params = part.partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        result[coding.strip().lower()] = q
+    return result
+
+
+def choose_encoding(header, available):
+    """
+    Pilih encoding dari ``available`` (urut preferensi server) dengan q tertinggi.
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding, gzip_level=6, brotli_quality=5):
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def _add_vary(response, value):
+    existing = [v.strip() for v in response.headers.get('Vary', '').split(',') if v.strip()]
+    if value not in existing:
+        existing.append(value)
+    response.headers['Vary'] = ', '.join(existing)
+
+
+def compression_tween_factory(handler, registry):
+    settings = registry.settings
+    if not asbool(settings.get('compression.enabled', True)):
+        return handler
+
+    min_size = int(settings.get('compression.min_size', 1024))
+    gzip_level = int(settings.get('compression.gzip_level', 6))
+    brotli_quality = int(settings.get('compression.brotli_quality', 5))
+    content_types = set(aslist(settings.get('compression.content_types', 'application/json')))
+    cache_entries = int(settings.get('compression.cache_entries', 256))
+    body_cache = MemoryCacheBackend(max_entries=cache_entries, default_ttl=300) if cache_entries else None
+    available = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def compression_tween(request):
+        response = handler(request)
+
+        if response.content_type not in content_types:
+            return response
+        if response.headers.get('Content-Encoding'):
+            return response
+        # Respons streaming (app_iter generator) dibiarkan apa adanya
+        if not isinstance(response.app_iter, (list, tuple)):
+            return response
+
+        body = response.body
+        if len(body) < min_size:
+            return response
+
+        _add_vary(response, 'Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'), available)
+        if encoding is None:
+            return response
+
+        compressed = None
+        if body_cache is not None:
+            cache_key = (encoding, hashlib.sha1(body).digest())
+            compressed = body_cache.get(cache_key)
+        if compressed is None:
+            compressed = compress(body, encoding, gzip_level, brotli_quality)
+            if body_cache is not None:
+                body_cache.set(cache_key, compressed)
+
+        response.body = compressed
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return compression_tween
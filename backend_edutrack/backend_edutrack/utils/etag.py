@@ -0,0 +1,49 @@
+"""
+Helper ETag / conditional GET.
+
+ETag dibentuk dari ``Post.version`` sehingga pengecekan ``If-None-Match`` cukup
+membaca satu kolom, tanpa memuat dan men-serialisasi post lengkap.
+Respons juga memuat field per-pengguna, maka selalu dikirim dengan
+``Vary: Authorization``; setiap perubahan field tersebut ikut menaikkan versi.
+"""
+from pyramid.response import Response
+
+
+def post_etag(post_id, version):
+    return 'W/"post-%d-%d"' % (post_id, version)
+
+
+def comments_etag(post_id, version, page, per_page):
+    return 'W/"comments-%d-%d-%d-%d"' % (post_id, version, page, per_page)
+
+
+def _strip_weak(tag):
+    tag = tag.strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    return tag
+
+
+def etag_matches(request, etag):
+    """
+    True jika header ``If-None-Match`` cocok dengan ``etag`` (perbandingan lemah).
+    """
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    wanted = _strip_weak(etag)
+    return any(_strip_weak(tag) == wanted for tag in header.split(','))
+
+
+def set_etag(response, etag):
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['Vary'] = 'Authorization'
+    return response
+
+
+def not_modified(etag):
+    """Respons 304 tanpa body."""
+    return set_etag(Response(status=304), etag)
@@ -0,0 +1,252 @@
+"""
+Pub/sub di dalam proses untuk stream Server-Sent Events (``/api/stream``).
+
+- ``EventBroker`` membagikan event ke subscriber berdasarkan post ID. Setiap
+  koneksi hanya menyimpan set post ID, antrean kecil berukuran tetap, dan satu
+  ``threading.Event``. Riwayat event terakhir disimpan untuk melanjutkan
+  stream dari header ``Last-Event-ID``.
+- ``ChangeFeed`` adalah satu thread per proses yang membaca tabel
+  ``change_log`` (lihat ``utils.changelog``). Event dibangun sekali per
+  batch oleh fungsi ``hydrate`` lalu dibagikan ke semua koneksi. Karena
+  sumbernya database, perubahan dari worker lain juga ikut terkirim. Commit
+  di proses yang sama membangunkan thread lewat ``wake()``, sehingga event
+  lokal terkirim tanpa menunggu ``sse.poll_interval``.
+
+  Di PostgreSQL id ``change_log`` bisa ter-commit tidak berurutan, jadi baris
+  dengan id lebih kecil dari yang sudah dikirim bisa muncul belakangan. Baris
+  baru tetap dikirim langsung, tetapi id yang terlewati dicatat sebagai celah
+  dan ikut dibaca di setiap polling sampai barisnya muncul (lalu dikirim) atau
+  lebih tua dari ``sync.settle_seconds`` (dianggap rollback). Klien yang
+  menyambung ulang dengan ``Last-Event-ID`` di atas id celah itu tidak
+  menerimanya dari riwayat; ``/api/sync`` tetap lengkap.
+
+Setting yang dikenali:
+
+- ``sse.enabled`` (default true)
+- ``sse.max_connections`` (default 8): jumlah stream bersamaan per proses.
+  Di waitress setiap stream memakai satu thread, jadi nilainya harus di bawah
+  ``threads`` pada ``[server:main]``.
+- ``sse.max_posts`` (default 50): batas post ID per koneksi
+- ``sse.heartbeat`` (detik, default 15), ``sse.retry`` (milidetik, default 3000)
+- ``sse.max_duration`` (detik, default 120): stream ditutup lalu klien
+  menyambung ulang dengan ``Last-Event-ID``, sehingga thread tidak tertahan terus
+- ``sse.poll_interval`` (detik, default 1)
+- ``sse.history`` (default 1000), ``sse.queue_size`` (default 100)
+"""
+import logging
+import threading
+import time
+from collections import deque, defaultdict
+
+from pyramid.settings import asbool
+from sqlalchemy import or_, select
+
+log = logging.getLogger(__name__)
+
+
+class Subscriber:
+    __slots__ = ('post_ids', 'queue', 'ready', 'overflowed', 'notify')
+
+    def __init__(self, post_ids, queue_size):
+        self.post_ids = frozenset(post_ids)
+        self.queue = deque(maxlen=queue_size)
+        self.ready = threading.Event()
+        self.overflowed = False
+        # Callback tambahan saat ada event, untuk pembaca asyncio (entry point ASGI)
+        self.notify = None
+
+    def push(self, event):
+        if len(self.queue) == self.queue.maxlen:
+            # Klien terlalu lambat; event lama terbuang dan klien perlu /api/sync
+            self.overflowed = True
+        self.queue.append(event)
+        self.ready.set()
+        if self.notify is not None:
+            self.notify()
+
+    def take(self):
+        """Ambil semua event yang antre tanpa menunggu; kembalikan (events, overflowed)."""
+        self.ready.clear()
+        events = []
+        while self.queue:
+            events.append(self.queue.popleft())
+        overflowed, self.overflowed = self.overflowed, False
+        return events, overflowed
+
+    def drain(self, timeout):
+        """Tunggu event hingga ``timeout`` detik; kembalikan (events, overflowed)."""
+        self.ready.wait(timeout)
+        return self.take()
+
+
+class EventBroker:
+
+    def __init__(self, max_subscribers=8, history=1000, queue_size=100):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._history = deque(maxlen=history)
+        self._by_post = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def subscriber_count(self):
+        return self._count
+
+    def subscribe(self, post_ids, last_event_id=None):
+        """
+        Daftarkan subscriber baru, atau None jika batas koneksi tercapai.
+        Event di riwayat dengan id > ``last_event_id`` langsung diantrekan.
+        """
+        subscriber = Subscriber(post_ids, self.queue_size)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            self._count += 1
+            for post_id in subscriber.post_ids:
+                self._by_post[post_id].add(subscriber)
+            if last_event_id is not None:
+                if not self._history or self._history[0]["id"] > last_event_id + 1:
+                    # Event setelah last_event_id mungkin sudah tidak ada di riwayat
+                    subscriber.overflowed = True
+                    subscriber.ready.set()
+                for event in self._history:
+                    if event["id"] > last_event_id and event["post_id"] in subscriber.post_ids:
+                        subscriber.push(event)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._count -= 1
+            for post_id in subscriber.post_ids:
+                subscribers = self._by_post.get(post_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._by_post[post_id]
+
+    def publish(self, events):
+        """``events``: list dict dengan key ``id``, ``post_id`` dan ``frame`` (bytes siap kirim)."""
+        with self._lock:
+            for event in events:
+                self._history.append(event)
+                for subscriber in self._by_post.get(event["post_id"], ()):
+                    subscriber.push(event)
+
+
+class ChangeFeed:
+
+    def __init__(self, broker, poll_interval=1.0, batch_size=500, settle_seconds=2.0, max_gaps=1000):
+        self.broker = broker
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.settle_seconds = settle_seconds
+        self.max_gaps = max_gaps
+        self.last_id = None
+        # id di bawah last_id yang belum terlihat -> waktu (monotonic) pertama dilewati
+        self.gaps = {}
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def wake(self):
+        self._wake.set()
+
+    def ensure_started(self, session_factory, hydrate):
+        """
+        Mulai thread pembaca change log (sekali per proses). ``hydrate(dbsession,
+        rows)`` mengubah baris change log menjadi list event untuk broker.
+        """
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._loop, args=(session_factory, hydrate), name='change-feed', daemon=True)
+            self._thread.start()
+
+    def poll_once(self, dbsession, hydrate, now=None):
+        from ..models.change_log import ChangeLog
+        from .changelog import latest_change_id
+
+        now = time.monotonic() if now is None else now
+        if self.last_id is None or not self.broker.subscriber_count():
+            # Tanpa subscriber cukup ikuti posisi terakhir yang sudah
+            # mengendap, tanpa membangun event
+            self.last_id = latest_change_id(dbsession, self.settle_seconds)
+            self.gaps.clear()
+            return 0
+
+        for gap_id, seen_at in list(self.gaps.items()):
+            if now - seen_at > self.settle_seconds:
+                del self.gaps[gap_id]
+        condition = ChangeLog.id > self.last_id
+        if self.gaps:
+            condition = or_(condition, ChangeLog.id.in_(sorted(self.gaps)))
+        rows = dbsession.execute(
+            select(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.post_id)
+            .where(condition)
+            .order_by(ChangeLog.id)
+            .limit(self.batch_size)
+        ).all()
+        if not rows:
+            return 0
+
+        previous = self.last_id
+        for row in rows:
+            if row.id <= previous:
+                # Celah yang akhirnya ter-commit
+                self.gaps.pop(row.id, None)
+                continue
+            for missing in range(max(previous + 1, row.id - self.max_gaps), row.id):
+                if len(self.gaps) >= self.max_gaps:
+                    break
+                self.gaps[missing] = now
+            previous = row.id
+        self.broker.publish(hydrate(dbsession, rows))
+        self.last_id = previous
+        return len(rows)
+
+    def _loop(self, session_factory, hydrate):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            dbsession = session_factory()
+            try:
+                while self.poll_once(dbsession, hydrate) >= self.batch_size:
+                    pass
+            except Exception:
+                log.exception("Gagal membaca change_log untuk stream")
+            finally:
+                dbsession.close()
+
+
+def get_change_feed(request):
+    return request.registry.get('change_feed')
+
+
+def wake_after_commit(request):
+    """Bangunkan ``ChangeFeed`` setelah transaksi request berhasil di-commit."""
+    feed = get_change_feed(request)
+    if feed is None:
+        return
+    tm = getattr(request, 'tm', None)
+    if tm is None:
+        feed.wake()
+        return
+    tm.get().addAfterCommitHook(lambda success: success and feed.wake())
+
+
+def includeme(config):
+    settings = config.get_settings()
+    if not asbool(settings.get('sse.enabled', True)):
+        return
+
+    broker = EventBroker(
+        max_subscribers=int(settings.get('sse.max_connections', 8)),
+        history=int(settings.get('sse.history', 1000)),
+        queue_size=int(settings.get('sse.queue_size', 100)),
+    )
+    config.registry['change_feed'] = ChangeFeed(
+        broker,
+        poll_interval=float(settings.get('sse.poll_interval', 1)),
+        settle_seconds=float(settings.get('sync.settle_seconds', 2)),
+    )
@@ -0,0 +1,157 @@
+"""
+Ekspor post (beserta referensi), komentar, dan interaksi like/dislike
+sebagai NDJSON atau CSV, dipakai oleh command ``export_backend_edutrack_data``
+dan endpoint ``GET /api/admin/export``.
+
+Baris dibaca dengan server-side cursor (``yield_per``, yang juga mengaktifkan
+``stream_results``) dan langsung diubah menjadi potongan byte oleh generator,
+sehingga memori tetap datar berapa pun ukuran tabelnya. Referensi post
+di-join lalu dikelompokkan per post selama streaming (hasil diurutkan
+berdasarkan id post), tanpa memuat relasi ORM.
+
+Generator membuka koneksinya sendiri: ``app_iter`` baru dikonsumsi server
+setelah transaksi request (``pyramid_tm``) selesai. Semua entitas dibaca
+dalam satu transaksi agar hasilnya konsisten satu sama lain: ``REPEATABLE
+READ`` di PostgreSQL, dan ``BEGIN`` eksplisit di SQLite (driver ``sqlite3``
+tidak membuka transaksi untuk SELECT, sehingga tanpa itu setiap SELECT
+memakai snapshot sendiri). Di SQLite, transaksi baca yang panjang menahan
+checkpoint WAL selama ekspor berjalan.
+"""
+import csv
+import io
+import json
+import zlib
+from itertools import groupby
+
+from sqlalchemy import select
+
+from ..models.comment import Comment
+from ..models.post import Post, PostInteraction, post_references
+from ..models.url import URL
+
+ENTITIES = ('posts', 'comments', 'interactions')
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+# Kolom per entitas, sekaligus urutan kolom CSV
+COLUMNS = {
+    'posts': ('id', 'title', 'content', 'created_at', 'author_id', 'author_prodi',
+              'likes', 'dislikes', 'comment_count', 'references'),
+    'comments': ('id', 'post_id', 'user_id', 'content', 'created_at'),
+    'interactions': ('id', 'post_id', 'user_id', 'interaction_type', 'created_at'),
+}
+# Nilai "type" per baris NDJSON
+RECORD_TYPES = {'posts': 'post', 'comments': 'comment', 'interactions': 'interaction'}
+
+# Target ukuran potongan yang diserahkan ke server/file
+CHUNK_SIZE = 64 * 1024
+
+
+def _record(row, columns):
+    record = {}
+    for name in columns:
+        value = row[name]
+        record[name] = value.isoformat() if hasattr(value, 'isoformat') else value
+    return record
+
+
+def iter_posts(connection, batch_size=1000):
+    columns = COLUMNS['posts'][:-1]
+    query = (
+        select(*[Post.__table__.c[name] for name in columns], URL.url)
+        .select_from(Post)
+        .outerjoin(post_references, post_references.c.post_id == Post.id)
+        .outerjoin(URL, URL.id == post_references.c.url_id)
+        .order_by(Post.id)
+    )
+    result = connection.execution_options(yield_per=batch_size).execute(query)
+    for _, rows in groupby(result.mappings(), key=lambda row: row['id']):
+        first = next(rows)
+        record = _record(first, columns)
+        record['references'] = [first['url']] if first['url'] is not None else []
+        record['references'].extend(row['url'] for row in rows if row['url'] is not None)
+        yield record
+
+
+def _iter_table(model, entity):
+    def iter_rows(connection, batch_size=1000):
+        columns = COLUMNS[entity]
+        query = select(*[model.__table__.c[name] for name in columns]).order_by(model.id)
+        for row in connection.execution_options(yield_per=batch_size).execute(query).mappings():
+            yield _record(row, columns)
+    return iter_rows
+
+
+ITERATORS = {
+    'posts': iter_posts,
+    'comments': _iter_table(Comment, 'comments'),
+    'interactions': _iter_table(PostInteraction, 'interactions'),
+}
+
+
+def ndjson_lines(entity, records):
+    record_type = RECORD_TYPES[entity]
+    for record in records:
+        yield json.dumps(dict(type=record_type, **record), ensure_ascii=False, default=str) + '\n'
+
+
+def csv_lines(entity, records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS[entity])
+    for record in records:
+        if entity == 'posts':
+            record = dict(record, references=' '.join(record['references']))
+        writer.writerow([record[name] for name in COLUMNS[entity]])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def chunked(lines, size=CHUNK_SIZE):
+    """Gabungkan baris teks menjadi potongan byte UTF-8 sekitar ``size`` byte."""
+    parts, length = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        parts.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(parts)
+            parts, length = [], 0
+    if parts:
+        yield b''.join(parts)
+
+
+def gzip_chunks(chunks, level=6):
+    """Kompres potongan secara bertahap menjadi satu stream gzip."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(engine, entities=ENTITIES, fmt='ndjson', batch_size=1000, compress=False):
+    """
+    Generator potongan byte berisi ``entities`` dalam format ``fmt``.
+    CSV hanya untuk satu entitas karena kolomnya berbeda-beda.
+    """
+    if fmt not in FORMATS or not entities or any(e not in ENTITIES for e in entities):
+        raise ValueError((entities, fmt))
+    if fmt == 'csv' and len(entities) != 1:
+        raise ValueError((entities, fmt))
+
+    def lines():
+        with engine.connect() as connection:
+            if connection.dialect.name == 'postgresql':
+                connection = connection.execution_options(isolation_level='REPEATABLE READ')
+            elif connection.dialect.name == 'sqlite':
+                connection.exec_driver_sql('BEGIN')
+            encode = csv_lines if fmt == 'csv' else ndjson_lines
+            for entity in entities:
+                yield from encode(entity, ITERATORS[entity](connection, batch_size))
+
+    chunks = chunked(lines())
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,231 @@
+"""
+Skor "hot" untuk feed ``list_posts?sort=hot``.
+
+Skor dihitung di luar request dan disimpan di kolom ``posts.hot_score``
+(ber-index bersama ``id``), sehingga feed hot cukup membaca index dengan
+keyset pagination, tanpa mengurutkan seluruh tabel per request.
+
+Rumus (gaya gravity)::
+
+    poin = 1 + likes - dislikes + W_KOMENTAR * komentar
+           + W_REKOMENDASI * rekomendasi dosen + W_BARU * interaksi terbaru
+    hot  = poin / (umur_jam + 2) ** gravity
+
+Karena skor meluruh terhadap waktu, job periodik di dalam proses
+(``HotRanker``) menghitung ulang semua post dalam jendela ``hot.window_days``
+dan menolkan post yang lebih tua. Penulisan (post baru, like/dislike,
+komentar, rekomendasi) menandai post sebagai "kotor" setelah commit, dan post
+kotor dihitung ulang pada tick berikutnya (``hot.dirty_interval``).
+
+Job hanya berjalan di proses yang melayani request: dimulai pada request
+pertama (pserve/waitress), setelah fork di worker prefork, dan saat lifespan
+startup ASGI. Script yang memakai ``bootstrap()`` (reindex, impor pengguna,
+ekspor) tidak pernah menjalankannya, sehingga tidak ada thread yang ikut
+ter-fork oleh process pool.
+
+Setting yang dikenali:
+
+- ``hot.enabled`` (default true): false mematikan job (skor tidak diperbarui)
+- ``hot.refresh_interval`` (detik, default 300): hitung ulang penuh
+- ``hot.dirty_interval`` (detik, default 5): hitung ulang post kotor
+- ``hot.window_days`` (default 14)
+- ``hot.recent_hours`` (default 24): jendela "interaksi terbaru"
+- ``hot.gravity`` (default 1.8)
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from pyramid.events import NewRequest
+from pyramid.settings import asbool
+from sqlalchemy import func, select, update
+
+log = logging.getLogger(__name__)
+
+COMMENT_WEIGHT = 2.0
+RECOMMENDATION_WEIGHT = 5.0
+RECENT_WEIGHT = 1.0
+
+
+def hot_score(likes, dislikes, comments, recommendations, recent, created_at, now, gravity=1.8):
+    points = (
+        1 + (likes or 0) - (dislikes or 0)
+        + COMMENT_WEIGHT * (comments or 0)
+        + RECOMMENDATION_WEIGHT * (recommendations or 0)
+        + RECENT_WEIGHT * (recent or 0)
+    )
+    age_hours = max((now - (created_at or now)).total_seconds() / 3600.0, 0.0)
+    return points / (age_hours + 2) ** gravity
+
+
+class HotRanker:
+
+    def __init__(self, window_days=14, recent_hours=24, gravity=1.8,
+                 refresh_interval=300.0, dirty_interval=5.0):
+        self.window = timedelta(days=window_days)
+        self.recent = timedelta(hours=recent_hours)
+        self.gravity = gravity
+        self.refresh_interval = refresh_interval
+        self.dirty_interval = dirty_interval
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def mark_dirty(self, post_id):
+        with self._lock:
+            self._dirty.add(post_id)
+
+    def take_dirty(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def refresh(self, dbsession, post_ids=None, now=None):
+        """
+        Hitung ulang ``hot_score``. Tanpa ``post_ids``: semua post dalam
+        jendela, dan post di luar jendela dinolkan. Mengembalikan jumlah post
+        yang dihitung. Commit menjadi tanggung jawab pemanggil.
+        """
+        from ..models.post import Post, PostInteraction, post_recommendations
+
+        now = now or datetime.utcnow()
+        window_start = now - self.window
+
+        posts_query = select(Post.id, Post.likes, Post.dislikes, Post.comment_count, Post.created_at)
+        if post_ids is None:
+            posts_query = posts_query.where(Post.created_at >= window_start)
+        else:
+            post_ids = list(post_ids)
+            if not post_ids:
+                return 0
+            posts_query = posts_query.where(Post.id.in_(post_ids))
+        rows = dbsession.execute(posts_query).all()
+        ids = [row.id for row in rows]
+
+        recommendations, recent = {}, {}
+        if ids:
+            recommendations = dict(dbsession.execute(
+                select(post_recommendations.c.post_id, func.count())
+                .where(post_recommendations.c.post_id.in_(ids))
+                .group_by(post_recommendations.c.post_id)
+            ).all())
+            recent = dict(dbsession.execute(
+                select(PostInteraction.post_id, func.count())
+                .where(PostInteraction.post_id.in_(ids))
+                .where(PostInteraction.created_at >= now - self.recent)
+                .group_by(PostInteraction.post_id)
+            ).all())
+
+        scores = [
+            {
+                "id": row.id,
+                "hot_score": hot_score(
+                    row.likes, row.dislikes, row.comment_count,
+                    recommendations.get(row.id, 0), recent.get(row.id, 0),
+                    row.created_at, now, self.gravity,
+                ) if row.created_at is None or row.created_at >= window_start else 0.0,
+            }
+            for row in rows
+        ]
+        if scores:
+            # Bulk UPDATE berdasarkan primary key (executemany)
+            dbsession.execute(update(Post), scores)
+
+        if post_ids is None:
+            dbsession.execute(
+                update(Post)
+                .where(Post.created_at < window_start)
+                .where(Post.hot_score != 0)
+                .values(hot_score=0)
+                .execution_options(synchronize_session=False)
+            )
+        return len(scores)
+
+    def run_once(self, session_factory, full=False):
+        post_ids = None if full else self.take_dirty()
+        if post_ids is not None and not post_ids:
+            return 0
+        dbsession = session_factory()
+        try:
+            count = self.refresh(dbsession, post_ids)
+            dbsession.commit()
+            return count
+        except Exception:
+            dbsession.rollback()
+            if post_ids:
+                # Coba lagi di tick berikutnya
+                with self._lock:
+                    self._dirty.update(post_ids)
+            raise
+        finally:
+            dbsession.close()
+
+    def _loop(self, session_factory):
+        last_full = None
+        while not self._stop.is_set():
+            now = datetime.utcnow()
+            full = last_full is None or (now - last_full).total_seconds() >= self.refresh_interval
+            try:
+                self.run_once(session_factory, full=full)
+                if full:
+                    last_full = now
+            except Exception:
+                log.exception("Gagal memperbarui hot_score")
+            self._stop.wait(self.dirty_interval)
+
+    def start(self, session_factory):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, args=(session_factory,), name='hot-ranker', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        with self._start_lock:
+            if self._thread is not None:
+                self._thread.join(timeout)
+                self._thread = None
+
+
+def mark_hot_after_commit(request, post_id):
+    """Tandai post untuk dihitung ulang skornya setelah transaksi berhasil."""
+    ranker = request.registry.get('hot_ranker')
+    if ranker is None:
+        return
+    tm = getattr(request, 'tm', None)
+    if tm is None:
+        ranker.mark_dirty(post_id)
+        return
+    tm.get().addAfterCommitHook(lambda success: success and ranker.mark_dirty(post_id))
+
+
+def includeme(config):
+    """
+    Daftarkan ``HotRanker``; job dimulai pada request pertama (lihat
+    docstring modul). Harus di-include setelah ``.models`` (membutuhkan
+    ``dbsession_factory``).
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('hot.enabled', True)):
+        return
+
+    ranker = HotRanker(
+        window_days=float(settings.get('hot.window_days', 14)),
+        recent_hours=float(settings.get('hot.recent_hours', 24)),
+        gravity=float(settings.get('hot.gravity', 1.8)),
+        refresh_interval=float(settings.get('hot.refresh_interval', 300)),
+        dirty_interval=float(settings.get('hot.dirty_interval', 5)),
+    )
+    config.registry['hot_ranker'] = ranker
+
+    def start_ranker(event):
+        ranker.start(event.request.registry['dbsession_factory'])
+
+    config.add_subscriber(start_ranker, NewRequest)
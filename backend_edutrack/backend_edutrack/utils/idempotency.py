@@ -0,0 +1,234 @@
+"""
+Header ``Idempotency-Key`` untuk request yang mengubah data (POST, PUT,
+PATCH, DELETE). Respons pertama untuk sebuah key disimpan, lalu request
+berikutnya dengan key yang sama (dan body yang sama) mendapat respons itu
+apa adanya tanpa menjalankan view lagi. Dengan begitu, retry dari klien
+atau jaringan tidak membuat post/komentar ganda dan tidak membatalkan like.
+
+Tween ini berada di bawah ``pyramid_tm``: respons disimpan ke tabel
+``idempotency_keys`` di transaksi yang sama dengan perubahan yang dibuat
+view, sehingga keduanya ter-commit atau batal bersama. Jika dua request
+dengan key yang sama berjalan bersamaan, insert yang kalah melanggar unique
+constraint; error itu ditandai retryable sehingga ``pyramid_retry``
+mengulang request, dan percobaan berikutnya memutar ulang respons pemenang.
+
+Hanya request dari pengguna yang sudah login yang ditangani; key disimpan
+per ``user_id`` sehingga klien anonim tidak berbagi satu ruang key. Route
+auth (``EXCLUDED_ROUTES``) dilewati: respons login berisi token JWT yang
+tidak boleh disimpan apa adanya di database.
+
+Di depan tabel ada cache memori per proses (``MemoryCacheBackend``) yang
+diisi setelah commit. Respons 5xx tidak disimpan agar klien bisa mencoba
+lagi. Respons 409 juga tidak: view mengembalikannya setelah menangkap
+``IntegrityError``, sehingga transaksinya sudah gagal (flush gagal di
+SQLAlchemy, transaksi aborted di PostgreSQL) dan tidak bisa dipakai untuk
+insert. Hal yang sama berlaku untuk respons apa pun bila session tidak lagi
+aktif.
+
+Setting yang dikenali:
+
+- ``idempotency.enabled`` (default true)
+- ``idempotency.ttl`` (detik, default 86400)
+- ``idempotency.cache_entries`` (default 1024)
+- ``idempotency.max_body`` (byte, default 65536; respons lebih besar tidak disimpan)
+- ``idempotency.cleanup_interval`` (detik, default 300)
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+
+from pyramid.interfaces import IRoutesMapper
+from pyramid.response import Response
+from pyramid.settings import asbool
+from pyramid_retry import mark_error_retryable
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from ..models.idempotency import IdempotencyKey
+from .cache import MemoryCacheBackend
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MUTATING_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+MAX_KEY_LENGTH = 255
+EXCLUDED_ROUTES = frozenset(('login', 'register', 'change_password'))
+
+
+def request_fingerprint(request):
+    """sha256 dari method, path beserta query string, dan body request."""
+    digest = hashlib.sha256()
+    digest.update(request.method.encode('ascii'))
+    digest.update(b'\0')
+    digest.update(request.path_qs.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(request.body or b'')
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Penyimpanan respons per ``(user_id, key)``: tabel ``idempotency_keys``
+    sebagai sumber kebenaran, ditambah cache memori di depannya.
+    """
+
+    def __init__(self, ttl=86400.0, cache_entries=1024, max_body=65536, cleanup_interval=300.0):
+        self.ttl = ttl
+        self.max_body = max_body
+        self.cleanup_interval = cleanup_interval
+        self.cache = MemoryCacheBackend(max_entries=cache_entries, default_ttl=ttl) if cache_entries else None
+        self._next_cleanup = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            ttl=float(settings.get('idempotency.ttl', 86400)),
+            cache_entries=int(settings.get('idempotency.cache_entries', 1024)),
+            max_body=int(settings.get('idempotency.max_body', 65536)),
+            cleanup_interval=float(settings.get('idempotency.cleanup_interval', 300)),
+        )
+
+    def lookup(self, dbsession, user_id, key, now=None):
+        """Kembalikan record tersimpan (dict) atau None jika belum ada/kedaluwarsa."""
+        if self.cache is not None:
+            record = self.cache.get((user_id, key))
+            if record is not None:
+                return record
+
+        row = dbsession.execute(
+            select(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        ).scalar_one_or_none()
+        if row is None:
+            return None
+
+        age = ((now or datetime.utcnow()) - row.created_at).total_seconds()
+        if age >= self.ttl:
+            # Kedaluwarsa: hapus agar key bisa dipakai lagi di transaksi ini
+            dbsession.execute(delete(IdempotencyKey).where(IdempotencyKey.id == row.id))
+            return None
+
+        record = {
+            "fingerprint": row.fingerprint,
+            "status_code": row.status_code,
+            "content_type": row.content_type,
+            "body": row.body,
+        }
+        if self.cache is not None:
+            self.cache.set((user_id, key), record, ttl=self.ttl - age)
+        return record
+
+    def storable(self, response):
+        if response.status_code >= 500 or response.status_code == 409:
+            return False
+        # Respons streaming tidak disimpan
+        if not isinstance(response.app_iter, (list, tuple)):
+            return False
+        return len(response.body) <= self.max_body
+
+    def save(self, request, user_id, key, fingerprint, response, now=None):
+        """
+        Simpan respons di transaksi request. Bentrok dengan request lain yang
+        memakai key yang sama dijadikan error retryable.
+        """
+        now = now or datetime.utcnow()
+        record = {
+            "fingerprint": fingerprint,
+            "status_code": response.status_code,
+            "content_type": response.content_type,
+            "body": response.body,
+        }
+        try:
+            request.dbsession.execute(insert(IdempotencyKey).values(user_id=user_id, key=key, created_at=now, **record))
+        except IntegrityError as e:
+            mark_error_retryable(e)
+            raise
+        self.cleanup(request.dbsession, now)
+
+        if self.cache is not None:
+            tm = getattr(request, 'tm', None)
+            if tm is None:
+                self.cache.set((user_id, key), record)
+            else:
+                tm.get().addAfterCommitHook(
+                    lambda success: success and self.cache.set((user_id, key), record))
+
+    def cleanup(self, dbsession, now):
+        """Hapus baris kedaluwarsa, paling sering sekali per ``cleanup_interval``."""
+        with self._lock:
+            if time.monotonic() < self._next_cleanup:
+                return
+            self._next_cleanup = time.monotonic() + self.cleanup_interval
+        dbsession.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.created_at < now - timedelta(seconds=self.ttl))
+        )
+
+
+def replay(record):
+    response = Response(body=record["body"], status=record["status_code"])
+    if record["content_type"]:
+        response.content_type = record["content_type"]
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotency_tween_factory(handler, registry):
+    store = registry.get('idempotency_store')
+    if store is None:
+        return handler
+    mapper = registry.queryUtility(IRoutesMapper)
+
+    def idempotency_tween(request):
+        key = request.headers.get(HEADER)
+        if key is None or request.method not in MUTATING_METHODS:
+            return handler(request)
+        user_id = (getattr(request, 'user', None) or {}).get("id")
+        if not user_id:
+            return handler(request)
+        # Routing baru terjadi setelah semua tween, jadi route dicocokkan di sini
+        route = mapper(request)['route'] if mapper is not None else None
+        if route is not None and route.name in EXCLUDED_ROUTES:
+            return handler(request)
+
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                json_body={"error": "Header Idempotency-Key harus 1-%d karakter." % MAX_KEY_LENGTH},
+                status=400,
+            )
+
+        fingerprint = request_fingerprint(request)
+        record = store.lookup(request.dbsession, user_id, key)
+        if record is not None:
+            if record["fingerprint"] != fingerprint:
+                return Response(
+                    json_body={"error": "Idempotency-Key sudah dipakai untuk request yang berbeda."},
+                    status=422,
+                )
+            return replay(record)
+
+        response = handler(request)
+        tm = getattr(request, 'tm', None)
+        if tm is not None and tm.isDoomed():
+            return response
+        # Flush yang gagal membuat session menunggu rollback; insert akan gagal
+        if store.storable(response) and request.dbsession.is_active:
+            store.save(request, user_id, key, fingerprint, response)
+        return response
+
+    return idempotency_tween
+
+
+def includeme(config):
+    """
+    Daftarkan ``IdempotencyStore`` dan tween-nya tepat di bawah ``pyramid_tm``.
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('idempotency.enabled', True)):
+        return
+    config.registry['idempotency_store'] = IdempotencyStore.from_settings(settings)
+    config.add_tween(
+        'backend_edutrack.utils.idempotency.idempotency_tween_factory',
+        under='pyramid_tm.tm_tween_factory',
+    )
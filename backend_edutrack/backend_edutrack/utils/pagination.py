@@ -0,0 +1,40 @@
+"""
+Helper keyset pagination: cursor opaque untuk klien, berisi nilai kolom urutan
+dari item terakhir di halaman sebelumnya.
+"""
+import base64
+import json
+
+
+def encode_cursor(values):
+    """Ubah list nilai (angka/string) menjadi token cursor yang aman untuk URL."""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, length):
+    """
+    Kebalikan dari ``encode_cursor``. Melempar ValueError jika token rusak
+    atau jumlah nilainya tidak sama dengan ``length``.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError('Cursor tidak valid.') from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError('Cursor tidak valid.')
+    return values
+
+
+def parse_limit(value, default=10, maximum=50):
+    """
+    Parse parameter ``limit``; nilai di luar 1..maximum dikembalikan ke default.
+    Melempar ValueError jika bukan angka.
+    """
+    if value is None:
+        return default
+    limit = int(value)
+    if limit <= 0 or limit > maximum:
+        return default
+    return limit
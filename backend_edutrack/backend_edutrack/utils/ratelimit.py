@@ -0,0 +1,302 @@
+"""
+Rate limit per route dengan token bucket, per pengguna (``id`` dari JWT)
+atau per IP.
+
+Setiap aturan berbentuk ``<scope> <jumlah>/<detik>``: bucket berisi paling
+banyak ``jumlah`` token dan terisi ulang ``jumlah/detik`` token per detik;
+setiap request mengambil satu token. Request yang tidak kebagian token
+mendapat 429 dengan header ``Retry-After``. Scope ``user`` memakai id
+pengguna dari token, atau IP jika route-nya publik (misalnya login).
+
+Batas default per nama route ada di ``routes.RATE_LIMITS``. Tween ini
+berada di bawah tween autentikasi (``request.user`` sudah terisi) dan di
+atas ``pyramid_tm``, sehingga request yang ditolak tidak membuka transaksi
+maupun koneksi database.
+
+Semua bucket sebuah route diperiksa sekaligus: token hanya diambil jika
+setiap aturan mengizinkan, sehingga request yang ditolak bucket ``user``
+tidak ikut menghabiskan bucket ``ip`` (dan sebaliknya).
+
+Backend dapat diganti lewat setting ``ratelimit.backend`` (dotted name ke
+kelas dengan ``from_settings(settings)`` dan
+``take_all([(key, capacity, rate), ...])``).
+``MemoryRateLimitBackend`` menyimpan bucket per proses; untuk beberapa
+worker gunakan ``RedisRateLimitBackend`` (butuh paket ``redis``) agar
+semua worker berbagi bucket yang sama.
+
+Setting yang dikenali:
+
+- ``ratelimit.enabled`` (default true)
+- ``ratelimit.backend`` (default ``MemoryRateLimitBackend``)
+- ``ratelimit.max_keys`` (default 100000): batas bucket di memori
+- ``ratelimit.routes``: satu aturan per baris, ``<route> <scope> <jumlah>/<detik>``;
+  mengganti semua aturan default route tersebut, ``<route> off`` mematikannya
+- ``ratelimit.redis_url`` (untuk ``RedisRateLimitBackend``)
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from pyramid.interfaces import IRoutesMapper
+from pyramid.response import Response
+from pyramid.settings import asbool, aslist
+
+from ..routes import RATE_LIMITS
+
+SCOPES = ('ip', 'user')
+
+
+class Rule:
+    __slots__ = ('scope', 'capacity', 'period', 'rate')
+
+    def __init__(self, scope, capacity, period):
+        self.scope = scope
+        self.capacity = capacity
+        self.period = period
+        # Token yang terisi ulang per detik
+        self.rate = capacity / period
+
+    @classmethod
+    def parse(cls, spec):
+        """``'user 60/60'`` -> ``Rule('user', 60, 60.0)``; ``ValueError`` jika salah."""
+        try:
+            scope, limit = spec.split()
+            capacity, period = limit.split('/')
+            capacity, period = int(capacity), float(period)
+        except ValueError:
+            raise ValueError("Aturan rate limit tidak valid: %r" % spec)
+        if scope not in SCOPES or capacity <= 0 or period <= 0:
+            raise ValueError("Aturan rate limit tidak valid: %r" % spec)
+        return cls(scope, capacity, period)
+
+
+def parse_route_limits(settings, defaults=RATE_LIMITS):
+    """
+    Gabungkan ``defaults`` dengan setting ``ratelimit.routes``.
+    Mengembalikan ``{route_name: (Rule, ...)}``.
+    """
+    specs = {name: list(rules) for name, rules in defaults.items()}
+    overridden = set()
+    for line in aslist(settings.get('ratelimit.routes', ''), flatten=False):
+        name, _, spec = line.strip().partition(' ')
+        spec = spec.strip()
+        if name not in overridden:
+            specs[name] = []
+            overridden.add(name)
+        if spec != 'off':
+            specs[name].append(spec)
+    return {
+        name: tuple(Rule.parse(spec) for spec in rules)
+        for name, rules in specs.items() if rules
+    }
+
+
+class MemoryRateLimitBackend:
+    """
+    Bucket di memori proses: satu tuple ``(token, waktu, penuh_pada)`` per
+    key aktif. Bucket yang sudah terisi penuh kembali sama dengan bucket
+    baru, jadi dibuang saat berada di depan urutan akses; ``max_keys``
+    menjadi batas atas dengan eviksi LRU.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(max_keys=int(settings.get('ratelimit.max_keys', 100000)))
+
+    def take(self, key, capacity, rate, now=None):
+        """
+        Ambil satu token dari bucket ``key``. Mengembalikan
+        ``(diizinkan, detik_sampai_token_berikutnya)``.
+        """
+        return self.take_all([(key, capacity, rate)], now)
+
+    def take_all(self, buckets, now=None):
+        """
+        Ambil satu token dari setiap bucket ``(key, capacity, rate)``, atau
+        tidak sama sekali jika salah satunya kosong. Mengembalikan
+        ``(diizinkan, detik_sampai_semua_bucket_punya_token)``.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # Ekspirasi malas: cukup periksa bucket yang paling lama tidak disentuh
+            while self._buckets:
+                oldest = next(iter(self._buckets))
+                if self._buckets[oldest][2] > now:
+                    break
+                del self._buckets[oldest]
+
+            levels = []
+            for key, capacity, rate in buckets:
+                bucket = self._buckets.pop(key, None)
+                if bucket is None:
+                    tokens = float(capacity)
+                else:
+                    tokens = min(float(capacity), bucket[0] + (now - bucket[1]) * rate)
+                levels.append(tokens)
+
+            allowed = all(tokens >= 1 for tokens in levels)
+            wait = 0.0
+            for (key, capacity, rate), tokens in zip(buckets, levels):
+                if allowed:
+                    tokens -= 1
+                elif tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+                self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# Token bucket yang sama dengan MemoryRateLimitBackend.take_all, dijalankan
+# atomik di server Redis. ARGV: now, lalu capacity dan rate per key.
+# Key kedaluwarsa sendiri begitu bucket penuh kembali.
+REDIS_TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local levels = {}
+local allowed = 1
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = capacity
+    if state[1] then
+        tokens = math.min(capacity, tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rate)
+    end
+    levels[i] = tokens
+    if tokens < 1 then
+        allowed = 0
+    end
+end
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local tokens = levels[i]
+    if allowed == 1 then
+        tokens = tokens - 1
+    elseif tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil((capacity - tokens) / rate * 1000) + 1000)
+end
+return {allowed, tostring(wait)}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Bucket bersama di Redis untuk beberapa worker/proses. Waktu diambil dari
+    jam sistem masing-masing worker, jadi jam antar-host harus sinkron.
+    """
+
+    def __init__(self, client, prefix='ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(REDIS_TAKE_SCRIPT)
+
+    @classmethod
+    def from_settings(cls, settings):
+        import redis
+
+        return cls(redis.Redis.from_url(settings.get('ratelimit.redis_url', 'redis://localhost:6379/0')))
+
+    def take(self, key, capacity, rate, now=None):
+        return self.take_all([(key, capacity, rate)], now)
+
+    def take_all(self, buckets, now=None):
+        now = time.time() if now is None else now
+        args = [now]
+        for _, capacity, rate in buckets:
+            args += [capacity, rate]
+        allowed, wait = self._take(keys=[self.prefix + key for key, _, _ in buckets], args=args)
+        return bool(allowed), float(wait)
+
+
+class RateLimiter:
+
+    def __init__(self, backend, limits):
+        self.backend = backend
+        self.limits = limits
+
+    def check(self, request, route_name):
+        """
+        Ambil token dari semua bucket route ini sekaligus. Mengembalikan
+        ``None`` jika request boleh lanjut, atau jumlah detik yang harus
+        ditunggu; request yang ditolak tidak mengurangi bucket mana pun.
+        """
+        user_id = (getattr(request, 'user', None) or {}).get("id")
+        client = request.client_addr or 'unknown'
+        buckets = []
+        for index, rule in enumerate(self.limits.get(route_name, ())):
+            if rule.scope == 'user' and user_id:
+                identity = 'user:%s' % user_id
+            else:
+                identity = 'ip:%s' % client
+            buckets.append(('%s:%d:%s' % (route_name, index, identity), rule.capacity, rule.rate))
+        if not buckets:
+            return None
+        allowed, retry_after = self.backend.take_all(buckets)
+        return None if allowed else retry_after
+
+
+def too_many_requests(retry_after):
+    seconds = max(1, int(math.ceil(retry_after)))
+    response = Response(
+        json_body={"error": "Terlalu banyak request. Coba lagi dalam %d detik." % seconds},
+        status=429,
+    )
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+
+def ratelimit_tween_factory(handler, registry):
+    limiter = registry.get('rate_limiter')
+    if limiter is None or not limiter.limits:
+        return handler
+    mapper = registry.queryUtility(IRoutesMapper)
+
+    def ratelimit_tween(request):
+        # Preflight CORS tidak dihitung
+        if request.method == 'OPTIONS':
+            return handler(request)
+        # Routing baru terjadi setelah semua tween, jadi route dicocokkan di sini
+        route = mapper(request)['route']
+        if route is None or route.name not in limiter.limits:
+            return handler(request)
+
+        retry_after = limiter.check(request, route.name)
+        if retry_after is not None:
+            return too_many_requests(retry_after)
+        return handler(request)
+
+    return ratelimit_tween
+
+
+def includeme(config):
+    """
+    Daftarkan ``RateLimiter`` dan tween-nya di antara autentikasi dan
+    ``pyramid_tm``.
+    """
+    settings = config.get_settings()
+    if not asbool(settings.get('ratelimit.enabled', True)):
+        return
+    backend_cls = config.maybe_dotted(settings.get('ratelimit.backend', MemoryRateLimitBackend))
+    config.registry['rate_limiter'] = RateLimiter(
+        backend_cls.from_settings(settings),
+        parse_route_limits(settings),
+    )
+    config.add_tween(
+        'backend_edutrack.utils.ratelimit.ratelimit_tween_factory',
+        under='backend_edutrack.utils.auth_policy.auth_tween_factory',
+        over='pyramid_tm.tm_tween_factory',
+    )
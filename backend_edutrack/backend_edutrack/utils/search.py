@@ -0,0 +1,155 @@
+"""
+Full-text search untuk post (judul + konten).
+
+Dua implementasi dipilih berdasarkan dialect engine:
+
+- PostgreSQL: index GIN pada ekspresi ``tsvector`` (judul berbobot A, konten B).
+  Index ekspresi diperbarui otomatis oleh PostgreSQL setiap INSERT.
+- SQLite: tabel virtual FTS5 ``posts_fts`` (external content dari ``posts``)
+  yang diisi eksplisit saat ``create_post``.
+
+Hasil diurutkan berdasarkan skor relevansi (semakin besar semakin relevan)
+lalu ``id``, dan dipaginasi dengan keyset ``(score, id)``.
+"""
+import re
+
+from sqlalchemy import text
+
+# Ekspresi ini harus identik antara index (migrasi) dan query agar index dipakai
+PG_DOCUMENT = (
+    "setweight(to_tsvector('{config}', coalesce(posts.title, '')), 'A') || "
+    "setweight(to_tsvector('{config}', coalesce(posts.content, '')), 'B')"
+)
+PG_INDEX_NAME = 'ix_posts_search_document'
+SQLITE_FTS_TABLE = 'posts_fts'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Pecah input pengguna menjadi token kata; operator/simbol diabaikan."""
+    return _TOKEN_RE.findall(query.lower())
+
+
+def _keyset(after):
+    if after is None:
+        return '', {}
+    score, post_id = after
+    clause = 'WHERE score < :after_score OR (score = :after_score AND id < :after_id)'
+    return clause, {'after_score': float(score), 'after_id': int(post_id)}
+
+
+class PostgresSearch:
+
+    def __init__(self, config='simple'):
+        if not re.match(r'^\w+$', config):
+            raise ValueError('Nama text search config tidak valid: %r' % config)
+        self.document = PG_DOCUMENT.format(config=config)
+        self.config = config
+
+    def create_index_sql(self):
+        return 'CREATE INDEX IF NOT EXISTS %s ON posts USING GIN ((%s))' % (PG_INDEX_NAME, self.document)
+
+    def ensure_schema(self, connection):
+        connection.execute(text(self.create_index_sql()))
+
+    def index_post(self, dbsession, post):
+        # Index ekspresi GIN ikut diperbarui oleh INSERT, tidak ada yang perlu dilakukan
+        pass
+
+    def reindex(self, connection):
+        # Dibuat ulang (bukan REINDEX) agar ekspresi index mengikuti
+        # search.pg_config saat ini jika setting itu diganti
+        connection.execute(text('DROP INDEX IF EXISTS %s' % PG_INDEX_NAME))
+        self.ensure_schema(connection)
+
+    def search(self, dbsession, query, limit, after=None):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        keyset, params = _keyset(after)
+        sql = text(
+            "SELECT id, score FROM ("
+            "  SELECT posts.id AS id,"
+            "         ts_rank_cd(%(doc)s, plainto_tsquery('%(cfg)s', :q))::float8 AS score"
+            "  FROM posts"
+            "  WHERE %(doc)s @@ plainto_tsquery('%(cfg)s', :q)"
+            ") ranked %(keyset)s "
+            "ORDER BY score DESC, id DESC LIMIT :limit"
+            % {'doc': self.document, 'cfg': self.config, 'keyset': keyset}
+        )
+        params.update(q=' '.join(terms), limit=limit)
+        return [(row.id, row.score) for row in dbsession.execute(sql, params)]
+
+
+class SqliteFtsSearch:
+
+    # Bobot bm25 per kolom: judul lebih penting dari konten
+    TITLE_WEIGHT = 2.0
+    CONTENT_WEIGHT = 1.0
+
+    def ensure_schema(self, connection):
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS %s USING fts5("
+            "title, content, content='posts', content_rowid='id', tokenize='unicode61')"
+            % SQLITE_FTS_TABLE
+        ))
+
+    def index_post(self, dbsession, post):
+        dbsession.execute(
+            text("INSERT INTO %s(rowid, title, content) VALUES (:id, :title, :content)" % SQLITE_FTS_TABLE),
+            {'id': post.id, 'title': post.title, 'content': post.content},
+        )
+
+    def reindex(self, connection):
+        self.ensure_schema(connection)
+        connection.execute(text("INSERT INTO %s(%s) VALUES ('rebuild')" % (SQLITE_FTS_TABLE, SQLITE_FTS_TABLE)))
+
+    def search(self, dbsession, query, limit, after=None):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        keyset, params = _keyset(after)
+        sql = text(
+            "SELECT id, score FROM ("
+            "  SELECT rowid AS id, -bm25(%(t)s, %(tw)s, %(cw)s) AS score"
+            "  FROM %(t)s WHERE %(t)s MATCH :q"
+            ") ranked %(keyset)s "
+            "ORDER BY score DESC, id DESC LIMIT :limit"
+            % {'t': SQLITE_FTS_TABLE, 'tw': self.TITLE_WEIGHT, 'cw': self.CONTENT_WEIGHT, 'keyset': keyset}
+        )
+        # Setiap token dikutip agar input pengguna tidak dibaca sebagai sintaks FTS5
+        params.update(q=' '.join('"%s"' % term for term in terms), limit=limit)
+        return [(row.id, row.score) for row in dbsession.execute(sql, params)]
+
+
+def search_backend_for(dialect_name, settings=None):
+    settings = settings or {}
+    if dialect_name == 'postgresql':
+        return PostgresSearch(config=settings.get('search.pg_config', 'simple'))
+    if dialect_name == 'sqlite':
+        return SqliteFtsSearch()
+    return None
+
+
+def get_search_backend(request):
+    return request.registry.get('search_backend')
+
+
+def index_post(request, post):
+    """Sinkronkan index pencarian untuk post yang baru dibuat (dalam transaksi request)."""
+    backend = get_search_backend(request)
+    if backend is not None:
+        backend.index_post(request.dbsession, post)
+
+
+def includeme(config):
+    """
+    Pilih backend pencarian sesuai dialect ``sqlalchemy.url``.
+    Harus di-include setelah ``.models`` (membutuhkan ``dbsession_factory``).
+    """
+    settings = config.get_settings()
+    engine = config.registry['dbsession_factory'].kw['bind']
+    backend = search_backend_for(engine.dialect.name, settings)
+    if backend is not None:
+        config.registry['search_backend'] = backend
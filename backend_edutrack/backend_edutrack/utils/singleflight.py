@@ -0,0 +1,93 @@
+"""
+Request coalescing (single-flight) untuk jalur baca yang panas.
+
+Jika banyak request identik mengalami cache miss pada saat yang sama, hanya
+satu yang benar-benar menjalankan query; sisanya menunggu dan memakai hasil
+yang sama. Hasil yang dibagi harus berupa data biasa (dict/list), bukan objek
+ORM yang terikat ke session milik request lain.
+
+Setting yang dikenali:
+
+- ``singleflight.routes`` (default ``get_post list_posts``), kosongkan untuk mematikan
+- ``singleflight.timeout`` (detik, default 10): batas tunggu follower sebelum
+  menjalankan query sendiri
+"""
+import threading
+
+from pyramid.settings import aslist
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self, routes=(), timeout=10.0):
+        self.routes = frozenset(routes)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Jalankan ``fn`` sekali untuk semua pemanggil ``key`` yang bersamaan.
+        Exception dari leader diteruskan ke semua follower.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if not call.event.wait(self.timeout):
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+def coalesce(request, key, fn):
+    """
+    Jalankan ``fn`` lewat single-flight jika route request ini diaktifkan,
+    jika tidak panggil ``fn`` langsung.
+    """
+    group = request.registry.get('singleflight')
+    matched_route = getattr(request, 'matched_route', None)
+    route_name = matched_route.name if matched_route is not None else None
+    if group is None or route_name not in group.routes:
+        return fn()
+    return group.do((route_name, key), fn)
+
+
+def includeme(config):
+    settings = config.get_settings()
+    routes = aslist(settings.get('singleflight.routes', 'get_post list_posts'))
+    if not routes:
+        return
+    config.registry['singleflight'] = SingleFlight(
+        routes=routes,
+        timeout=float(settings.get('singleflight.timeout', 10)),
+    )
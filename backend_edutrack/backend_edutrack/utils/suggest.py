@@ -0,0 +1,343 @@
+"""
+Autocomplete judul post dan nama pengguna untuk kotak pencarian. NIM tidak
+diindeks maupun dikembalikan, agar NIM pengguna lain tidak bisa dienumerasi
+lewat prefix.
+
+Index prefix disimpan di memori proses: setiap kata dari judul post dan nama
+pengguna menjadi satu term pada list terurut, sehingga pencarian prefix cukup
+``bisect`` lalu membaca term berikutnya selama masih cocok. Index dibangun
+dari database pada request pertama, diperbarui langsung setelah commit saat
+post dibuat atau profil diubah, dan dibangun ulang secara berkala
+(``suggest.rebuild_interval``) agar perubahan dari proses worker lain ikut
+terbawa. Pembangunan ulang berjalan di thread latar dengan session sendiri;
+selama itu request tetap dijawab dari index lama tanpa menunggu.
+
+Di antara pembangunan ulang, post dan pengguna baru dari proses lain
+(worker lain, ``import_backend_edutrack_users``) dimuat setiap
+``suggest.refresh_interval`` detik: hanya baris dengan id di atas id
+terbesar yang sudah ada di index. Perubahan judul/nama dari proses lain
+tetap menunggu pembangunan ulang berikutnya.
+
+Hasil per prefix di-cache; key cache memuat generasi index sehingga setiap
+pembaruan otomatis membuat entri lama tidak terpakai.
+
+Setting yang dikenali:
+
+- ``suggest.enabled`` (default true)
+- ``suggest.min_length`` (default 2): prefix lebih pendek mengembalikan hasil kosong
+- ``suggest.max_results`` (default 10): batas atas ``limit`` per jenis hasil
+- ``suggest.max_scan`` (default 2000): batas term yang diperiksa per query
+- ``suggest.rebuild_interval`` (detik, default 300, 0 untuk tidak pernah)
+- ``suggest.refresh_interval`` (detik, default 10, 0 untuk tidak pernah)
+- ``suggest.cache_entries`` (default 1024), ``suggest.cache_ttl`` (detik, default 60)
+"""
+import bisect
+import logging
+import threading
+import time
+
+from pyramid.settings import asbool
+from sqlalchemy import func, select
+
+from .cache import MemoryCacheBackend
+from .search import tokenize
+
+log = logging.getLogger(__name__)
+
+KIND_POST = 'post'
+KIND_USER = 'user'
+
+
+class PrefixIndex:
+    """
+    Index prefix kata. Tidak thread-safe; penguncian dilakukan oleh ``SuggestService``.
+    """
+
+    def __init__(self):
+        self._terms = []   # list terurut (term, kind, id)
+        self._items = {}   # (kind, id) -> (data, terms)
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, kind, item_id, data, terms):
+        """Tambah atau ganti item; term lama dari item yang sama dibuang."""
+        self.remove(kind, item_id)
+        terms = sorted(set(t for t in terms if t))
+        for term in terms:
+            bisect.insort(self._terms, (term, kind, item_id))
+        self._items[(kind, item_id)] = (data, terms)
+
+    def remove(self, kind, item_id):
+        existing = self._items.pop((kind, item_id), None)
+        if existing is None:
+            return
+        for term in existing[1]:
+            pos = bisect.bisect_left(self._terms, (term, kind, item_id))
+            if pos < len(self._terms) and self._terms[pos] == (term, kind, item_id):
+                del self._terms[pos]
+
+    def bulk_load(self, rows):
+        """Bangun ulang seluruh index dari iterable ``(kind, id, data, terms)``."""
+        terms, items = [], {}
+        for kind, item_id, data, item_terms in rows:
+            item_terms = sorted(set(t for t in item_terms if t))
+            items[(kind, item_id)] = (data, item_terms)
+            terms.extend((term, kind, item_id) for term in item_terms)
+        terms.sort()
+        self._terms, self._items = terms, items
+
+    def search(self, query_terms, kind, limit, max_scan=2000):
+        """
+        Cari item ``kind`` yang setiap kata query-nya merupakan prefix dari
+        salah satu term item. Kata terakhir dipakai sebagai prefix index.
+        """
+        if not query_terms:
+            return []
+        prefix = query_terms[-1]
+        others = query_terms[:-1]
+
+        matches = {}
+        pos = bisect.bisect_left(self._terms, (prefix,))
+        end = min(len(self._terms), pos + max_scan)
+        while pos < end:
+            term, item_kind, item_id = self._terms[pos]
+            pos += 1
+            if not term.startswith(prefix):
+                break
+            if item_kind != kind or item_id in matches:
+                continue
+            data, item_terms = self._items[(item_kind, item_id)]
+            if all(any(t.startswith(o) for t in item_terms) for o in others):
+                # Kecocokan tepat dan term yang lebih pendek diprioritaskan
+                matches[item_id] = (term != prefix, len(term), -item_id, data)
+
+        ranked = sorted(matches.values(), key=lambda m: m[:3])
+        return [m[3] for m in ranked[:limit]]
+
+
+def post_terms(title):
+    return tokenize(title or '')
+
+
+def user_terms(name):
+    return tokenize(name or '')
+
+
+class SuggestService:
+
+    def __init__(self, min_length=2, max_results=10, max_scan=2000,
+                 rebuild_interval=300.0, refresh_interval=10.0, cache=None,
+                 session_factory=None):
+        self.min_length = min_length
+        self.max_results = max_results
+        self.max_scan = max_scan
+        self.rebuild_interval = rebuild_interval
+        self.refresh_interval = refresh_interval
+        self.cache = cache
+        # Sumber session untuk pembaruan di thread latar; tanpa ini pembaruan
+        # berjalan di thread pemanggil dengan session-nya
+        self.session_factory = session_factory
+        self.index = None
+        self.built_at = 0.0
+        self.refreshed_at = 0.0
+        # (id post terbesar, id pengguna terbesar) yang sudah dimuat
+        self.high_water = (0, 0)
+        self.generation = 0
+        self._pending = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def _load_rows(self, dbsession, post_since=0, user_since=0):
+        from ..models import Post, User
+
+        for post_id, title in dbsession.execute(select(Post.id, Post.title).where(Post.id > post_since)):
+            yield KIND_POST, post_id, {"id": post_id, "title": title}, post_terms(title)
+        for user_id, name in dbsession.execute(select(User.id, User.name).where(User.id > user_since)):
+            yield KIND_USER, user_id, {"id": user_id, "name": name}, user_terms(name)
+
+    def _high_water(self, dbsession):
+        from ..models import Post, User
+
+        return (
+            dbsession.execute(select(func.max(Post.id))).scalar() or 0,
+            dbsession.execute(select(func.max(User.id))).scalar() or 0,
+        )
+
+    def rebuild(self, dbsession):
+        # Pembaruan yang masuk selama build dicatat lalu diterapkan ulang ke
+        # index baru, karena snapshot database mungkin belum memuatnya
+        with self._lock:
+            self._pending = []
+        index = PrefixIndex()
+        try:
+            # Diambil sebelum memuat baris: baris yang masuk di antaranya
+            # dimuat ulang oleh refresh berikutnya, dan ``put`` idempoten
+            high_water = self._high_water(dbsession)
+            index.bulk_load(self._load_rows(dbsession))
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for item in self._pending:
+                index.put(*item)
+            self._pending = None
+            self.index = index
+            self.built_at = self.refreshed_at = time.monotonic()
+            self.high_water = high_water
+            self.generation += 1
+
+    def refresh(self, dbsession):
+        """Muat post dan pengguna dengan id di atas ``high_water`` ke index."""
+        post_since, user_since = self.high_water
+        high_water = self._high_water(dbsession)
+        rows = []
+        if high_water != self.high_water:
+            rows = list(self._load_rows(dbsession, post_since, user_since))
+        with self._lock:
+            for kind, item_id, data, terms in rows:
+                self.index.put(kind, item_id, data, terms)
+            if rows:
+                self.generation += 1
+            self.high_water = high_water
+            self.refreshed_at = time.monotonic()
+
+    def ensure_index(self, dbsession):
+        """
+        Bangun index jika belum ada (request lain menunggu), atau bangun ulang
+        atau refresh di thread latar jika sudah kedaluwarsa (request tetap
+        memakai index lama).
+        """
+        if self.index is not None:
+            now = time.monotonic()
+            if self.rebuild_interval and now - self.built_at >= self.rebuild_interval:
+                update = self.rebuild
+            elif self.refresh_interval and now - self.refreshed_at >= self.refresh_interval:
+                update = self.refresh
+            else:
+                return
+            if not self._build_lock.acquire(blocking=False):
+                return
+            if self.session_factory is not None:
+                threading.Thread(
+                    target=self._update_in_background, args=(update,),
+                    name='suggest-update', daemon=True,
+                ).start()
+                return
+        else:
+            update = self.rebuild
+            self._build_lock.acquire()
+            if self.index is not None:
+                self._build_lock.release()
+                return
+        try:
+            update(dbsession)
+        finally:
+            self._build_lock.release()
+
+    def _update_in_background(self, update):
+        # Dipanggil dengan _build_lock sudah dipegang
+        try:
+            with self.session_factory() as dbsession:
+                update(dbsession)
+        except Exception:
+            log.exception("Gagal memperbarui index autocomplete")
+            # Dicoba lagi setelah interval berikutnya, bukan di setiap request
+            now = time.monotonic()
+            if update == self.rebuild:
+                self.built_at = now
+            self.refreshed_at = now
+        finally:
+            self._build_lock.release()
+
+    def put_post(self, post_id, title):
+        self._put(KIND_POST, post_id, {"id": post_id, "title": title}, post_terms(title))
+
+    def put_user(self, user_id, name):
+        self._put(KIND_USER, user_id, {"id": user_id, "name": name}, user_terms(name))
+
+    def _put(self, kind, item_id, data, terms):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((kind, item_id, data, terms))
+            if self.index is None:
+                return
+            self.index.put(kind, item_id, data, terms)
+            self.generation += 1
+
+    def suggest(self, dbsession, query, limit):
+        terms = tokenize(query)
+        if not terms or len(' '.join(terms)) < self.min_length:
+            return {"posts": [], "users": []}
+        limit = max(1, min(limit, self.max_results))
+
+        self.ensure_index(dbsession)
+        cache_key = (self.generation, tuple(terms), limit)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        with self._lock:
+            result = {
+                "posts": self.index.search(terms, KIND_POST, limit, self.max_scan),
+                "users": self.index.search(terms, KIND_USER, limit, self.max_scan),
+            }
+        if self.cache is not None:
+            self.cache.set(cache_key, result)
+        return result
+
+
+def get_suggest_service(request):
+    return request.registry.get('suggest')
+
+
+def _after_commit(request, fn):
+    tm = getattr(request, 'tm', None)
+    if tm is None:
+        fn()
+        return
+    tm.get().addAfterCommitHook(lambda success: success and fn())
+
+
+def index_post_after_commit(request, post):
+    """Masukkan post baru ke index autocomplete setelah transaksi berhasil."""
+    service = get_suggest_service(request)
+    if service is None:
+        return
+    post_id, title = post.id, post.title
+    _after_commit(request, lambda: service.put_post(post_id, title))
+
+
+def index_user_after_commit(request, user):
+    """Perbarui nama pengguna di index autocomplete setelah transaksi berhasil."""
+    service = get_suggest_service(request)
+    if service is None:
+        return
+    user_id, name = user.id, user.name
+    _after_commit(request, lambda: service.put_user(user_id, name))
+
+
+def includeme(config):
+    settings = config.get_settings()
+    if not asbool(settings.get('suggest.enabled', True)):
+        return
+
+    cache_entries = int(settings.get('suggest.cache_entries', 1024))
+    cache = None
+    if cache_entries:
+        cache = MemoryCacheBackend(
+            max_entries=cache_entries,
+            default_ttl=float(settings.get('suggest.cache_ttl', 60)),
+        )
+
+    config.registry['suggest'] = SuggestService(
+        min_length=int(settings.get('suggest.min_length', 2)),
+        max_results=int(settings.get('suggest.max_results', 10)),
+        max_scan=int(settings.get('suggest.max_scan', 2000)),
+        rebuild_interval=float(settings.get('suggest.rebuild_interval', 300)),
+        refresh_interval=float(settings.get('suggest.refresh_interval', 10)),
+        cache=cache,
+        session_factory=config.registry['dbsession_factory'],
+    )
@@ -1,9 +1,11 @@
 from passlib.hash import bcrypt
 from pyramid.view import view_config
 from pyramid.response import Response
+from sqlalchemy import update
 from sqlalchemy.exc import DBAPIError, IntegrityError
-from ..models import User
+from ..models import User, Post
 from ..security import create_token
+from ..utils.suggest import index_user_after_commit
 
 def get_role_from_email(email):
     if email.endswith("@student.itera.ac.id"):
@@ -109,6 +111,15 @@ def update_my_identity(request):
             return Response(json_body={"error": "Tidak ada field yang valid untuk diperbarui."}, status=400)
 
         request.dbsession.flush()
+        if 'prodi' in updated_fields:
+            # Jaga salinan prodi di semua post milik user tetap sinkron
+            request.dbsession.execute(
+                update(Post)
+                .where(Post.author_id == user.id)
+                .values(author_prodi=user.prodi)
+                .execution_options(synchronize_session=False)
+            )
+        index_user_after_commit(request, user)
 
         return Response(json_body={
             "message": "Profil berhasil diperbarui.",
@@ -204,6 +215,7 @@ def register(request):
 
         request.dbsession.add(new_user)
         request.dbsession.flush()
+        index_user_after_commit(request, new_user)
 
         return Response(json_body={"message": "Registrasi berhasil", "role": role}, status=201)
 
@@ -7,6 +7,10 @@ from sqlalchemy.orm import joinedload
 from ..models.comment import Comment
 from ..models.post import Post
 from ..models.user import User
+from ..utils.cache import invalidate_after_commit
+from ..utils.hot import mark_hot_after_commit
+from ..utils.changelog import record_changes, ENTITY_POST, ENTITY_COMMENT
+from ..utils.etag import comments_etag, etag_matches, set_etag, not_modified
 
 # Tidak perlu import json jika renderer='json' sudah digunakan di view_config
 # import json
@@ -48,7 +52,13 @@ def add_comment(request):
 
         comment = Comment(post_id=post_id, user_id=user_id, content=content)
         request.dbsession.add(comment)
+        # Counter dinaikkan di SQL (comment_count = comment_count + 1) agar aman dari race
+        post.comment_count = Post.comment_count + 1
+        post.bump_version()
         request.dbsession.flush() # Agar comment.id tersedia
+        record_changes(request, (ENTITY_COMMENT, comment.id, post_id), (ENTITY_POST, post_id, post_id))
+        invalidate_after_commit(request, post_ids=[post_id])
+        mark_hot_after_commit(request, post_id)
 
         # Respons yang lebih informatif
         return {
@@ -88,11 +98,6 @@ def get_comments_by_post(request):
             # Mengembalikan Response objek dengan status 400
             return Response(json_body={"error": "Post ID tidak valid."}, status=400)
 
-        post = request.dbsession.get(Post, post_id)
-        if not post:
-            # Mengembalikan Response objek dengan status 404
-            return Response(json_body={"error": "Post tidak ditemukan."}, status=404)
-
         page = request.params.get('page', 1)
         per_page = request.params.get('per_page', 5)
 
@@ -107,6 +112,20 @@ def get_comments_by_post(request):
             # Mengembalikan Response objek dengan status 400
             return Response(json_body={"error": "Parameter 'page' atau 'per_page' tidak valid."}, status=400)
 
+        if request.headers.get("If-None-Match"):
+            # Cek versi post saja; komentar hanya dimuat jika ETag klien sudah usang
+            version = request.dbsession.query(Post.version).filter(Post.id == post_id).scalar()
+            if version is None:
+                return Response(json_body={"error": "Post tidak ditemukan."}, status=404)
+            etag = comments_etag(post_id, version, page, per_page)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+        post = request.dbsession.get(Post, post_id)
+        if not post:
+            # Mengembalikan Response objek dengan status 404
+            return Response(json_body={"error": "Post tidak ditemukan."}, status=404)
+
         offset = (page - 1) * per_page
 
         total_comments = request.dbsession.query(Comment).filter_by(post_id=post_id).count()
@@ -129,6 +148,8 @@ def get_comments_by_post(request):
         
         total_pages = (total_comments + per_page - 1) // per_page
 
+        set_etag(request.response, comments_etag(post_id, post.version, page, per_page))
+
         return {
             "comments": result,
             "pagination": {
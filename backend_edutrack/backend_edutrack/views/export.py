@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from pyramid.view import view_config
+from pyramid.response import Response
+from pyramid.settings import asbool
+
+from ..utils.auth_policy import is_admin
+from ..utils.compression import choose_encoding
+from ..utils.export import CONTENT_TYPES, ENTITIES, FORMATS, export_chunks
+
+
+@view_config(route_name='export', request_method='GET')
+def export(request):
+    """
+    Unduh data untuk analitik (``?entity=posts|comments|interactions|all``,
+    ``?format=ndjson|csv``) sebagai stream. Dikompres gzip jika klien
+    mengirim ``Accept-Encoding: gzip``. Hanya untuk admin.
+    """
+    if not is_admin(request):
+        return Response(json_body={"error": "Hanya admin yang dapat mengekspor data."}, status=403)
+
+    entity = request.params.get('entity', 'all')
+    fmt = request.params.get('format', 'ndjson')
+    entities = ENTITIES if entity == 'all' else (entity,)
+    if fmt not in FORMATS or any(e not in ENTITIES for e in entities) or (fmt == 'csv' and len(entities) != 1):
+        return Response(json_body={
+            "error": "Parameter tidak valid: entity salah satu dari %s atau 'all' (hanya untuk ndjson), "
+                     "format salah satu dari %s." % (", ".join(ENTITIES), ", ".join(FORMATS))
+        }, status=400)
+
+    settings = request.registry.settings or {}
+    compress = asbool(settings.get('export.gzip', True)) and \
+        choose_encoding(request.headers.get('Accept-Encoding'), ('gzip',)) == 'gzip'
+
+    response = Response(content_type=CONTENT_TYPES[fmt], charset='utf-8')
+    response.headers['Content-Disposition'] = 'attachment; filename="edutrack-%s-%s.%s"' % (
+        entity, datetime.utcnow().strftime('%Y%m%d%H%M%S'), fmt)
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.app_iter = export_chunks(
+        request.registry['dbsession_factory'].kw['bind'],
+        entities,
+        fmt,
+        batch_size=int(settings.get('export.batch_size', 1000)),
+        compress=compress,
+    )
+    return response
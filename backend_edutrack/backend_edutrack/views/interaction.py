@@ -0,0 +1,224 @@
+from datetime import datetime
+
+from pyramid.view import view_config
+from pyramid.response import Response
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from ..models.post import Post, PostInteraction
+from ..utils.cache import invalidate_after_commit
+from ..utils.changelog import record_changes, ENTITY_POST
+from ..utils.hot import mark_hot_after_commit
+
+# Batas jumlah operasi per request POST /api/interactions/batch
+MAX_BATCH_OPERATIONS = 100
+
+ACTIONS = ('like', 'dislike')
+
+# Pesan per transisi, sama dengan endpoint like/dislike tunggal
+MESSAGES = {
+    ('like', None): "Post berhasil disukai.",
+    ('like', 'like'): "Like dibatalkan.",
+    ('like', 'dislike'): "Dislike diubah menjadi like.",
+    ('dislike', None): "Post berhasil tidak disukai.",
+    ('dislike', 'dislike'): "Dislike dibatalkan.",
+    ('dislike', 'like'): "Like diubah menjadi dislike.",
+}
+
+
+def apply_action(current, action):
+    """
+    Transisi toggle seperti ``/like`` dan ``/dislike``: aksi yang sama dengan
+    interaksi saat ini membatalkannya, aksi lain menggantinya.
+    Mengembalikan ``(interaksi_baru, pesan)``.
+    """
+    message = MESSAGES[(action, current)]
+    return (None if current == action else action), message
+
+
+def parse_operations(data):
+    """
+    Validasi ``{"operations": [{"post_id": 1, "action": "like"}, ...]}``.
+    Operasi yang tidak valid tidak menggagalkan batch; hasilnya ditandai
+    ``invalid``. ``ValueError`` jika bentuk body salah.
+    """
+    operations = data.get("operations") if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations or len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(operations)
+
+    parsed = []
+    for operation in operations:
+        post_id = operation.get("post_id") if isinstance(operation, dict) else None
+        action = operation.get("action") if isinstance(operation, dict) else None
+        if isinstance(post_id, bool) or not isinstance(post_id, int) or action not in ACTIONS:
+            parsed.append(None)
+        else:
+            parsed.append((post_id, action))
+    return parsed
+
+
+def upsert_interactions(dbsession, user_id, states, now):
+    """
+    Tulis interaksi akhir ``{post_id: 'like'/'dislike'}`` milik satu user
+    dengan satu statement ``INSERT ... ON CONFLICT DO UPDATE`` (PostgreSQL
+    dan SQLite). Dialek lain memakai satu UPDATE per jenis interaksi lalu
+    satu INSERT untuk baris yang belum ada.
+
+    ``created_at`` ikut diperbarui saat jenis interaksi berganti, supaya
+    like/dislike yang baru diganti terhitung sebagai interaksi terbaru
+    oleh ``HotRanker``.
+    """
+    rows = [
+        {"user_id": user_id, "post_id": post_id, "interaction_type": state, "created_at": now}
+        for post_id, state in states.items()
+    ]
+    dialect = dbsession.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(PostInteraction).values(rows)
+        dbsession.execute(statement.on_conflict_do_update(
+            index_elements=[PostInteraction.user_id, PostInteraction.post_id],
+            set_={
+                "interaction_type": statement.excluded.interaction_type,
+                "created_at": statement.excluded.created_at,
+            },
+        ))
+        return
+
+    existing = set(dbsession.execute(
+        select(PostInteraction.post_id)
+        .where(PostInteraction.user_id == user_id, PostInteraction.post_id.in_(list(states)))
+    ).scalars())
+    for action in ACTIONS:
+        post_ids = [pid for pid in existing if states[pid] == action]
+        if post_ids:
+            dbsession.execute(
+                update(PostInteraction)
+                .where(PostInteraction.user_id == user_id, PostInteraction.post_id.in_(post_ids))
+                .values(interaction_type=action, created_at=now)
+            )
+    new_rows = [row for row in rows if row["post_id"] not in existing]
+    if new_rows:
+        dbsession.execute(insert(PostInteraction), new_rows)
+
+
+def apply_counter_deltas(dbsession, deltas):
+    """
+    Terapkan selisih ``{post_id: (d_likes, d_dislikes)}`` ke semua post dengan
+    satu UPDATE (``likes = likes + CASE id ...``), sekaligus menaikkan versi.
+    """
+    post_ids = list(deltas)
+    dbsession.execute(
+        update(Post)
+        .where(Post.id.in_(post_ids))
+        .values(
+            likes=Post.likes + case({pid: d[0] for pid, d in deltas.items()}, value=Post.id, else_=0),
+            dislikes=Post.dislikes + case({pid: d[1] for pid, d in deltas.items()}, value=Post.id, else_=0),
+            version=Post.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+@view_config(route_name='interactions_batch', request_method='POST', renderer='json')
+def interactions_batch(request):
+    """
+    Terapkan banyak like/dislike dalam satu transaksi. Operasi dijalankan
+    berurutan (beberapa operasi pada post yang sama saling menumpuk), lalu
+    hanya keadaan akhir per post yang ditulis ke database.
+    """
+    try:
+        user_id = request.user.get("id")
+        if not user_id:
+            return Response(json_body={"error": "Autentikasi diperlukan untuk berinteraksi."}, status=401)
+
+        try:
+            operations = parse_operations(request.json_body)
+        except ValueError:
+            return Response(json_body={
+                "error": "Body harus berisi 'operations' dengan 1-%d operasi." % MAX_BATCH_OPERATIONS
+            }, status=400)
+
+        post_ids = list(dict.fromkeys(op[0] for op in operations if op is not None))
+        existing_posts = set()
+        initial = {}
+        if post_ids:
+            existing_posts = set(request.dbsession.execute(
+                select(Post.id).where(Post.id.in_(post_ids))
+            ).scalars())
+            initial = dict(request.dbsession.execute(
+                select(PostInteraction.post_id, PostInteraction.interaction_type)
+                .where(PostInteraction.user_id == user_id, PostInteraction.post_id.in_(post_ids))
+            ).all())
+
+        states = dict(initial)
+        results = []
+        for operation in operations:
+            if operation is None:
+                results.append({"status": "invalid", "error": "Operasi tidak valid."})
+                continue
+            post_id, action = operation
+            if post_id not in existing_posts:
+                results.append({"post_id": post_id, "action": action, "status": "not_found",
+                                "error": "Post tidak ditemukan."})
+                continue
+            states[post_id], message = apply_action(states.get(post_id), action)
+            results.append({"post_id": post_id, "action": action, "status": "ok",
+                            "message": message, "my_interaction": states[post_id]})
+
+        changed = [pid for pid in post_ids if pid in existing_posts and states.get(pid) != initial.get(pid)]
+        if changed:
+            removed = [pid for pid in changed if states.get(pid) is None]
+            if removed:
+                request.dbsession.execute(
+                    delete(PostInteraction)
+                    .where(PostInteraction.user_id == user_id, PostInteraction.post_id.in_(removed))
+                )
+            kept = {pid: states[pid] for pid in changed if states.get(pid) is not None}
+            if kept:
+                upsert_interactions(request.dbsession, user_id, kept, datetime.utcnow())
+
+            apply_counter_deltas(request.dbsession, {
+                pid: (
+                    (states.get(pid) == 'like') - (initial.get(pid) == 'like'),
+                    (states.get(pid) == 'dislike') - (initial.get(pid) == 'dislike'),
+                )
+                for pid in changed
+            })
+            record_changes(request, *[(ENTITY_POST, pid, pid) for pid in changed])
+            invalidate_after_commit(request, post_ids=changed)
+            for pid in changed:
+                mark_hot_after_commit(request, pid)
+
+        touched = [pid for pid in post_ids if pid in existing_posts]
+        counts = {}
+        if touched:
+            counts = {
+                row.id: row for row in request.dbsession.execute(
+                    select(Post.id, Post.likes, Post.dislikes).where(Post.id.in_(touched))
+                )
+            }
+        return {
+            "results": results,
+            "posts": [
+                {
+                    "id": pid,
+                    "likes": counts[pid].likes,
+                    "dislikes": counts[pid].dislikes,
+                    "my_interaction": states.get(pid),
+                }
+                for pid in touched if pid in counts
+            ],
+        }
+
+    except IntegrityError:
+        return Response(json_body={"error": "Terjadi konflik interaksi."}, status=409)
+    except DBAPIError as e:
+        print(f"Database error in interactions_batch: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan database saat menyimpan interaksi."}, status=500)
+    except Exception as e:
+        print(f"Unexpected error in interactions_batch: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan server tidak terduga."}, status=500)
@@ -0,0 +1,22 @@
+from pyramid.view import view_config
+from pyramid.response import Response
+
+from ..utils.auth_policy import is_admin
+
+
+@view_config(route_name='metrics', request_method='GET', renderer='json')
+def metrics(request):
+    """
+    Angka operasional proses ini: admission control (in-flight, latensi,
+    request yang ditolak) dan circuit breaker database. Hanya untuk admin
+    (``admin.user_ids``).
+    """
+    if not is_admin(request):
+        return Response(json_body={"error": "Hanya admin yang dapat melihat metrik."}, status=403)
+
+    admission = request.registry.get('admission')
+    breaker = request.registry.get('db_breaker')
+    return {
+        "admission": admission.metrics() if admission is not None else None,
+        "db_breaker": breaker.metrics() if breaker is not None else None,
+    }
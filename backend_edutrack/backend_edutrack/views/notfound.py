@@ -1,7 +1,18 @@
-from pyramid.view import notfound_view_config
+from pyramid.settings import asbool
 
 
-@notfound_view_config(renderer='../templates/404.jinja2')
 def notfound_view(request):
     request.response.status = 404
-    return {}
+    return {"error": "Halaman tidak ditemukan."}
+
+
+def includeme(config):
+    """
+    Daftarkan view 404. Halaman HTML dari template jinja2 hanya dipakai jika
+    ``templates.enabled``; tanpa itu 404 dirender sebagai JSON seperti view
+    API lainnya, sehingga pyramid_jinja2 tidak perlu dimuat.
+    """
+    if asbool(config.get_settings().get('templates.enabled', False)):
+        config.add_notfound_view(notfound_view, renderer='backend_edutrack:templates/404.jinja2')
+    else:
+        config.add_notfound_view(notfound_view, renderer='json')
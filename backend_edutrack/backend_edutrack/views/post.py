@@ -1,12 +1,21 @@
 from pyramid.view import view_config
 from pyramid.response import Response
+from sqlalchemy import select, or_, and_
 from sqlalchemy.exc import DBAPIError, IntegrityError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import datetime
 
-from ..models.post import Post, PostInteraction
+from ..models.post import Post, PostInteraction, post_recommendations
 from ..models.user import User
 from ..models.url import URL
+from ..utils.cache import get_response_cache, invalidate_after_commit
+from ..utils.etag import post_etag, etag_matches, set_etag, not_modified
+from ..utils.singleflight import coalesce
+from ..utils.search import index_post
+from ..utils.suggest import index_post_after_commit
+from ..utils.hot import mark_hot_after_commit
+from ..utils.changelog import record_changes, ENTITY_POST, ENTITY_RECOMMENDATION
+from ..utils.pagination import encode_cursor, decode_cursor
 
 # --- Helper Function untuk Konversi Model ke Dictionary ---
 def post_to_dict(post_obj):
@@ -39,11 +48,119 @@ def post_to_dict(post_obj):
         "author": author_name,
         "likes": post_obj.likes,
         "dislikes": post_obj.dislikes,
+        "comment_count": post_obj.comment_count,
         "references": references_data,
         "recommendedBy": recommended_by_data,
     }
 
 
+def post_cache_entry(post_obj):
+    """
+    Bentuk entri cache untuk satu post: payload publik dari post_to_dict plus
+    ID pemberi rekomendasi, dipakai untuk menghitung field per-pengguna.
+    """
+    recommender_ids = []
+    if hasattr(post_obj, "recommended_by") and post_obj.recommended_by:
+        recommender_ids = [user.id for user in post_obj.recommended_by]
+
+    return {
+        "post": post_to_dict(post_obj),
+        "recommender_ids": recommender_ids,
+        "version": post_obj.version,
+    }
+
+
+def load_post_entry(request, cache, post_id):
+    """
+    Muat satu post lengkap dari database dan simpan entrinya ke cache (jika aktif).
+    Mengembalikan None jika post tidak ada.
+    """
+    post = request.dbsession.query(Post) \
+        .options(joinedload(Post.author)) \
+        .options(joinedload(Post.references)) \
+        .options(joinedload(Post.recommended_by)) \
+        .filter_by(id=post_id).first()
+
+    if not post:
+        return None
+
+    entry = post_cache_entry(post)
+    if cache is not None:
+        cache.set_post(post_id, entry)
+    return entry
+
+
+def load_post_entries(request, cache, post_ids):
+    """
+    Ambil entri cache untuk banyak post. Post yang belum ada di cache dimuat
+    dalam satu query (penulis lewat join), lalu referensi dan pemberi
+    rekomendasi masing-masing dengan satu query ``IN``, berapa pun jumlah
+    post-nya. Hasilnya disimpan ke cache. ``cache`` boleh None.
+    """
+    entries = cache.get_posts(post_ids) if cache is not None else {}
+    missing_ids = [pid for pid in post_ids if pid not in entries]
+    if missing_ids:
+        posts = request.dbsession.query(Post) \
+            .options(joinedload(Post.author)) \
+            .options(selectinload(Post.references)) \
+            .options(selectinload(Post.recommended_by)) \
+            .filter(Post.id.in_(missing_ids)).all()
+        for post in posts:
+            entry = post_cache_entry(post)
+            if cache is not None:
+                cache.set_post(post.id, entry)
+            entries[post.id] = entry
+    return entries
+
+
+def add_viewer_state(request, posts_data):
+    """
+    Tambahkan ``my_interaction`` ('like'/'dislike'/None) dan ``recommended_by_me``
+    untuk user saat ini ke setiap item feed. Masing-masing dihitung dengan satu
+    query ``IN`` untuk semua post di halaman, lalu digabung lewat lookup dict.
+    """
+    user_id = (request.user or {}).get("id")
+    interactions = {}
+    recommended = set()
+
+    post_ids = [p["id"] for p in posts_data]
+    if user_id and post_ids:
+        interactions = dict(
+            request.dbsession.query(PostInteraction.post_id, PostInteraction.interaction_type)
+            .filter(PostInteraction.user_id == user_id, PostInteraction.post_id.in_(post_ids))
+            .all()
+        )
+        # Hanya dosen yang bisa merekomendasikan, user lain tidak perlu query
+        if request.user.get("role") == "Dosen":
+            recommended = {
+                row.post_id for row in request.dbsession.execute(
+                    select(post_recommendations.c.post_id)
+                    .where(post_recommendations.c.user_id == user_id)
+                    .where(post_recommendations.c.post_id.in_(post_ids))
+                )
+            }
+
+    for post_data in posts_data:
+        post_data["my_interaction"] = interactions.get(post_data["id"])
+        post_data["recommended_by_me"] = post_data["id"] in recommended
+    return posts_data
+
+
+def parse_post_ids(value, maximum):
+    """
+    Parse daftar ID dipisah koma (``"1,2,3"``). ``ValueError`` jika kosong,
+    bukan angka, atau lebih dari ``maximum``.
+    """
+    post_ids = []
+    for part in (value or '').split(','):
+        part = part.strip()
+        if part:
+            post_ids.append(int(part))
+    if not post_ids or len(post_ids) > maximum:
+        raise ValueError(value)
+    return post_ids
+
+
 # --- Helper Function untuk Response Error Konsisten ---
 def error_response(request, message, status_code):
     """
@@ -76,10 +193,14 @@ def create_post(request):
         if not title or not content:
             return error_response(request, "Judul dan konten harus diisi.", 400)
 
+        author_obj = request.dbsession.query(User).get(user_id)
+
         new_post = Post(
             title=title,
             content=content,
             author_id=user_id,
+            # Denormalisasi prodi penulis untuk filter feed ?prodi=
+            author_prodi=author_obj.prodi if author_obj else None,
         )
         request.dbsession.add(new_post)
         # Flush diperlukan agar new_post memiliki ID dan relasi yang valid sebelum commit
@@ -98,10 +219,15 @@ def create_post(request):
         # Hapus request.dbsession.commit()
         # Biarkan transaction manager Pyramid yang mengelola commit secara otomatis
 
-        author_obj = request.dbsession.query(User).get(user_id)
         if author_obj:
             new_post.author = author_obj
 
+        index_post(request, new_post)
+        record_changes(request, (ENTITY_POST, new_post.id, new_post.id))
+        index_post_after_commit(request, new_post)
+        mark_hot_after_commit(request, new_post.id)
+        invalidate_after_commit(request, feed=True)
+
         return {"message": "Post berhasil dibuat", "post": post_to_dict(new_post)}
 
     except IntegrityError:
@@ -122,12 +248,43 @@ def create_post(request):
         # Biarkan transaction manager Pyramid yang mengelola rollback
         return error_response(request, "Terjadi kesalahan server tidak terduga.", 500)
 
+
+def parse_feed_filters(request):
+    """
+    Baca filter feed: ``author=self``, ``author_id=`` dan ``prodi=``.
+    Mengembalikan ``(filters, error)``; ``filters`` berisi ``author_id`` dan
+    ``prodi`` (None jika tidak difilter).
+    """
+    author_id = request.params.get('author_id')
+    if author_id is not None:
+        try:
+            author_id = int(author_id)
+        except ValueError:
+            return None, error_response(request, "Parameter 'author_id' tidak valid.", 400)
+
+    if request.params.get('author') == 'self':
+        author_id = request.user.get("id")
+        if not author_id:
+            return None, error_response(request, "Autentikasi diperlukan untuk melihat postingan Anda.", 401)
+
+    prodi = (request.params.get('prodi') or '').strip() or None
+    return {"author_id": author_id, "prodi": prodi}, None
+
+
+def apply_feed_filters(query, filters):
+    # Dilayani index (author_id, created_at) dan (author_prodi, created_at)
+    if filters["author_id"] is not None:
+        query = query.filter(Post.author_id == filters["author_id"])
+    if filters["prodi"] is not None:
+        query = query.filter(Post.author_prodi == filters["prodi"])
+    return query
+
+
 @view_config(route_name='list_posts', request_method='GET', renderer='json')
 def list_posts(request):
     try:
         page = request.params.get('page', 1)
         per_page = request.params.get('per_page', 10)
-        filter_self = request.params.get('author') == 'self'
 
         try:
             page = int(page)
@@ -139,32 +296,50 @@ def list_posts(request):
         except ValueError:
             return error_response(request, "Parameter 'page' atau 'per_page' tidak valid.", 400)
 
+        filters, error = parse_feed_filters(request)
+        if error is not None:
+            return error
+        filtered = filters["author_id"] is not None or filters["prodi"] is not None
+
+        sort = request.params.get('sort', 'new')
+        if sort == 'hot':
+            return list_hot_posts(request, per_page, filters)
+        if sort != 'new':
+            return error_response(request, "Parameter 'sort' tidak valid.", 400)
+
         offset = (page - 1) * per_page
 
-        posts_query = request.dbsession.query(Post)
+        # Hanya feed publik tanpa filter di halaman awal yang di-cache
+        cache = get_response_cache(request)
+        use_cache = cache is not None and not filtered and cache.feed_cacheable(page)
+        cached_feed = cache.get_feed(page, per_page) if use_cache else None
+        if cached_feed is not None:
+            entries_by_id = load_post_entries(request, cache, cached_feed["post_ids"])
+            posts_data = [dict(entries_by_id[pid]["post"]) for pid in cached_feed["post_ids"] if pid in entries_by_id]
+            add_viewer_state(request, posts_data)
+            return {
+                "posts": posts_data,
+                "pagination": cached_feed["pagination"],
+            }
 
-        if filter_self:
-            user_id = request.user.get("id")
-            if not user_id:
-                return error_response(request, "Autentikasi diperlukan untuk melihat postingan Anda.", 401)
-            posts_query = posts_query.filter(Post.author_id == user_id)
+        def load_page():
+            posts_query = apply_feed_filters(request.dbsession.query(Post), filters)
 
-        total_posts = posts_query.count()
+            total_posts = posts_query.count()
 
-        posts_query = posts_query \
-            .options(joinedload(Post.author)) \
-            .options(joinedload(Post.references)) \
-            .order_by(Post.created_at.desc())
+            posts_query = posts_query \
+                .options(joinedload(Post.author)) \
+                .options(joinedload(Post.references)) \
+                .options(selectinload(Post.recommended_by)) \
+                .order_by(Post.created_at.desc())
 
-        posts = posts_query.offset(offset).limit(per_page).all()
-        
-        posts_data = [post_to_dict(p) for p in posts]
-        
-        total_pages = (total_posts + per_page - 1) // per_page
+            posts = posts_query.offset(offset).limit(per_page).all()
 
-        return {
-            "posts": posts_data,
-            "pagination": {
+            entries = [post_cache_entry(p) for p in posts]
+
+            total_pages = (total_posts + per_page - 1) // per_page
+
+            pagination = {
                 "total_posts": total_posts,
                 "per_page": per_page,
                 "current_page": page,
@@ -172,6 +347,27 @@ def list_posts(request):
                 "has_next": page < total_pages,
                 "has_prev": page > 1
             }
+
+            if use_cache:
+                for post, entry in zip(posts, entries):
+                    cache.set_post(post.id, entry)
+                cache.set_feed(page, per_page, {
+                    "post_ids": [p.id for p in posts],
+                    "pagination": pagination,
+                })
+
+            return entries, pagination
+
+        # Request feed identik yang datang bersamaan berbagi satu query
+        feed_key = (page, per_page, filters["author_id"], filters["prodi"])
+        entries, pagination = coalesce(request, feed_key, load_page)
+
+        posts_data = [dict(entry["post"]) for entry in entries]
+        add_viewer_state(request, posts_data)
+
+        return {
+            "posts": posts_data,
+            "pagination": pagination
         }
 
     except DBAPIError as e:
@@ -182,6 +378,96 @@ def list_posts(request):
         return error_response(request, "Terjadi kesalahan server tidak terduga.", 500)
 
 
+
+def list_hot_posts(request, per_page, filters):
+    """
+    Feed ``sort=hot``: urut ``hot_score`` lalu ``id`` (keduanya menurun) dengan
+    keyset pagination lewat parameter ``cursor``. Urutan ID dibaca dari index
+    ``ix_posts_hot_score_id``, isi post dimuat lewat ``load_post_entries``.
+    ``filters`` berasal dari ``parse_feed_filters``.
+
+    Paginasi ini best-effort: ``HotRanker`` memperbarui skor di antara dua
+    halaman, sehingga post yang skornya naik melewati cursor terlewat dan
+    yang turun bisa tampil lagi. Skor tidak disimpan per generasi, jadi
+    snapshot per cursor tidak tersedia; klien membuang ``id`` duplikat.
+    """
+    cursor = request.params.get('cursor')
+    after = None
+    try:
+        if cursor:
+            last_score, last_id = decode_cursor(cursor, 2)
+            after = (float(last_score), int(last_id))
+    except (ValueError, TypeError):
+        return error_response(request, "Parameter 'cursor' tidak valid.", 400)
+
+    def load_page():
+        query = apply_feed_filters(request.dbsession.query(Post.id, Post.hot_score), filters)
+        if after is not None:
+            last_score, last_id = after
+            query = query.filter(or_(
+                Post.hot_score < last_score,
+                and_(Post.hot_score == last_score, Post.id < last_id),
+            ))
+        # Satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya
+        rows = query.order_by(Post.hot_score.desc(), Post.id.desc()).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        return [row.id for row in rows], {
+            "sort": "hot",
+            "per_page": per_page,
+            "has_next": has_next,
+            "next_cursor": encode_cursor([rows[-1].hot_score, rows[-1].id]) if has_next else None,
+        }
+
+    hot_key = ('hot', cursor, per_page, filters["author_id"], filters["prodi"])
+    post_ids, pagination = coalesce(request, hot_key, load_page)
+
+    entries = load_post_entries(request, get_response_cache(request), post_ids)
+    posts_data = [dict(entries[pid]["post"]) for pid in post_ids if pid in entries]
+    add_viewer_state(request, posts_data)
+
+    return {
+        "posts": posts_data,
+        "pagination": pagination
+    }
+
+
+# Batas jumlah ID per request GET /api/posts?ids=
+MAX_BATCH_IDS = 100
+
+
+@view_config(route_name='get_posts', request_method='GET', renderer='json')
+def get_posts(request):
+    """
+    Ambil banyak post sekaligus: ``GET /api/posts?ids=1,2,3``. Hasil
+    mengikuti urutan ``ids`` (ID ganda hanya muncul sekali); ID yang tidak
+    ada diganti penanda ``{"id": ..., "not_found": true}``.
+    """
+    try:
+        try:
+            post_ids = parse_post_ids(request.params.get('ids'), MAX_BATCH_IDS)
+        except ValueError:
+            return error_response(
+                request, "Parameter 'ids' harus berisi 1-%d ID post dipisah koma." % MAX_BATCH_IDS, 400)
+        post_ids = list(dict.fromkeys(post_ids))
+
+        entries = load_post_entries(request, get_response_cache(request), post_ids)
+        found = [dict(entries[pid]["post"]) for pid in post_ids if pid in entries]
+        add_viewer_state(request, found)
+
+        found_by_id = {post["id"]: post for post in found}
+        return {
+            "posts": [found_by_id.get(pid, {"id": pid, "not_found": True}) for pid in post_ids],
+        }
+
+    except DBAPIError as e:
+        print(f"Database error: {e}")
+        return error_response(request, "Terjadi kesalahan database.", 500)
+    except Exception as e:
+        print(f"Unexpected error getting posts: {e}")
+        return error_response(request, "Terjadi kesalahan server tidak terduga.", 500)
+
+
 @view_config(route_name='get_post', request_method='GET', renderer='json')
 def get_post(request):
     try:
@@ -191,24 +477,31 @@ def get_post(request):
         except (ValueError, TypeError):
             return error_response(request, "ID Post tidak valid.", 400)
 
-        post = request.dbsession.query(Post) \
-            .options(joinedload(Post.author)) \
-            .options(joinedload(Post.references)) \
-            .options(joinedload(Post.recommended_by)) \
-            .filter_by(id=post_id).first()
-
-        if not post:
-            return error_response(request, "Post tidak ditemukan.", 404)
-
-        post_data = post_to_dict(post)
-
-        # Ambil user saat ini
-        current_user = request.user
-        is_recommended = False
-        if current_user and hasattr(post, "recommended_by"):
-            is_recommended = current_user in post.recommended_by
-
-        post_data["is_recommended_by_current_user"] = is_recommended
+        cache = get_response_cache(request)
+        entry = cache.get_post(post_id) if cache is not None else None
+
+        if entry is not None:
+            if etag_matches(request, post_etag(post_id, entry["version"])):
+                return not_modified(post_etag(post_id, entry["version"]))
+        elif request.headers.get("If-None-Match"):
+            # Cek versi saja dulu; post lengkap hanya dimuat jika klien perlu body baru
+            version = request.dbsession.query(Post.version).filter(Post.id == post_id).scalar()
+            if version is None:
+                return error_response(request, "Post tidak ditemukan.", 404)
+            if etag_matches(request, post_etag(post_id, version)):
+                return not_modified(post_etag(post_id, version))
+
+        if entry is None:
+            entry = coalesce(request, post_id, lambda: load_post_entry(request, cache, post_id))
+            if entry is None:
+                return error_response(request, "Post tidak ditemukan.", 404)
+
+        # Field per-user ditambahkan setelah lookup cache, pada salinan payload,
+        # sehingga tidak pernah ikut tersimpan/terbagi antar pengguna.
+        post_data = dict(entry["post"])
+        current_user_id = (request.user or {}).get("id")
+        post_data["is_recommended_by_current_user"] = current_user_id in entry["recommender_ids"]
+        set_etag(request.response, post_etag(post_id, entry["version"]))
         return post_data
 
     except DBAPIError as e:
@@ -249,6 +542,7 @@ def like_post(request):
             else:
                 # Ganti dislike ke like
                 interaction.interaction_type = 'like'
+                interaction.created_at = datetime.utcnow()
                 post.likes += 1
                 post.dislikes -= 1
                 message = "Dislike diubah menjadi like."
@@ -263,7 +557,11 @@ def like_post(request):
             post.likes += 1
             message = "Post berhasil disukai."
 
+        post.bump_version()
         request.dbsession.flush()
+        record_changes(request, (ENTITY_POST, post_id, post_id))
+        invalidate_after_commit(request, post_ids=[post_id])
+        mark_hot_after_commit(request, post_id)
         return {"message": message, "likes": post.likes, "dislikes": post.dislikes}
 
     except IntegrityError:
@@ -308,6 +606,7 @@ def dislike_post(request):
             else:
                 # Ganti like ke dislike
                 interaction.interaction_type = 'dislike'
+                interaction.created_at = datetime.utcnow()
                 post.likes -= 1
                 post.dislikes += 1
                 message = "Like diubah menjadi dislike."
@@ -322,7 +621,11 @@ def dislike_post(request):
             post.dislikes += 1
             message = "Post berhasil tidak disukai."
 
+        post.bump_version()
         request.dbsession.flush()
+        record_changes(request, (ENTITY_POST, post_id, post_id))
+        invalidate_after_commit(request, post_ids=[post_id])
+        mark_hot_after_commit(request, post_id)
         return {"message": message, "likes": post.likes, "dislikes": post.dislikes}
 
     except IntegrityError:
@@ -355,7 +658,11 @@ def recommend_post(request):
             return Response(json_body={"message": "Anda sudah merekomendasikan post ini."}, status=200)
 
         post.recommended_by.append(user)
+        post.bump_version()
         request.dbsession.flush()
+        record_changes(request, (ENTITY_POST, post.id, post.id), (ENTITY_RECOMMENDATION, user_id, post.id))
+        invalidate_after_commit(request, post_ids=[post.id])
+        mark_hot_after_commit(request, post.id)
 
         return {
             "message": "Post berhasil direkomendasikan.",
@@ -390,7 +697,11 @@ def unrecommend_post(request):
             return Response(json_body={"message": "Anda belum merekomendasikan post ini."}, status=200)
 
         post.recommended_by.remove(user)
+        post.bump_version()
         request.dbsession.flush()
+        record_changes(request, (ENTITY_POST, post.id, post.id), (ENTITY_RECOMMENDATION, user_id, post.id))
+        invalidate_after_commit(request, post_ids=[post.id])
+        mark_hot_after_commit(request, post.id)
 
         return {
             "message": "Rekomendasi berhasil dibatalkan.",
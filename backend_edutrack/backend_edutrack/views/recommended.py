@@ -0,0 +1,125 @@
+from datetime import datetime
+
+from pyramid.view import view_config
+from pyramid.response import Response
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.exc import DBAPIError
+
+from ..models.post import post_recommendations
+from ..models.user import User
+from ..utils.cache import get_response_cache
+from ..utils.pagination import encode_cursor, decode_cursor, parse_limit
+from .post import load_post_entries, add_viewer_state
+
+
+def recommended_page_query(dosen_id, after, limit):
+    """
+    Query ``(post_id, created_at)`` satu halaman, urut waktu rekomendasi menurun.
+
+    Tanpa ``dosen_id`` setiap post muncul sekali, pada waktu rekomendasi
+    terbarunya: baris yang masih punya rekomendasi lebih baru (untuk post yang
+    sama) dilewati. Urutan dibaca dari index ``(created_at, post_id)``, atau
+    ``(user_id, created_at)`` jika difilter per dosen.
+    """
+    rec = post_recommendations.alias('rec')
+    query = select(rec.c.post_id, rec.c.created_at)
+
+    if dosen_id is not None:
+        query = query.where(rec.c.user_id == dosen_id)
+    else:
+        newer = post_recommendations.alias('newer')
+        query = query.where(~exists().where(
+            newer.c.post_id == rec.c.post_id,
+            or_(
+                newer.c.created_at > rec.c.created_at,
+                and_(newer.c.created_at == rec.c.created_at, newer.c.user_id > rec.c.user_id),
+            ),
+        ))
+
+    if after is not None:
+        last_at, last_post_id = after
+        query = query.where(or_(
+            rec.c.created_at < last_at,
+            and_(rec.c.created_at == last_at, rec.c.post_id < last_post_id),
+        ))
+
+    return query.order_by(rec.c.created_at.desc(), rec.c.post_id.desc()).limit(limit)
+
+
+def load_recommenders(dbsession, post_ids):
+    """
+    Muat semua dosen pemberi rekomendasi untuk ``post_ids`` dalam satu query.
+    Mengembalikan {post_id: [{"id", "name", "recommended_at"}, ...]} terbaru dulu.
+    """
+    result = {post_id: [] for post_id in post_ids}
+    if not post_ids:
+        return result
+    rows = dbsession.execute(
+        select(post_recommendations.c.post_id, User.id, User.name, post_recommendations.c.created_at)
+        .join(User, User.id == post_recommendations.c.user_id)
+        .where(post_recommendations.c.post_id.in_(post_ids))
+        .order_by(post_recommendations.c.created_at.desc(), User.id.desc())
+    )
+    for post_id, user_id, name, created_at in rows:
+        result[post_id].append({
+            "id": user_id,
+            "name": name,
+            "recommended_at": created_at.isoformat() if created_at else None,
+        })
+    return result
+
+
+@view_config(route_name='recommended_posts', request_method='GET', renderer='json')
+def recommended_posts(request):
+    try:
+        try:
+            limit = parse_limit(request.params.get('limit'), default=10, maximum=50)
+            dosen_id = request.params.get('dosen_id')
+            dosen_id = int(dosen_id) if dosen_id else None
+            cursor = request.params.get('cursor')
+            after = None
+            if cursor:
+                last_at, last_post_id = decode_cursor(cursor, 2)
+                after = (datetime.fromisoformat(last_at), int(last_post_id))
+        except (ValueError, TypeError):
+            return Response(json_body={"error": "Parameter 'limit', 'dosen_id' atau 'cursor' tidak valid."}, status=400)
+
+        # Ambil satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya
+        rows = request.dbsession.execute(recommended_page_query(dosen_id, after, limit + 1)).all()
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        post_ids = [post_id for post_id, _ in rows]
+
+        entries = load_post_entries(request, get_response_cache(request), post_ids)
+        recommenders = load_recommenders(request.dbsession, post_ids)
+
+        posts_data = []
+        for post_id, recommended_at in rows:
+            if post_id not in entries:
+                continue
+            post_data = dict(entries[post_id]["post"])
+            post_data["recommended_at"] = recommended_at.isoformat() if recommended_at else None
+            post_data["recommenders"] = recommenders.get(post_id, [])
+            posts_data.append(post_data)
+        add_viewer_state(request, posts_data)
+
+        next_cursor = None
+        if has_next and rows:
+            last_post_id, last_at = rows[-1]
+            next_cursor = encode_cursor([last_at.isoformat(), last_post_id])
+
+        return {
+            "posts": posts_data,
+            "pagination": {
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "has_next": has_next,
+            }
+        }
+
+    except DBAPIError as e:
+        print(f"Database error in recommended_posts: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan database."}, status=500)
+    except Exception as e:
+        print(f"Unexpected error in recommended_posts: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan server tidak terduga."}, status=500)
@@ -0,0 +1,67 @@
+from pyramid.view import view_config
+from pyramid.response import Response
+from sqlalchemy.exc import DBAPIError
+
+from ..utils.cache import get_response_cache
+from ..utils.pagination import encode_cursor, decode_cursor, parse_limit
+from ..utils.search import get_search_backend
+from .post import load_post_entries
+
+MAX_QUERY_LENGTH = 200
+
+
+@view_config(route_name='search_posts', request_method='GET', renderer='json')
+def search_posts(request):
+    try:
+        query = (request.params.get('q') or '').strip()
+        if not query:
+            return Response(json_body={"error": "Parameter 'q' wajib diisi."}, status=400)
+        if len(query) > MAX_QUERY_LENGTH:
+            return Response(json_body={"error": "Kata kunci terlalu panjang."}, status=400)
+
+        try:
+            limit = parse_limit(request.params.get('limit'), default=10, maximum=50)
+            cursor = request.params.get('cursor')
+            after = decode_cursor(cursor, 2) if cursor else None
+        except ValueError:
+            return Response(json_body={"error": "Parameter 'limit' atau 'cursor' tidak valid."}, status=400)
+
+        backend = get_search_backend(request)
+        if backend is None:
+            return Response(json_body={"error": "Pencarian tidak tersedia untuk database ini."}, status=501)
+
+        # Ambil satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya
+        hits = backend.search(request.dbsession, query, limit + 1, after=after)
+        has_next = len(hits) > limit
+        hits = hits[:limit]
+
+        entries = load_post_entries(request, get_response_cache(request), [post_id for post_id, _ in hits])
+
+        posts_data = []
+        for post_id, score in hits:
+            if post_id not in entries:
+                continue
+            post_data = dict(entries[post_id]["post"])
+            post_data["score"] = score
+            posts_data.append(post_data)
+
+        next_cursor = None
+        if has_next and hits:
+            last_id, last_score = hits[-1]
+            next_cursor = encode_cursor([last_score, last_id])
+
+        return {
+            "posts": posts_data,
+            "pagination": {
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "has_next": has_next,
+            }
+        }
+
+    except DBAPIError as e:
+        print(f"Database error in search_posts: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan database."}, status=500)
+    except Exception as e:
+        print(f"Unexpected error in search_posts: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan server tidak terduga."}, status=500)
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import time
+
+from pyramid.view import view_config
+from pyramid.response import Response
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from ..models.comment import Comment
+from ..models.post import Post
+from ..utils.changelog import ENTITY_POST, ENTITY_COMMENT, ENTITY_RECOMMENDATION
+from ..utils.events import get_change_feed
+from .post import parse_post_ids
+from .recommended import load_recommenders
+from .sync import comment_to_dict
+
+
+def format_event(event_id, event_type, data):
+    payload = json.dumps(data, separators=(',', ':'))
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n".encode('utf-8')
+
+
+def hydrate_changes(dbsession, rows):
+    """
+    Ubah baris ``change_log`` menjadi event SSE; dipanggil sekali per batch
+    oleh ``ChangeFeed`` (bukan per koneksi). Counter dan daftar rekomendasi
+    hanya dikirim sekali per post per batch, dengan id perubahan terakhirnya.
+    """
+    counter_ids, recommendation_ids, comment_ids = {}, {}, {}
+    for row in rows:
+        if row.entity == ENTITY_POST:
+            counter_ids[row.post_id] = row.id
+        elif row.entity == ENTITY_RECOMMENDATION:
+            recommendation_ids[row.post_id] = row.id
+        elif row.entity == ENTITY_COMMENT:
+            comment_ids[row.entity_id] = row.id
+
+    events = []
+    if counter_ids:
+        counters = dbsession.execute(
+            select(Post.id, Post.likes, Post.dislikes, Post.comment_count)
+            .where(Post.id.in_(list(counter_ids)))
+        ).all()
+        for post_id, likes, dislikes, comment_count in counters:
+            event_id = counter_ids[post_id]
+            events.append({
+                "id": event_id,
+                "post_id": post_id,
+                "frame": format_event(event_id, 'counters', {
+                    "post_id": post_id,
+                    "likes": likes or 0,
+                    "dislikes": dislikes or 0,
+                    "comment_count": comment_count or 0,
+                }),
+            })
+
+    if comment_ids:
+        comments = dbsession.query(Comment) \
+            .options(joinedload(Comment.user)) \
+            .filter(Comment.id.in_(list(comment_ids))) \
+            .all()
+        for comment in comments:
+            event_id = comment_ids[comment.id]
+            events.append({
+                "id": event_id,
+                "post_id": comment.post_id,
+                "frame": format_event(event_id, 'comment', comment_to_dict(comment)),
+            })
+
+    if recommendation_ids:
+        recommenders = load_recommenders(dbsession, list(recommendation_ids))
+        for post_id, recs in recommenders.items():
+            event_id = recommendation_ids[post_id]
+            events.append({
+                "id": event_id,
+                "post_id": post_id,
+                "frame": format_event(event_id, 'recommendations', {"post_id": post_id, "recommenders": recs}),
+            })
+
+    events.sort(key=lambda event: event["id"])
+    return events
+
+
+class EventStream:
+    """
+    ``app_iter`` untuk satu koneksi SSE. Tidak menyentuh database: hanya
+    menunggu event dari broker, mengirim heartbeat, dan selesai setelah
+    ``max_duration`` detik (klien menyambung ulang dengan ``Last-Event-ID``)
+    sehingga thread server tidak tertahan tanpa batas.
+    """
+    __slots__ = ('broker', 'subscriber', 'heartbeat', 'max_duration', 'retry_ms')
+
+    def __init__(self, broker, subscriber, heartbeat=15.0, max_duration=120.0, retry_ms=3000):
+        self.broker = broker
+        self.subscriber = subscriber
+        self.heartbeat = heartbeat
+        self.max_duration = max_duration
+        self.retry_ms = retry_ms
+
+    @staticmethod
+    def _chunk(events, overflowed):
+        chunk = b""
+        if overflowed:
+            # Sebagian event terbuang; klien perlu memanggil /api/sync
+            chunk = b"event: resync\ndata: {}\n\n"
+        if events:
+            return chunk + b"".join(event["frame"] for event in events)
+        return chunk or b": ping\n\n"
+
+    def __iter__(self):
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode('utf-8')
+            deadline = time.monotonic() + self.max_duration
+            while self.subscriber is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                yield self._chunk(*self.subscriber.drain(min(self.heartbeat, remaining)))
+        finally:
+            self.close()
+
+    async def iter_async(self):
+        """
+        Versi asyncio dari ``__iter__`` untuk entry point ASGI: menunggu event
+        tanpa menahan thread. Broker membangunkan loop lewat ``notify``.
+        """
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        subscriber = self.subscriber
+        subscriber.notify = lambda: loop.call_soon_threadsafe(wakeup.set)
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode('utf-8')
+            deadline = loop.time() + self.max_duration
+            while self.subscriber is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                if not subscriber.queue and not subscriber.overflowed:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), min(self.heartbeat, remaining))
+                    except asyncio.TimeoutError:
+                        pass
+                wakeup.clear()
+                yield self._chunk(*subscriber.take())
+        finally:
+            subscriber.notify = None
+            self.close()
+
+    def close(self):
+        # Dipanggil server saat koneksi selesai/terputus, juga jika iterasi belum dimulai
+        subscriber, self.subscriber = self.subscriber, None
+        if subscriber is not None:
+            self.broker.unsubscribe(subscriber)
+
+
+@view_config(route_name='stream', request_method='GET')
+def stream(request):
+    """
+    Stream Server-Sent Events untuk post yang di-subscribe
+    (``?post_ids=1,2,3``): event ``counters``, ``comment``,
+    ``recommendations``, dan ``resync`` jika klien tertinggal.
+    """
+    feed = get_change_feed(request)
+    if feed is None:
+        return Response(json_body={"error": "Stream tidak diaktifkan."}, status=501)
+
+    settings = request.registry.settings or {}
+    try:
+        post_ids = parse_post_ids(request.params.get('post_ids'), int(settings.get('sse.max_posts', 50)))
+        last_event_id = request.headers.get('Last-Event-ID') or request.params.get('last_event_id')
+        last_event_id = int(last_event_id) if last_event_id else None
+    except (ValueError, TypeError):
+        return Response(json_body={"error": "Parameter 'post_ids' atau 'Last-Event-ID' tidak valid."}, status=400)
+
+    feed.ensure_started(request.registry['dbsession_factory'], hydrate_changes)
+    subscriber = feed.broker.subscribe(post_ids, last_event_id)
+    if subscriber is None:
+        response = Response(json_body={"error": "Terlalu banyak koneksi stream, coba lagi nanti."}, status=503)
+        response.headers['Retry-After'] = '5'
+        return response
+
+    response = Response(content_type='text/event-stream', charset='utf-8')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Matikan buffering proxy (nginx) agar event langsung terkirim
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.app_iter = EventStream(
+        feed.broker,
+        subscriber,
+        heartbeat=float(settings.get('sse.heartbeat', 15)),
+        max_duration=float(settings.get('sse.max_duration', 120)),
+        retry_ms=int(settings.get('sse.retry', 3000)),
+    )
+    return response
@@ -0,0 +1,34 @@
+from pyramid.view import view_config
+from pyramid.response import Response
+from sqlalchemy.exc import DBAPIError
+
+from ..utils.suggest import get_suggest_service
+
+MAX_QUERY_LENGTH = 100
+
+
+@view_config(route_name='suggest', request_method='GET', renderer='json')
+def suggest(request):
+    try:
+        query = (request.params.get('q') or '').strip()
+        if len(query) > MAX_QUERY_LENGTH:
+            return Response(json_body={"error": "Kata kunci terlalu panjang."}, status=400)
+
+        try:
+            limit = int(request.params.get('limit', 5))
+        except ValueError:
+            return Response(json_body={"error": "Parameter 'limit' tidak valid."}, status=400)
+
+        service = get_suggest_service(request)
+        if service is None:
+            return Response(json_body={"error": "Autocomplete tidak tersedia."}, status=501)
+
+        result = service.suggest(request.dbsession, query, limit)
+        return {"query": query, "posts": result["posts"], "users": result["users"]}
+
+    except DBAPIError as e:
+        print(f"Database error in suggest: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan database."}, status=500)
+    except Exception as e:
+        print(f"Unexpected error in suggest: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan server tidak terduga."}, status=500)
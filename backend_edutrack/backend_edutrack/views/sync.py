@@ -0,0 +1,104 @@
+from pyramid.view import view_config
+from pyramid.response import Response
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import joinedload
+
+from ..models.comment import Comment
+from ..utils.cache import get_response_cache
+from ..utils.changelog import (
+    read_changes,
+    latest_change_id,
+    ENTITY_POST,
+    ENTITY_COMMENT,
+    ENTITY_RECOMMENDATION,
+)
+from ..utils.pagination import encode_cursor, decode_cursor, parse_limit
+from .post import load_post_entries, add_viewer_state
+from .recommended import load_recommenders
+
+
+def comment_to_dict(comment):
+    return {
+        "id": comment.id,
+        "content": comment.content,
+        "created_at": comment.created_at.isoformat() if comment.created_at else None,
+        "post_id": comment.post_id,
+        "user_id": comment.user_id,
+        "username": comment.user.name if comment.user else None,
+    }
+
+
+@view_config(route_name='sync', request_method='GET', renderer='json')
+def sync(request):
+    """
+    Delta sync: kembalikan post (beserta counter), komentar baru, dan daftar
+    rekomendasi yang berubah setelah token ``since``. Tanpa ``since`` hanya
+    token awal yang dikembalikan; klien memuat feed seperti biasa lalu
+    memakai token tersebut untuk sync berikutnya.
+    """
+    try:
+        settings = request.registry.settings or {}
+        settle_seconds = float(settings.get('sync.settle_seconds', 2))
+        max_changes = int(settings.get('sync.max_changes', 500))
+
+        since = request.params.get('since')
+        try:
+            limit = parse_limit(request.params.get('limit'), default=200, maximum=max_changes)
+            since = int(decode_cursor(since, 1)[0]) if since else None
+        except (ValueError, TypeError):
+            return Response(json_body={"error": "Parameter 'since' atau 'limit' tidak valid."}, status=400)
+
+        if since is None:
+            token = latest_change_id(request.dbsession, settle_seconds)
+            return {
+                "posts": [],
+                "comments": [],
+                "recommendations": {},
+                "next_token": encode_cursor([token]),
+                "has_more": False,
+            }
+
+        rows, has_more = read_changes(request.dbsession, since, limit, settle_seconds)
+
+        # Perubahan berulang pada entitas yang sama digabung; urutan kemunculan pertama dipertahankan
+        post_ids, comment_ids, recommendation_post_ids = {}, {}, {}
+        for row in rows:
+            if row.entity == ENTITY_POST:
+                post_ids.setdefault(row.entity_id, None)
+            elif row.entity == ENTITY_COMMENT:
+                comment_ids.setdefault(row.entity_id, None)
+            elif row.entity == ENTITY_RECOMMENDATION:
+                recommendation_post_ids.setdefault(row.post_id, None)
+
+        post_ids = list(post_ids)
+        entries = load_post_entries(request, get_response_cache(request), post_ids)
+        posts_data = [dict(entries[pid]["post"]) for pid in post_ids if pid in entries]
+        add_viewer_state(request, posts_data)
+
+        comments_data = []
+        if comment_ids:
+            comments = request.dbsession.query(Comment) \
+                .options(joinedload(Comment.user)) \
+                .filter(Comment.id.in_(list(comment_ids))) \
+                .order_by(Comment.id) \
+                .all()
+            comments_data = [comment_to_dict(c) for c in comments]
+
+        recommenders = load_recommenders(request.dbsession, list(recommendation_post_ids))
+
+        next_token = rows[-1].id if rows else since
+        return {
+            "posts": posts_data,
+            "comments": comments_data,
+            # Daftar lengkap pemberi rekomendasi saat ini per post (kosong = semua dibatalkan)
+            "recommendations": {str(pid): recs for pid, recs in recommenders.items()},
+            "next_token": encode_cursor([next_token]),
+            "has_more": has_more,
+        }
+
+    except DBAPIError as e:
+        print(f"Database error in sync: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan database."}, status=500)
+    except Exception as e:
+        print(f"Unexpected error in sync: {e}")
+        return Response(json_body={"error": "Terjadi kesalahan server tidak terduga."}, status=500)
@@ -0,0 +1,213 @@
+"""
+Load test: WSGI (waitress, thread pool) dibandingkan entry point ASGI (uvicorn).
+
+Setiap skenario membuka sejumlah stream SSE (koneksi lama) lebih dulu, lalu
+menjalankan klien bersamaan yang memanggil ``GET /api/posts/{id}`` selama
+durasi tertentu. Di waitress setiap stream dan setiap request yang sedang
+menunggu database memakan satu thread; di ASGI keduanya hanya menunggu di
+event loop.
+
+Contoh:
+
+    python benchmarks/bench_asgi.py --threads 16 --clients 64 --streams 0,8,64
+
+Membutuhkan ``pip install -e ".[asgi]"``.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+HOST = '127.0.0.1'
+
+
+def settings_for(db_path):
+    return {
+        'sqlalchemy.url': 'sqlite:///' + db_path,
+        'hot.enabled': 'false',
+        'suggest.enabled': 'false',
+        # Batas stream dinaikkan agar yang diukur adalah batas server, bukan batas aplikasi
+        'sse.max_connections': '100000',
+        'sse.max_duration': '3600',
+    }
+
+
+def seed(db_path, posts):
+    from sqlalchemy import create_engine, insert
+    from backend_edutrack.models import Base, User, Post
+    from backend_edutrack.utils.search import SqliteFtsSearch
+
+    engine = create_engine('sqlite:///' + db_path)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        SqliteFtsSearch().ensure_schema(connection)
+        connection.execute(insert(User), [
+            {"id": 1, "name": "Bench", "email": "bench@student.itera.ac.id", "password": "x", "role": "Mahasiswa"}
+        ])
+        connection.execute(insert(Post), [
+            {"id": i, "title": "Post %d" % i, "content": "isi " * 50, "author_id": 1}
+            for i in range(1, posts + 1)
+        ])
+    engine.dispose()
+
+
+def serve_wsgi(settings, port, threads):
+    import logging
+    import waitress
+    from backend_edutrack import main
+
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+    waitress.serve(main({}, **settings), host=HOST, port=port, threads=threads, _quiet=True)
+
+
+def serve_asgi(settings, port, threads):
+    import uvicorn
+    from backend_edutrack.asgi import main
+
+    settings = dict(settings, **{'asgi.threads': str(threads)})
+    uvicorn.run(main({}, **settings), host=HOST, port=port, log_level='warning')
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    headers = {}
+    for line in head.split(b'\r\n')[1:]:
+        if b':' in line:
+            name, value = line.split(b':', 1)
+            headers[name.strip().lower()] = value.strip()
+    if b'content-length' in headers:
+        await reader.readexactly(int(headers[b'content-length']))
+    elif headers.get(b'transfer-encoding') == b'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    return status
+
+
+def request_bytes(path, token):
+    return (
+        'GET %s HTTP/1.1\r\nHost: %s\r\nAuthorization: Bearer %s\r\n\r\n' % (path, HOST, token)
+    ).encode('latin-1')
+
+
+async def open_stream(port, token, post_id):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(request_bytes('/api/stream?post_ids=%d' % post_id, token))
+    await writer.drain()
+    try:
+        # Baca dan buang event sampai koneksi ditutup
+        while await reader.read(4096):
+            pass
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def client(port, token, posts, deadline, timeout, samples, errors, rnd):
+    connection = None
+    while time.monotonic() < deadline:
+        path = '/api/posts/%d' % rnd.randint(1, posts)
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.wait_for(asyncio.open_connection(HOST, port), timeout)
+            reader, writer = connection
+            writer.write(request_bytes(path, token))
+            status = await asyncio.wait_for(read_response(reader), timeout)
+        except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError):
+            errors.append('timeout')
+            if connection is not None:
+                connection[1].close()
+            connection = None
+            continue
+        if status != 200:
+            errors.append(status)
+        samples.append((time.perf_counter() - started) * 1000)
+    if connection is not None:
+        connection[1].close()
+
+
+async def run_scenario(port, token, posts, streams, clients, duration, timeout):
+    rnd = random.Random(7)
+    stream_tasks = [asyncio.ensure_future(open_stream(port, token, i % posts + 1)) for i in range(streams)]
+    await asyncio.sleep(1.0)
+
+    samples, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*[
+        client(port, token, posts, deadline, timeout, samples, errors, rnd) for _ in range(clients)
+    ])
+
+    for task in stream_tasks:
+        task.cancel()
+    await asyncio.gather(*stream_tasks, return_exceptions=True)
+
+    samples.sort()
+    return {
+        "rps": len(samples) / duration,
+        "p50": statistics.median(samples) if samples else float('nan'),
+        "p99": samples[max(int(len(samples) * 0.99) - 1, 0)] if samples else float('nan'),
+        "errors": len(errors),
+    }
+
+
+def wait_for_port(port, timeout=15.0):
+    import socket
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), 0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('Server pada port %d tidak siap' % port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16, help='thread waitress / thread pool ASGI')
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--streams', default='0,8,64', help='jumlah stream SSE per skenario')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--timeout', type=float, default=5.0, help='batas waktu per request')
+    parser.add_argument('--port', type=int, default=6570)
+    args = parser.parse_args()
+
+    from backend_edutrack.security import create_token
+
+    token = create_token({'id': 1, 'role': 'Mahasiswa', 'name': 'Bench'})
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    seed(db_path, args.posts)
+    settings = settings_for(db_path)
+
+    print('%-6s %8s %8s %10s %10s %8s' % ('server', 'streams', 'req/s', 'p50 ms', 'p99 ms', 'gagal'))
+    for name, target in (('wsgi', serve_wsgi), ('asgi', serve_asgi)):
+        for streams in [int(s) for s in args.streams.split(',')]:
+            # Server baru per skenario agar thread yang tertahan tidak terbawa
+            port = args.port
+            args.port += 1
+            process = multiprocessing.Process(target=target, args=(settings, port, args.threads), daemon=True)
+            process.start()
+            try:
+                wait_for_port(port)
+                result = asyncio.run(run_scenario(
+                    port, token, args.posts, streams, args.clients, args.duration, args.timeout))
+            finally:
+                process.terminate()
+                process.join()
+            print('%-6s %8d %8.0f %10.2f %10.2f %8d' % (
+                name, streams, result["rps"], result["p50"], result["p99"], result["errors"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Load test kontensi SQLite: konfigurasi bawaan dibandingkan profil produksi
+(WAL, ``synchronous=NORMAL``, ``busy_timeout``, page cache, mmap, dan pool
+satu koneksi per thread).
+
+Klien bersamaan mencampur baca (``GET /api/posts/{id}``) dengan tulis (like
+dan komentar) ke sekumpulan kecil post agar lock penulis benar-benar
+diperebutkan. Setiap skenario memakai file database baru, karena
+``journal_mode`` tersimpan di file.
+
+Contoh:
+
+    python benchmarks/bench_sqlite.py --threads 16 --clients 64 --write-ratio 0.2
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from bench_asgi import HOST, read_response, wait_for_port
+
+# Semua PRAGMA dimatikan dan pool bawaan SQLAlchemy (5 + overflow 10)
+BASELINE = {'sqlite.' + name: '' for name in (
+    'journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store')}
+
+
+def settings_for(db_path, tuned, threads):
+    settings = {
+        'sqlalchemy.url': 'sqlite:///' + db_path,
+        'hot.enabled': 'false',
+        'suggest.enabled': 'false',
+        'cache.enabled': 'false',
+    }
+    if tuned:
+        # Nilai PRAGMA memakai default models.SQLITE_PRAGMAS
+        settings['sqlalchemy.pool_size'] = str(threads + 2)
+        settings['sqlalchemy.max_overflow'] = '0'
+    else:
+        settings.update(BASELINE)
+    return settings
+
+
+def seed(db_path, posts, users):
+    from sqlalchemy import create_engine, insert
+    from backend_edutrack.models import Base, User, Post
+    from backend_edutrack.utils.search import SqliteFtsSearch
+
+    engine = create_engine('sqlite:///' + db_path)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        SqliteFtsSearch().ensure_schema(connection)
+        connection.execute(insert(User), [
+            {"id": i, "name": "Bench %d" % i, "email": "bench%d@student.itera.ac.id" % i,
+             "password": "x", "role": "Mahasiswa"}
+            for i in range(1, users + 1)
+        ])
+        connection.execute(insert(Post), [
+            {"id": i, "title": "Post %d" % i, "content": "isi " * 50, "author_id": 1}
+            for i in range(1, posts + 1)
+        ])
+    engine.dispose()
+
+
+def serve(settings, port, threads):
+    import logging
+    import waitress
+    from backend_edutrack import main
+
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+    waitress.serve(main({}, **settings), host=HOST, port=port, threads=threads, _quiet=True)
+
+
+def request_bytes(method, path, token, body=b''):
+    head = (
+        '%s %s HTTP/1.1\r\nHost: %s\r\nAuthorization: Bearer %s\r\n'
+        'Content-Type: application/json\r\nContent-Length: %d\r\n\r\n'
+        % (method, path, HOST, token, len(body))
+    )
+    return head.encode('latin-1') + body
+
+
+async def client(port, token, args, deadline, results, rnd):
+    connection = None
+    while time.monotonic() < deadline:
+        post_id = rnd.randint(1, args.hot_posts)
+        if rnd.random() < args.write_ratio:
+            kind = 'tulis'
+            if rnd.random() < 0.5:
+                data = request_bytes('POST', '/api/posts/%d/like' % post_id, token)
+            else:
+                body = json.dumps({"post_id": post_id, "content": "komentar bench"}).encode()
+                data = request_bytes('POST', '/api/comments', token, body)
+        else:
+            kind = 'baca'
+            data = request_bytes('GET', '/api/posts/%d' % post_id, token)
+
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.wait_for(asyncio.open_connection(HOST, port), args.timeout)
+            reader, writer = connection
+            writer.write(data)
+            status = await asyncio.wait_for(read_response(reader), args.timeout)
+        except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError):
+            results[kind]["errors"] += 1
+            if connection is not None:
+                connection[1].close()
+            connection = None
+            continue
+        if status >= 500:
+            results[kind]["errors"] += 1
+        else:
+            results[kind]["samples"].append((time.perf_counter() - started) * 1000)
+    if connection is not None:
+        connection[1].close()
+
+
+async def run_scenario(port, tokens, args):
+    rnd = random.Random(7)
+    results = {kind: {"samples": [], "errors": 0} for kind in ('baca', 'tulis')}
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(*[
+        client(port, tokens[i % len(tokens)], args, deadline, results, rnd) for i in range(args.clients)
+    ])
+    return results
+
+
+def summary(result, duration):
+    samples = sorted(result["samples"])
+    return (
+        len(samples) / duration,
+        statistics.median(samples) if samples else float('nan'),
+        samples[max(int(len(samples) * 0.99) - 1, 0)] if samples else float('nan'),
+        result["errors"],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--hot-posts', type=int, default=20, help='post yang diperebutkan klien')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--timeout', type=float, default=10.0, help='batas waktu per request')
+    parser.add_argument('--port', type=int, default=6590)
+    args = parser.parse_args()
+
+    from backend_edutrack.security import create_token
+
+    # Satu pengguna per klien agar like tidak saling membatalkan
+    tokens = [create_token({'id': i, 'role': 'Mahasiswa', 'name': 'Bench %d' % i})
+              for i in range(1, args.clients + 1)]
+
+    print('%-8s %-6s %8s %10s %10s %8s' % ('profil', 'jenis', 'req/s', 'p50 ms', 'p99 ms', 'gagal'))
+    for name, tuned in (('bawaan', False), ('tuned', True)):
+        db_path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+        seed(db_path, args.posts, args.clients)
+        port = args.port
+        args.port += 1
+        process = multiprocessing.Process(
+            target=serve, args=(settings_for(db_path, tuned, args.threads), port, args.threads), daemon=True)
+        process.start()
+        try:
+            wait_for_port(port)
+            results = asyncio.run(run_scenario(port, tokens, args))
+        finally:
+            process.terminate()
+            process.join()
+        for kind in ('baca', 'tulis'):
+            print('%-8s %-6s %8.0f %10.2f %10.2f %8d' % ((name, kind) + summary(results[kind], args.duration)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Waktu cold start aplikasi: ``import backend_edutrack`` + ``main()`` di proses baru.
+
+Setiap putaran menjalankan interpreter baru (seperti worker prefork yang
+diganti atau instance serverless yang baru dinyalakan) dan mengukur waktu
+import serta waktu ``main()`` membangun aplikasi WSGI. Satu putaran tambahan
+dijalankan dengan ``python -X importtime`` untuk melaporkan modul dengan
+waktu import kumulatif terbesar.
+
+Contoh:
+
+    python benchmarks/bench_startup.py --runs 10 --top 25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Dijalankan di proses anak; mencetak hasil pengukuran sebagai JSON
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from backend_edutrack import main
+imported = time.perf_counter()
+app = main({}, **json.loads(sys.argv[1]))
+built = time.perf_counter()
+ranker = app.registry.get('hot_ranker')
+if ranker is not None:
+    ranker.stop()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "main_ms": (built - imported) * 1000,
+    "modules": len(sys.modules),
+    "backend_modules": sorted(m for m in sys.modules if m.startswith('backend_edutrack')),
+}))
+"""
+
+
+def settings_for(db_path):
+    return {
+        'sqlalchemy.url': 'sqlite:///' + db_path,
+        'hot.enabled': 'false',
+        'suggest.enabled': 'false',
+    }
+
+
+def probe(settings, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', PROBE, json.dumps(settings)]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr):
+    """Kembalikan daftar (self_us, cumulative_us, modul) dari keluaran ``-X importtime``."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=20, help='jumlah modul terlambat yang ditampilkan')
+    args = parser.parse_args()
+
+    settings = settings_for(os.path.join(tempfile.mkdtemp(), 'startup.sqlite'))
+    # Putaran pertama mengisi cache bytecode dan page cache; tidak dihitung
+    probe(settings)
+
+    runs = [probe(settings)[0] for _ in range(args.runs)]
+    imports = [run["import_ms"] for run in runs]
+    mains = [run["main_ms"] for run in runs]
+    totals = [run["import_ms"] + run["main_ms"] for run in runs]
+
+    print('%-16s %10s %10s' % ('', 'median ms', 'max ms'))
+    for name, values in (('import', imports), ('main()', mains), ('total', totals)):
+        print('%-16s %10.1f %10.1f' % (name, statistics.median(values), max(values)))
+    print('modul dimuat      %d (backend_edutrack: %d)' % (runs[-1]["modules"], len(runs[-1]["backend_modules"])))
+    print('modul backend_edutrack: %s' % ' '.join(runs[-1]["backend_modules"]))
+
+    _, stderr = probe(settings, importtime=True)
+    rows = parse_importtime(stderr)
+    print()
+    print('%10s %10s  %s' % ('self ms', 'kum. ms', 'modul (-X importtime)'))
+    for self_us, cumulative_us, name in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print('%10.1f %10.1f  %s' % (self_us / 1000, cumulative_us / 1000, name))
+
+
+if __name__ == '__main__':
+    main()
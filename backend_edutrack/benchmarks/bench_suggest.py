@@ -0,0 +1,76 @@
+"""
+Benchmark latensi ``SuggestService`` (index prefix di memori) pada data sintetis.
+
+Contoh:
+
+    python benchmarks/bench_suggest.py --posts 200000 --users 20000
+
+Target: p99 di bawah 20 ms per query tanpa cache.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from backend_edutrack.utils.suggest import (
+    KIND_POST,
+    KIND_USER,
+    SuggestService,
+    post_terms,
+    user_terms,
+)
+
+WORDS = (
+    "python pyramid sqlalchemy basis data algoritma struktur jaringan komputer "
+    "statistika kalkulus fisika kimia biologi geologi arsitektur sipil elektro "
+    "mesin informatika sistem informasi kecerdasan buatan pembelajaran"
+).split()
+NAMES = "budi siti agus dewi rina andi putri eko fajar indah joko lestari".split()
+
+
+def rows(posts, users, rnd):
+    for i in range(1, posts + 1):
+        title = " ".join(rnd.choices(WORDS, k=5))
+        yield KIND_POST, i, {"id": i, "title": title}, post_terms(title)
+    for i in range(1, users + 1):
+        name = " ".join(rnd.choices(NAMES, k=2)).title()
+        nim = "1201%05d" % i
+        yield KIND_USER, i, {"id": i, "name": name, "nim": nim}, user_terms(name, nim)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    service = SuggestService(cache=None, rebuild_interval=0)
+    data = list(rows(args.posts, args.users, rnd))
+    service._load_rows = lambda dbsession: data
+
+    started = time.perf_counter()
+    service.ensure_index(None)
+    print('Build index %d item: %.2f s' % (len(service.index), time.perf_counter() - started))
+
+    vocabulary = WORDS + NAMES + ['1201%d' % i for i in range(10)]
+    samples = []
+    for _ in range(args.queries):
+        word = rnd.choice(vocabulary)
+        query = word[:rnd.randint(2, len(word))]
+        started = time.perf_counter()
+        service.suggest(None, query, 10)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    print('Query tanpa cache: p50 %.3f ms, p99 %.3f ms, max %.3f ms' % (
+        statistics.median(samples), samples[int(len(samples) * 0.99) - 1], samples[-1]))
+
+    started = time.perf_counter()
+    service.put_post(args.posts + 1, 'Kalkulus Lanjut Baru')
+    print('Update inkremental: %.3f ms' % ((time.perf_counter() - started) * 1000))
+
+
+if __name__ == '__main__':
+    main()
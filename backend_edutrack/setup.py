@@ -13,7 +13,6 @@ requires = [
     'plaster_pastedeploy',
     'pyramid >= 1.9',
     'pyramid_debugtoolbar',
-    'pyramid_jinja2',
     'pyramid_retry',
     'pyramid_tm',
     'SQLAlchemy',
@@ -48,6 +47,10 @@ setup(
     zip_safe=False,
     extras_require={
         'testing': tests_require,
+        'brotli': ['brotli'],
+        'templates': ['pyramid_jinja2'],
+        'asgi': ['uvicorn', 'greenlet', 'aiosqlite', 'asyncpg'],
+        'redis': ['redis'],
     },
     install_requires=requires,
     entry_points={
@@ -56,6 +59,10 @@ setup(
         ],
         'console_scripts': [
             'initialize_backend_edutrack_db = backend_edutrack.scripts.initialize_db:main',
+            'reindex_backend_edutrack_search = backend_edutrack.scripts.reindex_search:main',
+            'serve_backend_edutrack_prefork = backend_edutrack.scripts.prefork:main',
+            'import_backend_edutrack_users = backend_edutrack.scripts.import_users:main',
+            'export_backend_edutrack_data = backend_edutrack.scripts.export_data:main',
         ],
     },
 )